@@ -0,0 +1,350 @@
+"""Benchmarks of the sample hot path.
+
+Runs without any hardware attached, device backends are replaced by fakes that
+produce frames as fast as the real devices' drivers would hand them out.
+
+Usage:
+    python benchmarks/sample_path.py --output results.json
+    python benchmarks/sample_path.py --compare baseline.json
+
+With `--compare`, benchmarks whose median got slower than `--threshold` times the
+baseline are reported and the script exits with a non-zero status.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+from collections.abc import Callable
+from contextlib import ExitStack, contextmanager
+from types import SimpleNamespace
+from typing import Any
+from unittest import mock
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtWidgets import QApplication
+
+import pupil_labs.mar_common
+from pupil_labs.camera import CameraRadial
+from pupil_labs.mar_common.eye_tracking_sources import EyeTrackingSource
+from pupil_labs.mar_common.eye_tracking_sources.buffers import RingBuffer
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import (
+    Synthetic,
+)
+from pupil_labs.mar_common.ui.scaled_image_view import ScaledImageView
+from pupil_labs.mar_common.ui.utils import (
+    numpy_from_qpixmap,
+    numpy_view_from_qpixmap,
+    qimage_from_numpy,
+)
+from pupil_labs.neon_usb import Frame, SceneCamera
+from pupil_labs.neon_usb.cameras.scene import SceneIntrinsics
+from pupil_labs.realtime_api.simple import MatchedItem
+
+NEON_SCENE_SIZE = (1600, 1200)
+NEON_EYE_SIZE = (384, 192)
+HD_DIGITAL_SIZE = (640, 480)
+PREVIEW_SIZE = (640, 480)
+
+Benchmark = Callable[[], Any]
+
+
+def measure(func: Benchmark, repeat: int, warmup: int = 3) -> dict[str, float]:
+    for _ in range(warmup):
+        func()
+
+    durations = np.empty(repeat, dtype=np.float64)
+    for i in range(repeat):
+        start = time.perf_counter_ns()
+        func()
+        durations[i] = (time.perf_counter_ns() - start) / 1e9
+
+    return {
+        "repeat": repeat,
+        "mean": float(durations.mean()),
+        "median": float(np.median(durations)),
+        "p95": float(np.percentile(durations, 95)),
+        "min": float(durations.min()),
+        "max": float(durations.max()),
+    }
+
+
+def fake_intrinsics(width: int, height: int) -> CameraRadial:
+    return Synthetic(scene_size=(width, height), buffer_count=1).scene_intrinsics
+
+
+class FakeCamera(SceneCamera):
+    """Stands in for the Neon USB cameras, producing a frame every `interval`.
+
+    Subclasses `SceneCamera` without opening a device, `NeonUSB` checks the type of
+    the camera it reads intrinsics from.
+    """
+
+    size: tuple[int, int] = NEON_SCENE_SIZE
+    channels = 3
+    interval = 0.001
+
+    def __init__(self) -> None:
+        width, height = self.size
+        shape = (height, width, self.channels) if self.channels > 1 else (height, width)
+        self._image = np.random.default_rng(0).integers(0, 256, shape, np.uint8)
+        self._index = 0
+
+    @staticmethod
+    def get_intrinsics() -> SceneIntrinsics:
+        intrinsics = fake_intrinsics(*NEON_SCENE_SIZE)
+        return SceneIntrinsics(
+            intrinsics.camera_matrix,
+            intrinsics.distortion_coefficients,
+            np.eye(4)[:3],
+        )
+
+    def get_frame(self) -> Frame:
+        time.sleep(self.interval)
+        self._index += 1
+        return Frame(self._image, time.monotonic(), self._index)
+
+    def close(self) -> None:
+        pass
+
+
+class FakeEyeCamera(FakeCamera):
+    size = NEON_EYE_SIZE
+    channels = 1
+
+    def get_frame(self) -> Frame:
+        # The eye camera stamps its frames with the wall clock
+        frame = super().get_frame()
+        return Frame(frame.img, time.time(), frame.index)
+
+
+class FakeHDDigitalCam(FakeCamera):
+    size = HD_DIGITAL_SIZE
+
+
+def fake_pipeline(eye_frames: list[Frame]) -> np.ndarray:
+    return np.zeros((len(eye_frames), 2), dtype=np.float64)
+
+
+class FakeRemoteDevice:
+    """Stands in for `pupil_labs.realtime_api.simple.Device`."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        width, height = NEON_SCENE_SIZE
+        self.address = "127.0.0.1"
+        self.port = 8080
+        self._pixels = np.zeros((height, width, 3), np.uint8)
+
+    def receive_matched_scene_video_frame_and_gaze(
+        self, timeout_seconds: float | None = None
+    ) -> MatchedItem:
+        scene = SimpleNamespace(
+            bgr_pixels=self._pixels, timestamp_unix_ns=time.time_ns()
+        )
+        return MatchedItem(scene, SimpleNamespace(x=800.0, y=600.0))  # type: ignore[arg-type]
+
+    def get_calibration(self) -> SimpleNamespace:
+        intrinsics = fake_intrinsics(*NEON_SCENE_SIZE)
+        return SimpleNamespace(
+            scene_camera_matrix=intrinsics.camera_matrix,
+            scene_distortion_coefficients=intrinsics.distortion_coefficients,
+        )
+
+    def close(self) -> None:
+        pass
+
+
+@contextmanager
+def quiet():
+    with mock.patch("builtins.print"):
+        yield
+
+
+def neon_usb_source() -> EyeTrackingSource:
+    from pupil_labs.mar_common.eye_tracking_sources import neon_usb
+
+    with ExitStack() as stack, quiet():
+        stack.enter_context(
+            mock.patch.object(neon_usb, "LowExposureSceneCamera", FakeCamera)
+        )
+        stack.enter_context(mock.patch.object(neon_usb, "EyeCamera", FakeEyeCamera))
+        stack.enter_context(
+            mock.patch.object(
+                neon_usb.NeonUSB, "_init_pipeline", return_value=fake_pipeline
+            )
+        )
+        return neon_usb.NeonUSB()
+
+
+def neon_remote_source() -> EyeTrackingSource:
+    from pupil_labs.mar_common.eye_tracking_sources import neon_remote
+
+    with mock.patch.object(neon_remote, "Device", FakeRemoteDevice), quiet():
+        return neon_remote.NeonRemote("127.0.0.1", 8080)
+
+
+def hd_digital_source() -> EyeTrackingSource:
+    from pupil_labs.mar_common.eye_tracking_sources import hddigital
+
+    with mock.patch.object(hddigital, "HDDigitalCam", FakeHDDigitalCam):
+        source = hddigital.HDDigital()
+    source.scene_intrinsics = fake_intrinsics(*HD_DIGITAL_SIZE)  # type: ignore[misc]
+    return source
+
+
+SOURCES: dict[str, Callable[[], EyeTrackingSource]] = {
+    "neon_usb": neon_usb_source,
+    "neon_remote": neon_remote_source,
+    "hd_digital": hd_digital_source,
+    "synthetic": lambda: Synthetic(real_time=False),
+}
+
+
+def bench_sources(repeat: int) -> dict[str, dict[str, float]]:
+    results = {}
+    for name, make_source in SOURCES.items():
+        source = make_source()
+        try:
+            results[f"get_sample[{name}]"] = measure(source.get_sample, repeat)
+
+            def undistort_image(source: EyeTrackingSource = source) -> None:
+                _ = source.get_sample().scene_image_undistorted
+
+            def undistort_preview(source: EyeTrackingSource = source) -> None:
+                _ = source.get_sample().scene_image_undistorted_at(PREVIEW_SIZE)
+
+            def undistort_gaze(source: EyeTrackingSource = source) -> None:
+                _ = source.get_sample().gaze_scene_undistorted
+
+            # All include get_sample, whose cost is reported separately above
+            results[f"scene_image_undistorted[{name}]"] = measure(
+                undistort_image, repeat
+            )
+            results[f"scene_image_undistorted_at[{name}]"] = measure(
+                undistort_preview, repeat
+            )
+            results[f"gaze_scene_undistorted[{name}]"] = measure(undistort_gaze, repeat)
+        finally:
+            source.close()
+    return results
+
+
+def bench_ring_buffer(repeat: int) -> dict[str, dict[str, float]]:
+    """Read the newest frames while a producer writes at full speed."""
+    buffer = RingBuffer[Frame](10, lambda frame: frame.timestamp)
+    image = np.zeros(NEON_EYE_SIZE[::-1], np.uint8)
+    stop_event = threading.Event()
+
+    def produce() -> None:
+        index = 0
+        while not stop_event.is_set():
+            buffer.put(Frame(image, time.time(), index))
+            index += 1
+            time.sleep(0)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    try:
+        buffer.wait(0)
+        return {
+            "ring_buffer.latest(1)": measure(lambda: buffer.latest(1), repeat),
+            "ring_buffer.latest(6)": measure(lambda: buffer.latest(6), repeat),
+            "ring_buffer.since": measure(
+                lambda: buffer.since(time.time() - 0.01), repeat
+            ),
+        }
+    finally:
+        stop_event.set()
+        producer.join()
+
+
+def bench_qt(repeat: int) -> dict[str, dict[str, float]]:
+    app = QApplication.instance() or QApplication(sys.argv)  # noqa: F841
+    width, height = NEON_SCENE_SIZE
+    scene = np.random.default_rng(0).integers(0, 256, (height, width, 3), np.uint8)
+    pixmap = QPixmap.fromImage(qimage_from_numpy(scene))
+
+    view = ScaledImageView()
+    view.resize(640, 480)
+    view.set_image(scene)
+    target = QImage(view.size(), QImage.Format_RGB32)
+
+    return {
+        "qimage_from_numpy": measure(lambda: qimage_from_numpy(scene), repeat),
+        "numpy_from_qpixmap": measure(lambda: numpy_from_qpixmap(pixmap), repeat),
+        "numpy_view_from_qpixmap": measure(
+            lambda: numpy_view_from_qpixmap(pixmap), repeat
+        ),
+        "ScaledImageView.paintEvent": measure(lambda: view.render(target), repeat),
+    }
+
+
+def run(repeat: int) -> dict[str, Any]:
+    results: dict[str, dict[str, float]] = {}
+    results.update(bench_sources(repeat))
+    results.update(bench_ring_buffer(repeat * 10))
+    results.update(bench_qt(repeat))
+    return {
+        "metadata": {
+            "version": pupil_labs.mar_common.__version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "time": time.time(),
+        },
+        "results": results,
+    }
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    regressions = []
+    for name, stats in results["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = stats["median"] / baseline["results"][name]["median"]
+        if ratio > threshold:
+            regressions.append(f"{name}: {ratio:.2f}x slower than baseline")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="JSON results of a baseline run")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+
+    for name, stats in results["results"].items():
+        print(f"{name:<45} median {stats['median'] * 1e6:>10.1f} us")
+
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
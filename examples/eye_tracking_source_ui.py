@@ -1,12 +1,16 @@
 import sys
 
 import numpy as np
-from PySide6.QtCore import QPoint, QTimer
+from PySide6.QtCore import QPoint
 from PySide6.QtGui import QPainter, Qt
 from PySide6.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget
 
-from pupil_labs.mar_common.eye_tracking_sources import EyeTrackingSource
+from pupil_labs.mar_common.eye_tracking_sources import (
+    EyeTrackingData,
+    EyeTrackingSource,
+)
 from pupil_labs.mar_common.ui.eye_tracking_source import SourceWidget
+from pupil_labs.mar_common.ui.sample_poller import SamplePoller
 from pupil_labs.mar_common.ui.scaled_image_view import ScaledImageView
 
 
@@ -51,6 +55,7 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Eye Tracking Source Selection")
 
         self.device: EyeTrackingSource | None = None
+        self.poller: SamplePoller | None = None
 
         selection_widget = SourceWidget()
         layout = QVBoxLayout()
@@ -68,27 +73,26 @@ class MainWindow(QMainWindow):
         selection_widget.new_device_connected.connect(self.on_new_device_connected)
         selection_widget.disconnect_requested.connect(self.on_disconnect_requested)
 
-        self.poll_timer = QTimer()
-        self.poll_timer.setInterval(int(1000 / 30))
-        self.poll_timer.timeout.connect(self.poll)
-        self.poll_timer.start()
-
     def on_new_device_connected(self, eye_tracking_source):
         self.device = eye_tracking_source
+        self.poller = SamplePoller(eye_tracking_source)
+        self.poller.new_sample.connect(self.show_sample)
 
     def on_disconnect_requested(self):
+        if self.poller is not None:
+            self.poller.stop()
+            self.poller = None
         if self.device is not None:
             self.device.close()
             self.device = None
         self.preview.set_image(None)
         self.preview.set_gaze(None)
 
-    def poll(self):
-        if self.device is not None:
-            et_data = self.device.get_sample()
-            self.preview.set_image(et_data.scene)
-            if et_data.gaze is not None:
-                self.preview.set_gaze(et_data.gaze)
+    def show_sample(self, et_data: EyeTrackingData):
+        if self.device is None:
+            return
+        self.preview.set_image(et_data.scene_image_distorted)
+        self.preview.set_gaze(et_data.gaze_scene_distorted)
 
 
 if __name__ == "__main__":
@@ -1,3 +1,23 @@
-from .eye_tracking_source import EyeTrackingData, EyeTrackingSource
+from .async_source import AsyncEyeTrackingSource, AsyncSourceAdapter
+from .eye_tracking_source import (
+    EyeTrackingData,
+    EyeTrackingSource,
+    GazeBatch,
+    ImageRegion,
+    SampleOverflowError,
+)
+from .latency import LatencyRecorder, LatencyStats
+from .undistortion import UndistortionMaps
 
-__all__ = ["EyeTrackingData", "EyeTrackingSource"]
+__all__ = [
+    "AsyncEyeTrackingSource",
+    "AsyncSourceAdapter",
+    "EyeTrackingData",
+    "EyeTrackingSource",
+    "GazeBatch",
+    "ImageRegion",
+    "LatencyRecorder",
+    "LatencyStats",
+    "SampleOverflowError",
+    "UndistortionMaps",
+]
@@ -0,0 +1,56 @@
+import bisect
+import time
+from collections.abc import Callable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+
+class ClockOffset:
+    """Converts timestamps of a capture clock to Unix time in nanoseconds.
+
+    The offset between the capture clock and the system's wall clock is measured
+    once, using the reading with the smallest round trip out of `samples` readings.
+    """
+
+    def __init__(self, clock: Callable[[], float], samples: int = 10):
+        best_round_trip = np.inf
+        self.offset = 0.0
+        for _ in range(samples):
+            before = time.time()
+            clock_time = clock()
+            after = time.time()
+            if after - before < best_round_trip:
+                best_round_trip = after - before
+                self.offset = (before + after) / 2 - clock_time
+
+    def to_unix_ns(self, timestamp: float) -> int:
+        """Convert a capture clock timestamp in seconds to Unix nanoseconds."""
+        return int((timestamp + self.offset) * 1e9)
+
+
+def closest_window(timestamps: Sequence[int], target: int, size: int) -> slice:
+    """Slice of `size` consecutive timestamps centered around `target`.
+
+    The timestamps need to be sorted. Near the ends the window is shifted so that it
+    still contains `size` elements, if there are that many.
+    """
+    center = bisect.bisect_left(timestamps, target)
+    start = min(max(center - size // 2, 0), max(len(timestamps) - size, 0))
+    return slice(start, start + size)
+
+
+def interpolate(
+    timestamps: npt.ArrayLike, values: npt.ArrayLike, target: int
+) -> npt.NDArray[np.float64]:
+    """Linearly interpolate `values` of shape (N, D) at time `target`.
+
+    Outside of the covered time range the first or last value is returned.
+    """
+    relative_times = (np.asarray(timestamps, dtype=np.int64) - target).astype(
+        np.float64
+    )
+    values = np.asarray(values, dtype=np.float64)
+    return np.array([
+        np.interp(0.0, relative_times, values[:, dim]) for dim in range(values.shape[1])
+    ])
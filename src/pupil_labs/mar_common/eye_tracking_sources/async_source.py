@@ -0,0 +1,83 @@
+import asyncio
+from abc import abstractmethod
+from collections.abc import AsyncIterator
+from typing import Any
+
+from pupil_labs.camera import CameraRadial
+
+from .buffers import BufferPool
+from .eye_tracking_source import (
+    EyeTrackingData,
+    EyeTrackingSource,
+    GazeBatch,
+    SceneCameraSource,
+)
+from .latency import LatencyRecorder
+from .undistortion import UndistortionMaps
+
+
+class AsyncEyeTrackingSource(SceneCameraSource):
+    """Eye tracking source that never blocks the event loop.
+
+    Samples are awaited with `await source.get_sample()` or iterated over with
+    `async for sample in source`, which like `get_sample` always yields the latest
+    sample.
+    """
+
+    @abstractmethod
+    async def get_sample(self) -> EyeTrackingData:
+        pass
+
+    async def __aiter__(self) -> AsyncIterator[EyeTrackingData]:
+        while True:
+            yield await self.get_sample()
+
+    async def get_gaze(self, undistort: bool = False) -> GazeBatch:
+        """Return all gaze samples since the previous call, see `EyeTrackingSource`."""
+        raise NotImplementedError(f"{type(self).__name__} has no gaze stream.")
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self) -> "AsyncEyeTrackingSource":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+
+class AsyncSourceAdapter(AsyncEyeTrackingSource):
+    """Makes any blocking source awaitable.
+
+    Blocking calls are run on the event loop's default executor, so they only
+    occupy a worker thread while actually waiting for the device.
+    """
+
+    def __init__(self, source: EyeTrackingSource):
+        self.source = source
+
+    @property
+    def scene_intrinsics(self) -> CameraRadial:
+        return self.source.scene_intrinsics
+
+    @property
+    def undistortion_maps(self) -> UndistortionMaps:
+        return self.source.undistortion_maps
+
+    @property
+    def latency(self) -> LatencyRecorder:
+        return self.source.latency
+
+    @property
+    def buffer_pool(self) -> BufferPool:
+        return self.source.buffer_pool
+
+    async def get_sample(self) -> EyeTrackingData:
+        return await asyncio.to_thread(self.source.get_sample)
+
+    async def get_gaze(self, undistort: bool = False) -> GazeBatch:
+        return await asyncio.to_thread(self.source.get_gaze, undistort)
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self.source.close)
@@ -0,0 +1,218 @@
+from collections.abc import Iterator
+from threading import Event, Thread
+
+import numpy as np
+
+from pupil_labs.camera import CameraRadial
+
+from . import (
+    EyeTrackingData,
+    EyeTrackingSource,
+)
+from .latency import DEQUEUE
+from .shared_memory import SharedSampleRing
+from .undistortion import intrinsics_key
+
+
+def sample_publisher(
+    source: EyeTrackingSource,
+    publisher: "SamplePublisher",
+    stop_event: Event,
+) -> None:
+    while not stop_event.is_set():
+        try:
+            data = source.get_sample()
+            publisher.publish(data)
+        except Exception as error:
+            if stop_event.is_set():
+                break
+            publisher.fail(error)
+            raise
+
+
+class SamplePublisher:
+    """Shares the samples of a source with other processes.
+
+    Only one process can open a device's cameras. The publisher captures from the
+    source on a background thread and writes every sample into a `SharedSampleRing`,
+    which any number of processes read with `SharedMemorySource` by passing them
+    `name`. Images are copied once into shared memory and not serialized.
+    """
+
+    def __init__(self, source: EyeTrackingSource, capacity: int = 8):
+        """Start publishing the samples of a source.
+
+        Waits for the first sample to size the shared memory to its images.
+
+        Args:
+            source: Source to capture from, it is closed together with the
+                publisher.
+            capacity: Number of samples kept in shared memory. Subscribers that fall
+                further behind lose samples.
+
+        """
+        self.source = source
+
+        first = source.get_sample()
+        eye_shape = first.eye_image.shape if first.eye_image is not None else (0,)
+        self._ring = SharedSampleRing.create(
+            capacity, first._scene_image.shape, eye_shape
+        )
+        self._intrinsics: CameraRadial | None = None
+        self._intrinsics_key: str | None = None
+        self._intrinsics_version = 0
+        self.publish(first)
+
+        self._stop_event = Event()
+        self._thread = Thread(
+            target=sample_publisher,
+            args=(source, self, self._stop_event),
+            daemon=True,
+        )
+        self._thread.start()
+
+    @property
+    def name(self) -> str:
+        """Name of the shared memory to pass to `SharedMemorySource`."""
+        return self._ring.name
+
+    def publish(self, data: EyeTrackingData) -> None:
+        if data.intrinsics is not self._intrinsics:
+            # Only bump the version if the values actually changed
+            key = intrinsics_key(data.intrinsics)
+            if key != self._intrinsics_key:
+                self._intrinsics_version = self._ring.write_intrinsics(data.intrinsics)
+                self._intrinsics_key = key
+            self._intrinsics = data.intrinsics
+        self._ring.put(data, self._intrinsics_version)
+
+    def fail(self, error: Exception) -> None:
+        """Stop subscribers with `error`, no more samples will be published."""
+        self._ring.mark_closed(f"{type(error).__name__}: {error}")
+
+    def close(self) -> None:
+        self._stop_event.set()
+        if not self._ring.closed:
+            self._ring.mark_closed()
+        self.source.close()
+        # Sources blocked waiting for data that will never arrive are left behind
+        self._thread.join(timeout=1.0)
+        self._ring.close()
+
+
+class SharedMemorySource(EyeTrackingSource):
+    """Reads the samples of a `SamplePublisher` running in another process.
+
+    Scene and eye images are views into shared memory, no pixels are copied. A view
+    stays valid until the publisher wrapped around the ring, i.e. for `capacity - 1`
+    further samples. Copy images that need to be kept longer.
+    """
+
+    def __init__(self, name: str, timeout: float | None = 5.0):
+        """Attach to a publisher.
+
+        Args:
+            name: Shared memory name of the publisher, see `SamplePublisher.name`.
+            timeout: Seconds to wait for a new sample before giving up, None to wait
+                forever.
+
+        """
+        super().__init__()
+        self.timeout = timeout
+        self._ring = SharedSampleRing.attach(name)
+        self._count = 0
+        self._intrinsics: CameraRadial | None = None
+        self._intrinsics_version = 0
+
+    @property
+    def scene_intrinsics(self) -> CameraRadial:
+        self._update_intrinsics(self._ring.intrinsics_version)
+        if self._intrinsics is None:
+            raise RuntimeError("Publisher did not share scene intrinsics yet.")
+        return self._intrinsics
+
+    def _update_intrinsics(self, version: int) -> None:
+        if version <= self._intrinsics_version:
+            return
+        intrinsics = self._ring.read_intrinsics()
+        if intrinsics is not None:
+            self._intrinsics_version, self._intrinsics = intrinsics
+
+    def _wait(self, position: int) -> int:
+        # Returns `position` if the publisher was closed and published nothing newer
+        count = self._ring.wait(position, self.timeout)
+        if count > position:
+            return count
+        error = self._ring.error
+        if error is not None:
+            raise RuntimeError(f"Publisher failed with {error}")
+        if self._ring.closed:
+            return position
+        raise TimeoutError("No new sample from the publisher.")
+
+    def get_sample(self) -> EyeTrackingData:
+        """Return the newest sample, waiting for one newer than the previous one.
+
+        Raises:
+            TimeoutError: If no new sample arrived within `timeout` seconds.
+            RuntimeError: If the publisher was closed or failed.
+
+        """
+        while True:
+            count = self._wait(self._count)
+            if count == self._count:
+                raise RuntimeError("Publisher closed.")
+            self._count = count
+            data = self._sample_at(self._count - 1)
+            if data is not None:
+                return data
+
+    def samples(self, strict: bool = False) -> Iterator[EyeTrackingData]:
+        """Yield every sample published from now on in order.
+
+        Samples that the publisher overwrote before they were read count as lost,
+        see `EyeTrackingSource.samples`. Iteration ends when the publisher is closed.
+
+        Raises:
+            TimeoutError: If no new sample arrived within `timeout` seconds.
+            RuntimeError: If the publisher failed.
+
+        """
+        position = self._ring.count
+        while True:
+            end = self._wait(position)
+            if end == position:
+                return
+            first = max(position, end - self._ring.capacity)
+            data = self._sample_at(first)
+            while data is None:
+                # Overwritten while reading, skip past the slot being written
+                first = max(first, self._ring.count - self._ring.capacity + 1)
+                data = self._sample_at(first)
+            if first > position:
+                self._report_lost(first - position, strict)
+            self._count = position = first + 1
+            yield data
+
+    def _sample_at(self, position: int) -> EyeTrackingData | None:
+        sample = self._ring.read(position)
+        if sample is None:
+            return None
+
+        metadata, scene_image, eye_image = sample
+        ts = int(metadata["time"])
+        self.latency.record_age(DEQUEUE, ts)
+        self._update_intrinsics(int(metadata["intrinsics_version"]))
+        return EyeTrackingData(
+            time=ts,
+            gaze_scene_distorted=np.array(metadata["gaze"], dtype=np.float64),
+            scene_image_distorted=scene_image,
+            intrinsics=self.scene_intrinsics,
+            undistortion_maps=self.undistortion_maps,
+            latency=self.latency,
+            buffer_pool=self.buffer_pool,
+            eye_image=eye_image,
+        )
+
+    def close(self) -> None:
+        self._ring.close()
@@ -0,0 +1,324 @@
+import time
+import weakref
+from collections.abc import Callable
+from threading import Condition, Lock
+from typing import Generic, NamedTuple, TypeVar
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+T = TypeVar("T")
+
+
+class LatestSlot(Generic[T]):
+    """Single item slot that is overwritten by every new item.
+
+    Producers never block, consumers get the freshest item and only wait if they
+    have seen it already.
+    """
+
+    def __init__(self) -> None:
+        self._condition = Condition()
+        self._item: T | None = None
+        self._count = 0
+        self._put_time = 0.0
+
+    @property
+    def count(self) -> int:
+        """Total number of items put since creation."""
+        return self._count
+
+    def put(self, item: T) -> None:
+        with self._condition:
+            self._item = item
+            self._count += 1
+            self._put_time = time.monotonic()
+            self._condition.notify_all()
+
+    def get(self, count: int = 0, timeout: float | None = None) -> tuple[T, int] | None:
+        """Return the latest item once more than `count` items have been put in total.
+
+        Returns the item together with the total number of items put so far, which
+        can be passed to the next call to wait for a newer item. Returns None if no
+        newer item arrived within `timeout` seconds.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._count > count, timeout):
+                return None
+            assert self._item is not None
+            return self._item, self._count
+
+    @property
+    def age(self) -> float | None:
+        """Seconds since the latest item was put, None if the slot is empty."""
+        if self._item is None:
+            return None
+        return time.monotonic() - self._put_time
+
+
+class RingBuffer(Generic[T]):
+    """Fixed capacity buffer that overwrites the oldest item when full.
+
+    Items are expected to be put in chronological order. Producers never block and
+    consumers only ever copy the references they ask for, so there is no need to
+    drain the buffer to get to the newest items.
+    """
+
+    def __init__(self, capacity: int, timestamp_of: Callable[[T], float] | None = None):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._timestamp_of = timestamp_of
+        self._items: list[T | None] = [None] * capacity
+        self._count = 0
+        self._condition = Condition()
+
+    @property
+    def count(self) -> int:
+        """Total number of items put since creation."""
+        return self._count
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    def put(self, item: T) -> None:
+        with self._condition:
+            self._items[self._count % self.capacity] = item
+            self._count += 1
+            self._condition.notify_all()
+
+    def wait(self, count: int, timeout: float | None = None) -> int:
+        """Wait until more than `count` items have been put in total.
+
+        Returns the total number of items put so far, which can be passed to the next
+        call to wait for the next new item.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._count > count, timeout)
+            return self._count
+
+    def latest(self, n: int = 1) -> list[T]:
+        """Return up to `n` of the newest items, oldest first."""
+        return self.read(n)[0]
+
+    def read(self, n: int = 1) -> tuple[list[T], int]:
+        """Like `latest`, but also return the total count the items end at."""
+        with self._condition:
+            end = self._count
+            start = max(end - min(n, self.capacity), 0)
+            items = [self._items[i % self.capacity] for i in range(start, end)]
+        return items, end  # type: ignore[return-value]
+
+    def since(self, timestamp: float) -> list[T]:
+        """Return all buffered items newer than `timestamp`, oldest first."""
+        if self._timestamp_of is None:
+            raise TypeError("RingBuffer was created without timestamp_of")
+
+        items = self.latest(self.capacity)
+        for index, item in enumerate(items):
+            if self._timestamp_of(item) > timestamp:
+                return items[index:]
+        return []
+
+
+class FrameCounters(NamedTuple):
+    captured: int
+    """Frames put into the buffer since creation."""
+    dropped: int
+    """Frames overwritten before the consumer got to read them."""
+    skipped: int
+    """Frames still buffered but passed over by the consumer for newer ones."""
+    depth: int
+    """Frames currently buffered and not read yet."""
+
+
+class ReadTracker:
+    """Accounts for the items of a ring buffer its consumer never read.
+
+    The consumer reports the range of items it read by their position in the total
+    count of items put. Unread items before that range were either overwritten
+    already, when they are older than the buffer's capacity, or skipped.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.position = 0
+        self.dropped = 0
+        self.skipped = 0
+
+    def read(self, start: int, stop: int, end: int | None = None) -> None:
+        """Account for reading the items from `start` up to but excluding `stop`.
+
+        `end` is the buffer's total count at the time of reading, if newer items
+        than the read ones were buffered already.
+        """
+        if end is None:
+            end = stop
+        unread = start - self.position
+        if unread > 0:
+            # The buffer holds at most `capacity` items up to `end`
+            dropped = min(max(end - self.capacity - self.position, 0), unread)
+            self.dropped += dropped
+            self.skipped += unread - dropped
+        self.position = max(self.position, stop)
+
+    def counters(self, count: int) -> FrameCounters:
+        """Counters given the buffer's current total `count`."""
+        return FrameCounters(
+            captured=count,
+            dropped=self.dropped + max(count - self.capacity - self.position, 0),
+            skipped=self.skipped,
+            depth=min(count - self.position, self.capacity),
+        )
+
+
+class PoolCounters(NamedTuple):
+    hits: int
+    """Arrays handed out that were reused."""
+    misses: int
+    """Arrays handed out that had to be allocated."""
+    pooled: int
+    """Arrays currently owned by the pool, in use or not."""
+    pooled_bytes: int
+    """Bytes of the arrays currently owned by the pool."""
+    in_use: int
+    """Pooled arrays currently handed out and not returned yet."""
+
+
+class _Lease:
+    # Arrays handed out are based on their lease, which thereby lives as long as the
+    # array or any view of it does
+    __slots__ = ("__array_interface__", "__weakref__", "_array")
+
+    def __init__(self, array: npt.NDArray):
+        self._array = array
+        self.__array_interface__ = array.__array_interface__
+
+
+class _Pooled:
+    __slots__ = ("array", "in_use", "released")
+
+    def __init__(self, array: npt.NDArray):
+        self.array = array
+        self.in_use = False
+        self.released = time.monotonic()
+
+    def lease(self) -> npt.NDArray:
+        self.in_use = True
+        lease = _Lease(self.array)
+        weakref.finalize(lease, self.release).atexit = False
+        return np.asarray(lease)
+
+    def release(self) -> None:
+        # May run on any thread, but only ever after `lease` marked it in use
+        self.released = time.monotonic()
+        self.in_use = False
+
+
+class BufferPool:
+    """Recycles image arrays so that samples do not allocate new ones.
+
+    Arrays handed out by `acquire` return to the pool once they and all views of
+    them have been released, e.g. once the sample holding them is. The pool keeps up
+    to `capacity` arrays per shape and type and up to `max_bytes` in total, which
+    should cover the samples a stream keeps alive at once. Beyond that, arrays are
+    allocated as usual and left to the garbage collector. Arrays that were not
+    handed out for `max_idle` seconds are released as well, e.g. the ones of an
+    image size that is not used anymore.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 8,
+        max_bytes: int = 256 * 1024**2,
+        max_idle: float = 10.0,
+    ):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.max_idle = max_idle
+        self._arrays: dict[tuple[tuple[int, ...], str], list[_Pooled]] = {}
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._bytes = 0
+        self._next_release = time.monotonic() + max_idle
+
+    def acquire(
+        self, shape: tuple[int, ...], dtype: npt.DTypeLike = np.uint8
+    ) -> npt.NDArray:
+        """Return an array of the given shape and type with undefined contents."""
+        key = (tuple(shape), np.dtype(dtype).str)
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_release:
+                self._release_idle(now)
+
+            arrays = self._arrays.setdefault(key, [])
+            for pooled in arrays:
+                if not pooled.in_use:
+                    self._hits += 1
+                    return pooled.lease()
+
+            self._misses += 1
+            array = np.empty(shape, dtype)
+            if (
+                len(arrays) < self.capacity
+                and self._bytes + array.nbytes <= self.max_bytes
+            ):
+                pooled = _Pooled(array)
+                arrays.append(pooled)
+                self._bytes += array.nbytes
+                return pooled.lease()
+            return array
+
+    def _release_idle(self, now: float) -> None:
+        for key, arrays in list(self._arrays.items()):
+            kept = []
+            for pooled in arrays:
+                if pooled.in_use or now - pooled.released < self.max_idle:
+                    kept.append(pooled)
+                else:
+                    self._bytes -= pooled.array.nbytes
+            if kept:
+                self._arrays[key] = kept
+            else:
+                del self._arrays[key]
+        self._next_release = now + self.max_idle / 2
+
+    def counters(self) -> PoolCounters:
+        with self._lock:
+            pooled = [pooled for arrays in self._arrays.values() for pooled in arrays]
+            return PoolCounters(
+                hits=self._hits,
+                misses=self._misses,
+                pooled=len(pooled),
+                pooled_bytes=self._bytes,
+                in_use=sum(entry.in_use for entry in pooled),
+            )
+
+
+def bgr_image(
+    image: npt.NDArray[np.uint8], pool: BufferPool | None = None
+) -> npt.NDArray[np.uint8]:
+    """Like `Frame.bgr`, converting gray images into an array of `pool`."""
+    if image.ndim == 3 and image.shape[2] == 3:
+        return image
+    if image.ndim != 2:
+        raise ValueError("Unsupported image format for BGR conversion")
+    dst = None if pool is None else pool.acquire((*image.shape, 3))
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR, dst=dst)  # type: ignore[return-value]
+
+
+def gray_image(
+    image: npt.NDArray[np.uint8], pool: BufferPool | None = None
+) -> npt.NDArray[np.uint8]:
+    """Like `Frame.gray`, converting color images into an array of `pool`."""
+    if image.ndim == 2:
+        return image
+    if image.ndim != 3 or image.shape[2] != 3:
+        raise ValueError("Unsupported image format for grayscale conversion")
+    dst = None if pool is None else pool.acquire(image.shape[:2])
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=dst)  # type: ignore[return-value]
@@ -1,20 +1,117 @@
+import time
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
 from functools import cached_property
+from pathlib import Path
+from threading import RLock
+from typing import Any, Generic, NamedTuple, TypeVar
 
+import cv2
 import numpy as np
 import numpy.typing as npt
 
 from pupil_labs.camera import CameraRadial
 
+from .buffers import BufferPool, PoolCounters
+from .latency import UNDISTORTION, LatencyRecorder, LatencyStats
+from .undistortion import UndistortionMaps
+
+Image = npt.NDArray[np.uint8]
+
+T = TypeVar("T")
+
+
+class LazyImage:
+    """Dataclass field holding either an image or a function producing it.
+
+    The function is called on first access and its result replaces it, so images
+    that are never looked at are never decoded. See `install`.
+    """
+
+    @classmethod
+    def install(cls, owner: type, name: str) -> None:
+        """Make the field `name` of the dataclass `owner` lazy.
+
+        Has to be called once the dataclass has been created, which would otherwise
+        take the descriptor for the field's default value.
+        """
+        descriptor = cls()
+        descriptor.__set_name__(owner, name)
+        setattr(owner, name, descriptor)
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._attribute = f"_{name}"
+
+    def __get__(self, obj: Any, objtype: type | None = None) -> Image:
+        if obj is None:
+            # No default value for the dataclass field
+            raise AttributeError
+        image: Image | Callable[[], Image] = obj.__dict__[self._attribute]
+        if callable(image):
+            with obj._lock:
+                image = obj.__dict__[self._attribute]
+                if callable(image):
+                    image = image()
+                    obj.__dict__[self._attribute] = image
+        return image
+
+    def __set__(self, obj: Any, value: Image | Callable[[], Image]) -> None:
+        obj.__dict__[self._attribute] = value
+
+    @staticmethod
+    def is_loaded(obj: Any, name: str) -> bool:
+        return not callable(obj.__dict__[f"_{name}"])
+
+
+class SharedProperty(Generic[T]):
+    """Cached property that is computed at most once, even with concurrent access.
+
+    Unlike `functools.cached_property`, concurrent first accesses only wait for each
+    other on the same instance, never on other instances.
+    """
+
+    def __init__(self, func: Callable[[Any], T]):
+        self.func = func
+        self.__doc__ = func.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._attribute = name
+
+    def __get__(self, obj: Any, objtype: type | None = None) -> T:
+        if obj is None:
+            return self  # type: ignore[return-value]
+        with obj._lock:
+            # Once cached, the instance attribute takes precedence over this
+            if self._attribute not in obj.__dict__:
+                obj.__dict__[self._attribute] = self.func(obj)
+            value: T = obj.__dict__[self._attribute]
+            return value
+
+
+class ImageRegion(NamedTuple):
+    """Part of an image."""
+
+    image: Image
+    """Pixels of the region."""
+
+    offset: tuple[int, int]
+    """Position of the region's top left pixel in the full image as (x, y)."""
+
 
 @dataclass
 class EyeTrackingData:
     time: int
-    """Timestamp of the data sample in nanoseconds."""
+    """Capture time of the scene image in Unix nanoseconds."""
+
+    scene_image_distorted: Image | Callable[[], Image] = field(
+        repr=False, compare=False
+    )
+    """Raw and distorted scene image.
 
-    scene_image_distorted: npt.NDArray[np.uint8]
-    """Raw and distorted scene image."""
+    Sources may pass a function instead of the image, which is then decoded on first
+    access. Reading the attribute always returns the image.
+    """
 
     gaze_scene_distorted: npt.NDArray[np.float64]
     """Gaze point in distorted scene image coordinates"""
@@ -22,30 +119,272 @@ class EyeTrackingData:
     intrinsics: CameraRadial
     """Intrinsics of the scene camera."""
 
-    eye_image: npt.NDArray[np.uint8]
-    """Raw eye image."""
+    eye_image: npt.NDArray[np.uint8] | None
+    """Raw eye image, None for sources without eye camera images."""
 
-    @cached_property
+    undistortion_maps: UndistortionMaps | None = field(default=None, repr=False)
+    """Precomputed undistortion tables shared by all samples of a source."""
+
+    latency: LatencyRecorder | None = field(default=None, repr=False)
+    """Latency recorder of the source the sample originates from."""
+
+    buffer_pool: BufferPool | None = field(default=None, repr=False)
+    """Pool derived images are allocated from, shared by all samples of a source."""
+
+    _lock: RLock = field(default_factory=RLock, init=False, repr=False, compare=False)
+    _resized_undistorted: dict[tuple[int, int], Image] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    @property
+    def _scene_image(self) -> Image:
+        # `scene_image_distorted` decodes on access and never returns the function
+        image = self.scene_image_distorted
+        assert not callable(image)
+        return image
+
+    @property
+    def scene_image_decoded(self) -> bool:
+        """Whether the scene image has been decoded already."""
+        return LazyImage.is_loaded(self, "scene_image_distorted")
+
+    @SharedProperty
     def scene_image_undistorted(self) -> npt.NDArray[np.uint8]:
         """Undistorted scene image."""
-        return self.intrinsics.undistort_image(self.scene_image_distorted)
+        start = time.perf_counter()
+        if self.undistortion_maps is None:
+            image = self.intrinsics.undistort_image(self._scene_image)
+        else:
+            distorted = self._scene_image
+            width, height = self.undistortion_maps.size
+            image = self.undistortion_maps.undistort_image(
+                distorted, out=self._acquire((height, width, *distorted.shape[2:]))
+            )
+        if self.latency is not None:
+            self.latency.record_since(UNDISTORTION, start)
+        return image
 
-    @cached_property
+    def scene_image_undistorted_at(self, size: tuple[int, int]) -> Image:
+        """Undistorted scene image resized to `size` as (width, height).
+
+        Undistorting and resizing is a single remap at the output resolution, which
+        is much cheaper than resizing `scene_image_undistorted` for display. Results
+        are cached per size.
+        """
+        size = (int(size[0]), int(size[1]))
+        with self._lock:
+            resized = self._resized_undistorted.get(size)
+            if resized is not None:
+                return resized
+
+            start = time.perf_counter()
+            if self.undistortion_maps is None:
+                resized = np.asarray(
+                    cv2.resize(
+                        self.scene_image_undistorted, size, interpolation=cv2.INTER_AREA
+                    )
+                )
+            else:
+                distorted = self._scene_image
+                resized = self.undistortion_maps.undistort_image(
+                    distorted,
+                    size,
+                    out=self._acquire((size[1], size[0], *distorted.shape[2:])),
+                )
+            if self.latency is not None:
+                self.latency.record_since(UNDISTORTION, start)
+            self._resized_undistorted[size] = resized
+            return resized
+
+    def scene_region_undistorted(self, size: tuple[int, int]) -> ImageRegion:
+        """Undistorted region of the scene image of `size` around the gaze point.
+
+        The region is centered on `gaze_scene_undistorted` and shifted as needed to
+        stay within the image. Without a valid gaze point, e.g. NaN while the eyes
+        are closed, the region is centered on the image. Only the region is
+        undistorted, unless the full undistorted image is available already.
+
+        Args:
+            size: Width and height of the region, at most the image's size.
+
+        """
+        full_width = self.intrinsics.pixel_width
+        full_height = self.intrinsics.pixel_height
+        width = min(int(size[0]), full_width)
+        height = min(int(size[1]), full_height)
+        gaze = np.asarray(self.gaze_scene_undistorted, dtype=np.float64).reshape(2)
+        if not np.isfinite(gaze).all():
+            gaze = np.array([full_width / 2, full_height / 2])
+        gaze_x, gaze_y = gaze
+        x = int(np.clip(round(gaze_x - width / 2), 0, full_width - width))
+        y = int(np.clip(round(gaze_y - height / 2), 0, full_height - height))
+
+        if "scene_image_undistorted" in self.__dict__ or self.undistortion_maps is None:
+            image = self.scene_image_undistorted[y : y + height, x : x + width]
+            return ImageRegion(image, (x, y))
+
+        start = time.perf_counter()
+        image = self.undistortion_maps.undistort_region(
+            self._scene_image, (x, y), (width, height)
+        )
+        if self.latency is not None:
+            self.latency.record_since(UNDISTORTION, start)
+        return ImageRegion(image, (x, y))
+
+    def _acquire(self, shape: tuple[int, ...]) -> Image | None:
+        if self.buffer_pool is None:
+            return None
+        return self.buffer_pool.acquire(shape)
+
+    @SharedProperty
     def gaze_scene_undistorted(self) -> npt.NDArray[np.float64]:
         """Gaze point in undistorted scene image coordinates"""
         return self.intrinsics.undistort_points(self.gaze_scene_distorted)
 
 
-class EyeTrackingSource(ABC):
+LazyImage.install(EyeTrackingData, "scene_image_distorted")
+
+
+class GazeBatch(NamedTuple):
+    """Consecutive gaze samples as columns."""
+
+    time: npt.NDArray[np.int64]
+    """Capture times in Unix nanoseconds."""
+
+    x: npt.NDArray[np.float64]
+    """Horizontal gaze coordinates in scene image pixels."""
+
+    y: npt.NDArray[np.float64]
+    """Vertical gaze coordinates in scene image pixels."""
+
+    @classmethod
+    def from_points(cls, times: npt.ArrayLike, points: npt.ArrayLike) -> "GazeBatch":
+        """Create a batch from timestamps and gaze points of shape (N, 2)."""
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        return cls(
+            np.asarray(times, dtype=np.int64),
+            np.ascontiguousarray(points[:, 0]),
+            np.ascontiguousarray(points[:, 1]),
+        )
+
+    def undistort(self, intrinsics: CameraRadial) -> "GazeBatch":
+        """Gaze in undistorted scene image coordinates, all points at once."""
+        if len(self.time) == 0:
+            return self
+        points = intrinsics.undistort_points(np.column_stack([self.x, self.y]))
+        return GazeBatch.from_points(self.time, points)
+
+
+class SampleOverflowError(RuntimeError):
+    """Samples were lost because the consumer could not keep up."""
+
+
+class SceneCameraSource(ABC):
+    """Scene camera state shared by blocking and asynchronous sources."""
+
+    undistortion_cache_dir: Path | None = None
+    """Directory to persist undistortion tables in across restarts."""
+
+    undistortion_bands: int = 1
+    """Number of bands scene images are undistorted in parallel in.
+
+    See `UndistortionMaps`, a good value is the number of CPU cores to spare.
+    """
+
+    _undistortion_maps: UndistortionMaps | None = None
+    _latency: LatencyRecorder | None = None
+    _buffer_pool: BufferPool | None = None
+
+    buffer_pool_capacity: int = 16
+    """Number of images per size `buffer_pool` recycles at most."""
+
     @cached_property
     @abstractmethod
     def scene_intrinsics(self) -> CameraRadial:
         pass
 
+    @property
+    def undistortion_maps(self) -> UndistortionMaps:
+        """Undistortion tables for the current scene intrinsics.
+
+        The same tables are handed to every sample. They are replaced when the scene
+        intrinsics change.
+        """
+        maps = self._undistortion_maps
+        if maps is None or not maps.matches(self.scene_intrinsics):
+            maps = UndistortionMaps(self.scene_intrinsics, self.undistortion_cache_dir)
+            self._undistortion_maps = maps
+        maps.bands = self.undistortion_bands
+        return maps
+
+    @property
+    def latency(self) -> LatencyRecorder:
+        """Latency measurements of the stages samples of this source go through."""
+        if self._latency is None:
+            self._latency = LatencyRecorder()
+        return self._latency
+
+    @property
+    def buffer_pool(self) -> BufferPool:
+        """Pool the images of this source's samples are allocated from.
+
+        Images are recycled once their samples are released, see `BufferPool`.
+        """
+        if self._buffer_pool is None:
+            self._buffer_pool = BufferPool(self.buffer_pool_capacity)
+        return self._buffer_pool
+
+    def buffer_counters(self) -> PoolCounters:
+        """Hits and misses of `buffer_pool`."""
+        return self.buffer_pool.counters()
+
+    def stats(self) -> dict[str, LatencyStats]:
+        """Latency percentiles and counts per stage, see `LatencyRecorder`."""
+        return self.latency.stats()
+
+
+class EyeTrackingSource(SceneCameraSource):
+    lost_samples: int = 0
+    """Samples lost while iterating over `samples`."""
+
     @abstractmethod
     def get_sample(self) -> EyeTrackingData:
         pass
 
+    def samples(self, strict: bool = False) -> Iterator[EyeTrackingData]:
+        """Yield every captured sample in order, unlike the latest-only `get_sample`.
+
+        Sources buffer a bounded number of samples. If the consumer falls behind
+        further than that, the overwritten samples are counted in `lost_samples`.
+
+        This default implementation calls `get_sample` in a loop and is only lossless
+        for sources whose `get_sample` never skips samples.
+
+        Args:
+            strict: Raise `SampleOverflowError` when samples are lost instead of
+                only counting them.
+
+        """
+        while True:
+            yield self.get_sample()
+
+    def _report_lost(self, count: int, strict: bool) -> None:
+        self.lost_samples += count
+        if strict:
+            raise SampleOverflowError(f"{count} samples were lost.")
+
+    def get_gaze(self, undistort: bool = False) -> GazeBatch:
+        """Return all gaze samples since the previous call at the full gaze rate.
+
+        Gaze is independent of scene frames, no scene images are decoded. Sources
+        only buffer a limited amount of gaze, so callers need to call regularly.
+
+        Args:
+            undistort: Return gaze in undistorted scene image coordinates.
+
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no gaze stream.")
+
     @abstractmethod
     def close(self):
         pass
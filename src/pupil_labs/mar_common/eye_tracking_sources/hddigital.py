@@ -1,9 +1,11 @@
+from collections.abc import Iterator
 from functools import cached_property
-from time import time
 
 import numpy as np
+import uvc
 
 from pupil_labs.camera import CameraRadial
+from pupil_labs.neon_usb import Frame
 from pupil_labs.neon_usb.cameras.backend import UVCBackend
 from pupil_labs.neon_usb.cameras.camera import CameraSpec
 
@@ -11,6 +13,10 @@ from . import (
     EyeTrackingData,
     EyeTrackingSource,
 )
+from .alignment import ClockOffset
+from .buffers import bgr_image
+from .latency import CAPTURE
+from .mjpeg import get_uvc_frame
 
 
 class HDDigitalCam(UVCBackend):
@@ -29,10 +35,15 @@ class HDDigitalCam(UVCBackend):
         controls["Auto Exposure Mode"].value = 1
         controls["Absolute Exposure Time"].value = 10
 
+    def get_frame(self) -> Frame:
+        # Decoding is deferred to the first access of the image
+        return get_uvc_frame(self)
+
 
 class HDDigital(EyeTrackingSource):
     def __init__(self):
         self._cam = HDDigitalCam()
+        self._clock = ClockOffset(uvc.get_time_monotonic)
 
     @cached_property
     def scene_intrinsics(
@@ -48,16 +59,36 @@ class HDDigital(EyeTrackingSource):
         )
 
     def get_sample(self) -> EyeTrackingData:
-        frame = self._cam.get_frame()
-        img = frame.bgr
-        timestamp = int(time() * 1e9)  # convert to nanoseconds
+        return self._sample_from(self._cam.get_frame())
+
+    def samples(self, strict: bool = False) -> Iterator[EyeTrackingData]:
+        """Yield every frame of the camera in order, see `EyeTrackingSource.samples`.
+
+        Frames are read from the camera directly. Frames that the camera dropped
+        because the consumer fell behind are detected by gaps in the frame index
+        and counted in `lost_samples`.
+        """
+        last_index: int | None = None
+        while True:
+            frame = self._cam.get_frame()
+            if last_index is not None and frame.index > last_index + 1:
+                self._report_lost(frame.index - last_index - 1, strict)
+            last_index = frame.index
+            yield self._sample_from(frame)
+
+    def _sample_from(self, frame: Frame) -> EyeTrackingData:
+        timestamp = self._clock.to_unix_ns(frame.timestamp)
+        self.latency.record_age(CAPTURE, timestamp)
         gaze = np.array([0, 0], dtype=np.float64)
 
         return EyeTrackingData(
             time=timestamp,
             gaze_scene_distorted=gaze,
-            scene_image_distorted=img,
+            scene_image_distorted=lambda: bgr_image(frame.img, self.buffer_pool),
             intrinsics=self.scene_intrinsics,
+            undistortion_maps=self.undistortion_maps,
+            latency=self.latency,
+            buffer_pool=self.buffer_pool,
             eye_image=None,
         )
 
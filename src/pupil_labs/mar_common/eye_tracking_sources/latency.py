@@ -0,0 +1,103 @@
+import time
+from threading import Lock
+from typing import NamedTuple
+
+import numpy as np
+
+CAPTURE = "capture"
+"""Age of a scene frame when it arrived from the device."""
+EYE_CAPTURE = "eye_capture"
+"""Age of an eye frame when it arrived from the device."""
+ENQUEUE = "enqueue"
+"""Duration of putting a scene frame into the source's buffer."""
+EYE_ENQUEUE = "eye_enqueue"
+"""Duration of putting an eye frame into the source's buffer."""
+DEQUEUE = "dequeue"
+"""Age of a scene frame when `get_sample` took it from the buffer."""
+GAZE = "gaze"
+"""Duration of running the gaze pipeline on one batch of eye frames."""
+UNDISTORTION = "undistortion"
+"""Duration of undistorting a scene image."""
+UI = "ui"
+"""Age of a sample when it was handed to the UI."""
+
+STAGES = (CAPTURE, EYE_CAPTURE, ENQUEUE, EYE_ENQUEUE, DEQUEUE, GAZE, UNDISTORTION, UI)
+
+
+class LatencyStats(NamedTuple):
+    measurements: int
+    """Number of measurements recorded since creation or the last reset."""
+    p50: float
+    """Median of the retained measurements in seconds."""
+    p95: float
+    p99: float
+    max: float
+
+
+class LatencyRecorder:
+    """Records latencies of the stages of a sample's way through a source.
+
+    Ages are measured against the capture time of a sample, so consecutive age
+    stages show where delay accumulates. Durations measure a single step.
+
+    Every stage keeps its most recent `capacity` measurements in a preallocated
+    ring, recording is a single array write. Percentiles are only computed when
+    `stats` is called.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        if capacity <= 0:
+            raise ValueError(f"capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._lock = Lock()
+        self._samples: dict[str, np.ndarray] = {}
+        self._counts: dict[str, int] = {}
+        for stage in STAGES:
+            self._add_stage(stage)
+
+    def _add_stage(self, stage: str) -> None:
+        self._samples[stage] = np.zeros(self.capacity, dtype=np.float64)
+        self._counts[stage] = 0
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            if stage not in self._samples:
+                self._add_stage(stage)
+            count = self._counts[stage]
+            self._samples[stage][count % self.capacity] = seconds
+            self._counts[stage] = count + 1
+
+    def record_since(self, stage: str, start: float) -> None:
+        """Record the duration since `start`, a `time.perf_counter` reading."""
+        self.record(stage, time.perf_counter() - start)
+
+    def record_age(self, stage: str, time_ns: int) -> None:
+        """Record the age of a sample captured at `time_ns` Unix nanoseconds."""
+        self.record(stage, (time.time_ns() - time_ns) / 1e9)
+
+    def stats(self) -> dict[str, LatencyStats]:
+        """Percentiles of all stages that have been measured at least once."""
+        with self._lock:
+            retained = {
+                stage: samples[: min(self._counts[stage], self.capacity)].copy()
+                for stage, samples in self._samples.items()
+                if self._counts[stage] > 0
+            }
+            counts = dict(self._counts)
+
+        stats = {}
+        for stage, samples in retained.items():
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            stats[stage] = LatencyStats(
+                measurements=counts[stage],
+                p50=float(p50),
+                p95=float(p95),
+                p99=float(p99),
+                max=float(samples.max()),
+            )
+        return stats
+
+    def reset(self) -> None:
+        with self._lock:
+            for stage in self._counts:
+                self._counts[stage] = 0
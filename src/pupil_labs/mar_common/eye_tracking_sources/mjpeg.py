@@ -0,0 +1,65 @@
+from functools import cached_property
+from typing import Any
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.neon_usb import Frame
+from pupil_labs.neon_usb.cameras.backend import UVCBackend
+
+
+class MJPEGFrame(Frame):
+    """Frame holding the compressed MJPEG payload of a UVC camera.
+
+    The image is decoded on first access of `img`, or of `bgr` and `gray` which are
+    based on it. Decoding uses OpenCV rather than the capture's own decoder, so
+    frames can safely be decoded on any thread.
+    """
+
+    def __init__(self, frame: Any):
+        """Wrap a frame returned by `uvc.Capture.get_frame`.
+
+        The payload is a view of the UVC frame's memory, so the frame is kept alive
+        until this one is released.
+        """
+        self._uvc_frame = frame
+        self.jpeg = frame.jpeg_buffer
+        self.timestamp = frame.timestamp
+        self.index = frame.index
+
+    @cached_property
+    def img(self) -> npt.NDArray[np.uint8]:  # type: ignore[override]
+        return np.asarray(
+            cv2.imdecode(np.frombuffer(self.jpeg, np.uint8), cv2.IMREAD_COLOR)
+        )
+
+
+def uvc_capture(backend: UVCBackend) -> Any:
+    """Return the `uvc.Capture` of a backend.
+
+    `UVCBackend` does not expose its capture publicly, this is the only place that
+    relies on its private `_uvc_capture` attribute.
+
+    Raises:
+        OSError: If the camera is not initialized.
+
+    """
+    capture = getattr(backend, "_uvc_capture", None)
+    if capture is None:
+        raise OSError("Camera not initialized!")
+    return capture
+
+
+def get_uvc_frame(backend: UVCBackend) -> Frame:
+    """Grab the next frame of a UVC camera without decoding it.
+
+    Unlike `UVCBackend.get_frame`, frames keep the time the camera finished
+    capturing them, on the clock of `uvc.get_time_monotonic`. Cameras that do not
+    stream MJPEG return regular, already decoded frames.
+    """
+    frame = uvc_capture(backend).get_frame(timeout=2.0)
+    backend.last_frame_timestamp = frame.timestamp
+    if getattr(frame, "jpeg_buffer", None) is None:
+        return Frame(frame.img, frame.timestamp, frame.index)
+    return MJPEGFrame(frame)
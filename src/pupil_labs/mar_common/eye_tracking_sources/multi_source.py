@@ -0,0 +1,158 @@
+from collections.abc import Mapping
+from threading import Condition, Event, Thread
+from typing import NamedTuple
+
+import numpy as np
+
+from . import (
+    EyeTrackingData,
+    EyeTrackingSource,
+)
+from .buffers import RingBuffer
+
+
+class SampleSet(NamedTuple):
+    time: int
+    """Reference time in Unix nanoseconds that all samples are aligned to."""
+
+    samples: dict[str, EyeTrackingData]
+    """Sample closest to `time` per source."""
+
+    offsets: dict[str, float]
+    """Seconds by which each sample's capture time differs from `time`."""
+
+
+def sample_time(data: EyeTrackingData) -> int:
+    return data.time
+
+
+def sample_receiver(
+    name: str,
+    source: EyeTrackingSource,
+    output_buffer: RingBuffer[EyeTrackingData],
+    new_sample: Condition,
+    stop_event: Event,
+    errors: dict[str, Exception],
+) -> None:
+    while not stop_event.is_set():
+        try:
+            data = source.get_sample()
+        except Exception as error:
+            if not stop_event.is_set():
+                errors[name] = error
+            with new_sample:
+                new_sample.notify_all()
+            break
+        output_buffer.put(data)
+        with new_sample:
+            new_sample.notify_all()
+
+
+class MultiSource:
+    """Captures from several sources at once and aligns their samples in time.
+
+    Every source is sampled continuously on its own thread, so capturing from N
+    devices takes as long as the slowest one instead of the sum of all. Sample sets
+    are aligned to the newest capture time that every source has reached, using the
+    sources' own timestamps.
+    """
+
+    def __init__(self, sources: Mapping[str, EyeTrackingSource], buffer_size: int = 30):
+        """Start capturing from all sources.
+
+        Args:
+            sources: Sources by name, e.g. one per headset. They are closed together
+                with the `MultiSource`.
+            buffer_size: Number of recent samples kept per source for alignment.
+
+        """
+        if not sources:
+            raise ValueError("At least one source is required.")
+        self.sources = dict(sources)
+
+        self._buffers = {
+            name: RingBuffer[EyeTrackingData](buffer_size, sample_time)
+            for name in self.sources
+        }
+        self._new_sample = Condition()
+        self._stop_event = Event()
+        self._errors: dict[str, Exception] = {}
+        self._last_time = -1
+
+        self._threads = [
+            Thread(
+                target=sample_receiver,
+                args=(
+                    name,
+                    source,
+                    self._buffers[name],
+                    self._new_sample,
+                    self._stop_event,
+                    self._errors,
+                ),
+                daemon=True,
+            )
+            for name, source in self.sources.items()
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _latest_times(self) -> dict[str, int]:
+        return {
+            name: buffer.latest()[-1].time
+            for name, buffer in self._buffers.items()
+            if len(buffer) > 0
+        }
+
+    def _reference_time(self) -> int:
+        latest_times = self._latest_times()
+        if len(latest_times) < len(self._buffers):
+            return -1
+        return min(latest_times.values())
+
+    def lag(self) -> dict[str, float]:
+        """Seconds each source's newest sample is behind the newest of all sources."""
+        latest_times = self._latest_times()
+        if not latest_times:
+            return {}
+        newest = max(latest_times.values())
+        return {name: (newest - time) / 1e9 for name, time in latest_times.items()}
+
+    def get_sample_set(self, timeout: float | None = None) -> SampleSet:
+        """Wait until all sources progressed and return their time aligned samples.
+
+        Raises:
+            TimeoutError: If no new sample set became available within `timeout`.
+            RuntimeError: If capturing from one of the sources failed.
+
+        """
+        with self._new_sample:
+            ready = self._new_sample.wait_for(
+                lambda: bool(self._errors) or self._reference_time() > self._last_time,
+                timeout,
+            )
+        for name, error in self._errors.items():
+            raise RuntimeError(f"Capturing from source {name} failed.") from error
+        if not ready:
+            raise TimeoutError("No new samples from all sources.")
+
+        reference_time = self._reference_time()
+        samples = {}
+        offsets = {}
+        for name, buffer in self._buffers.items():
+            candidates = buffer.latest(buffer.capacity)
+            times = np.array([data.time for data in candidates], dtype=np.int64)
+            closest = int(np.argmin(np.abs(times - reference_time)))
+            samples[name] = candidates[closest]
+            offsets[name] = (int(times[closest]) - reference_time) / 1e9
+
+        self._last_time = reference_time
+        return SampleSet(reference_time, samples, offsets)
+
+    def close(self) -> None:
+        self._stop_event.set()
+        for source in self.sources.values():
+            source.close()
+        for thread in self._threads:
+            # Sources blocked waiting for data that will never arrive are left behind
+            thread.join(timeout=1.0)
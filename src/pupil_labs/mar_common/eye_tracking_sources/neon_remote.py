@@ -1,18 +1,136 @@
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
 from functools import cached_property
+from threading import Event, Thread
+from typing import Any, TypeVar
 
 import numpy as np
 
 from pupil_labs.camera import CameraRadial
-from pupil_labs.realtime_api.simple import Device
+from pupil_labs.neon_recording.calib import Calibration
+from pupil_labs.realtime_api import Device as AsyncDevice
+from pupil_labs.realtime_api import (
+    VideoFrame,
+    receive_gaze_data,
+    receive_video_frames,
+)
+from pupil_labs.realtime_api.simple import Device, MatchedItem
+from pupil_labs.realtime_api.streaming.gaze import (
+    DualMonocularGazeData,
+    GazeDataType,
+)
 
 from . import (
     EyeTrackingData,
     EyeTrackingSource,
+    GazeBatch,
 )
+from .alignment import interpolate
+from .async_source import AsyncEyeTrackingSource
+from .buffers import LatestSlot, RingBuffer
+from .latency import CAPTURE, DEQUEUE, ENQUEUE, LatencyRecorder
+
+T = TypeVar("T")
+
+
+def matched_receiver(
+    device: Device,
+    output_slot: LatestSlot[MatchedItem],
+    stop_event: Event,
+    latency: LatencyRecorder | None = None,
+) -> None:
+    while not stop_event.is_set():
+        scene_and_gaze = device.receive_matched_scene_video_frame_and_gaze(
+            timeout_seconds=1 / 5
+        )
+        if scene_and_gaze is None:
+            continue
+        if latency is None:
+            output_slot.put(scene_and_gaze)
+            continue
+        latency.record_age(CAPTURE, scene_and_gaze.frame.timestamp_unix_ns)
+        start = time.perf_counter()
+        output_slot.put(scene_and_gaze)
+        latency.record_since(ENQUEUE, start)
+
+
+async def receive_stream(
+    stream: AsyncIterator[T],
+    output_buffer: RingBuffer[T],
+    stop_event: Event,
+) -> None:
+    async def receive() -> None:
+        async for item in stream:
+            output_buffer.put(item)
+
+    task = asyncio.create_task(receive())
+    while not stop_event.is_set() and not task.done():
+        await asyncio.wait({task}, timeout=1 / 5)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+def stream_receiver(
+    open_stream: Callable[[str], AsyncIterator[T]],
+    url: str,
+    output_buffer: RingBuffer[T],
+    stop_event: Event,
+    errors: list[Exception],
+) -> None:
+    # The simple API only keeps the newest item of every stream, read the streams
+    # themselves to receive every one of them
+    try:
+        asyncio.run(receive_stream(open_stream(url), output_buffer, stop_event))
+    except Exception as error:
+        errors.append(error)
+
+
+def gaze_time(gaze: GazeDataType) -> int:
+    return gaze.timestamp_unix_ns
+
+
+def frame_time(frame: VideoFrame) -> int:
+    return frame.timestamp_unix_ns
+
+
+def scene_intrinsics_from(calibration: Calibration) -> CameraRadial:
+    return CameraRadial(
+        pixel_width=1600,
+        pixel_height=1200,
+        camera_matrix=calibration.scene_camera_matrix,
+        distortion_coefficients=calibration.scene_distortion_coefficients,
+    )
+
+
+def gaze_point(gaze: GazeDataType) -> tuple[float, float]:
+    if isinstance(gaze, DualMonocularGazeData):
+        # Only a gaze point per eye is streamed, use the one in between
+        return (gaze.left.x + gaze.right.x) / 2, (gaze.left.y + gaze.right.y) / 2
+    return gaze.x, gaze.y
+
+
+def gaze_batch(gaze_data: list[GazeDataType]) -> GazeBatch:
+    return GazeBatch.from_points(
+        [gaze_time(gaze) for gaze in gaze_data],
+        [gaze_point(gaze) for gaze in gaze_data],
+    )
 
 
 class NeonRemote(EyeTrackingSource):
-    def __init__(self, ip_address: str, port: int):
+    def __init__(self, ip_address: str, port: int, threaded: bool = False):
+        """Connect to a Neon Companion device via the realtime API.
+
+        Args:
+            ip_address: Host or IP of the Companion device.
+            port: Port of the realtime API.
+            threaded: Receive data on a background thread. `get_sample` then
+                returns the most recent scene and gaze pair, only waiting if it
+                returned that pair already.
+
+        """
         super().__init__()
         try:
             device = Device(ip_address, port, start_streaming_by_default=True)
@@ -35,6 +153,31 @@ class NeonRemote(EyeTrackingSource):
         print("  Success.")
         self._device = device
 
+        self._gaze_buffer: RingBuffer[GazeDataType] | None = None
+        self._gaze_stream_time = -1
+        self._scene_buffer: RingBuffer[VideoFrame] | None = None
+        self._stream_stop_event = Event()
+        self._stream_errors: list[Exception] = []
+
+        self._receiver_slot: LatestSlot[MatchedItem] | None = None
+        self._receiver_count = 0
+        self._receiver_thread: Thread | None = None
+        if threaded:
+            self._receiver_slot = LatestSlot[MatchedItem]()
+            self._receiver_slot.put(data)
+            self._receiver_stop_event = Event()
+            self._receiver_thread = Thread(
+                target=matched_receiver,
+                args=(
+                    device,
+                    self._receiver_slot,
+                    self._receiver_stop_event,
+                    self.latency,
+                ),
+                daemon=True,
+            )
+            self._receiver_thread.start()
+
     @property
     def address(self) -> str:
         return self._device.address
@@ -45,31 +188,328 @@ class NeonRemote(EyeTrackingSource):
 
     @cached_property
     def scene_intrinsics(self) -> CameraRadial:
-        intrinsics = self._device.get_calibration()
-        return CameraRadial(
-            pixel_width=1600,
-            pixel_height=1200,
-            camera_matrix=intrinsics.camera_matrix,
-            distortion_coefficients=intrinsics.distortion_coefficients,
-        )
+        return scene_intrinsics_from(self._device.get_calibration())
+
+    @property
+    def sample_age(self) -> float | None:
+        """Seconds since the latest sample was received.
+
+        Only available in threaded mode, otherwise None.
+        """
+        if self._receiver_slot is None:
+            return None
+        return self._receiver_slot.age
 
     def get_sample(self) -> EyeTrackingData:
-        scene_and_gaze = self._device.receive_matched_scene_video_frame_and_gaze(
-            timeout_seconds=1 / 5
-        )
+        if self._receiver_slot is None:
+            scene_and_gaze = self._device.receive_matched_scene_video_frame_and_gaze(
+                timeout_seconds=1 / 5
+            )
+            if scene_and_gaze is not None:
+                self.latency.record_age(CAPTURE, scene_and_gaze.frame.timestamp_unix_ns)
+        else:
+            received = self._receiver_slot.get(self._receiver_count, timeout=1 / 5)
+            scene_and_gaze = None
+            if received is not None:
+                scene_and_gaze, self._receiver_count = received
         if scene_and_gaze is None:
             raise RuntimeError("No data received from Neon Remote device.")
 
         scene, gaze = scene_and_gaze
-        gaze = np.array([gaze.x, gaze.y], dtype=np.float64)
-        time = scene.timestamp_unix_ns
+        self.latency.record_age(DEQUEUE, scene.timestamp_unix_ns)
         return EyeTrackingData(
-            time=time,
-            gaze_scene_distorted=gaze,
+            time=scene.timestamp_unix_ns,
+            gaze_scene_distorted=np.array(gaze_point(gaze), dtype=np.float64),
             scene_image_distorted=scene.bgr_pixels,
             intrinsics=self.scene_intrinsics,
+            undistortion_maps=self.undistortion_maps,
+            latency=self.latency,
+            buffer_pool=self.buffer_pool,
+            eye_image=None,
+        )
+
+    def samples(self, strict: bool = False) -> Iterator[EyeTrackingData]:
+        """Yield every frame of the scene video stream in order.
+
+        The scene video and gaze streams are received on background threads that
+        are started by the first call, independently of `get_sample`. One second of
+        scene video is buffered, frames overwritten before they were read count as
+        lost, see `EyeTrackingSource.samples`. Gaze is interpolated to the capture
+        time of every frame. Iteration ends when the source is closed.
+
+        Raises:
+            RuntimeError: If receiving scene video or gaze failed.
+
+        """
+        if self._gaze_buffer is None:
+            self._gaze_buffer = self._start_gaze_receiver()
+        if self._scene_buffer is None:
+            self._scene_buffer = self._start_scene_receiver()
+            position = 0
+        else:
+            position = self._scene_buffer.count
+        gaze_buffer = self._gaze_buffer
+        scene_buffer = self._scene_buffer
+
+        while self._wait_for_stream(scene_buffer, position):
+            frames, end = scene_buffer.read(scene_buffer.capacity)
+            oldest = end - len(frames)
+            first = max(position, oldest)
+            if first > position:
+                self._report_lost(first - position, strict)
+            position = first + 1
+            if not self._wait_for_stream(gaze_buffer, 0):
+                return
+            yield self._sample_from_frame(frames[first - oldest], gaze_buffer)
+
+    def _wait_for_stream(self, buffer: RingBuffer[Any], count: int) -> bool:
+        # Returns False once the source is closed
+        while buffer.wait(count, timeout=1 / 5) == count:
+            for error in self._stream_errors:
+                raise RuntimeError("Neon Remote device stopped streaming.") from error
+            if self._stream_stop_event.is_set():
+                return False
+        return True
+
+    def _sample_from_frame(
+        self, frame: VideoFrame, gaze_buffer: RingBuffer[GazeDataType]
+    ) -> EyeTrackingData:
+        ts = frame.timestamp_unix_ns
+        self.latency.record_age(DEQUEUE, ts)
+        # Gaze from shortly before the frame on, or the newest if none is that recent
+        gaze_data = gaze_buffer.since(ts - 100_000_000) or gaze_buffer.latest(2)
+        gaze = gaze_batch(gaze_data)
+        return EyeTrackingData(
+            time=ts,
+            gaze_scene_distorted=interpolate(
+                gaze.time, np.column_stack([gaze.x, gaze.y]), ts
+            ),
+            scene_image_distorted=frame.bgr_buffer,
+            intrinsics=self.scene_intrinsics,
+            undistortion_maps=self.undistortion_maps,
+            latency=self.latency,
+            buffer_pool=self.buffer_pool,
             eye_image=None,
         )
 
+    def _start_gaze_receiver(self) -> RingBuffer[GazeDataType]:
+        gaze_sensor = self._device.gaze_sensor()
+        if gaze_sensor is None or gaze_sensor.url is None:
+            raise RuntimeError("Gaze stream of Neon Remote device not available.")
+
+        # Two seconds of gaze at 200 Hz
+        gaze_buffer = RingBuffer[GazeDataType](400, gaze_time)
+        self._gaze_thread = Thread(
+            target=stream_receiver,
+            args=(
+                receive_gaze_data,
+                gaze_sensor.url,
+                gaze_buffer,
+                self._stream_stop_event,
+                self._stream_errors,
+            ),
+            daemon=True,
+        )
+        self._gaze_thread.start()
+        return gaze_buffer
+
+    def _start_scene_receiver(self) -> RingBuffer[VideoFrame]:
+        scene_sensor = self._device.world_sensor()
+        if scene_sensor is None or scene_sensor.url is None:
+            raise RuntimeError("Scene camera of Neon Remote device not connected.")
+
+        # One second of scene video at 30 Hz
+        scene_buffer = RingBuffer[VideoFrame](30, frame_time)
+        self._scene_thread = Thread(
+            target=stream_receiver,
+            args=(
+                receive_video_frames,
+                scene_sensor.url,
+                scene_buffer,
+                self._stream_stop_event,
+                self._stream_errors,
+            ),
+            daemon=True,
+        )
+        self._scene_thread.start()
+        return scene_buffer
+
+    def get_gaze(self, undistort: bool = False) -> GazeBatch:
+        """Return all gaze received from the gaze stream since the previous call.
+
+        Every datum of the device's gaze stream is received on a background thread
+        that is started by the first call, which therefore returns little or no
+        gaze. The last two seconds are buffered.
+        """
+        if self._gaze_buffer is None:
+            self._gaze_buffer = self._start_gaze_receiver()
+
+        gaze_data = self._gaze_buffer.since(self._gaze_stream_time)
+        if gaze_data:
+            self._gaze_stream_time = gaze_time(gaze_data[-1])
+
+        gaze = gaze_batch(gaze_data)
+        return gaze.undistort(self.scene_intrinsics) if undistort else gaze
+
     def close(self):
+        self._stream_stop_event.set()
+        if self._gaze_buffer is not None:
+            self._gaze_thread.join()
+        if self._scene_buffer is not None:
+            self._scene_thread.join()
+        if self._receiver_thread is not None:
+            self._receiver_stop_event.set()
+            self._receiver_thread.join()
         self._device.close()
+
+
+class AsyncNeonRemote(AsyncEyeTrackingSource):
+    """Neon Companion device streamed with the realtime API's asyncio client.
+
+    Scene video and gaze are received by tasks on the running event loop, there is
+    no thread per device. Scene frames are only decoded when their image is
+    accessed. Use as `async with AsyncNeonRemote(ip, port) as source`, or call
+    `connect` and `close` explicitly.
+    """
+
+    def __init__(self, ip_address: str, port: int):
+        self.ip_address = ip_address
+        self.port = port
+        self._device: AsyncDevice | None = None
+        self._intrinsics: CameraRadial | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+
+        self._scene_frame: VideoFrame | None = None
+        self._new_scene_frame = asyncio.Event()
+        # Two seconds of gaze at 200 Hz
+        self._gaze_buffer = RingBuffer[GazeDataType](400, gaze_time)
+        self._first_gaze = asyncio.Event()
+        self._gaze_stream_time = -1
+
+    async def connect(self) -> None:
+        device = AsyncDevice(self.ip_address, self.port)
+        try:
+            status = await device.get_status()
+            calibration = await device.get_calibration()
+        except Exception:
+            await device.close()
+            raise
+
+        scene_sensor = status.direct_world_sensor()
+        gaze_sensor = status.direct_gaze_sensor()
+        scene_url = scene_sensor.url if scene_sensor is not None else None
+        gaze_url = gaze_sensor.url if gaze_sensor is not None else None
+        if scene_url is None:
+            await device.close()
+            raise RuntimeError("Scene camera of Neon Remote device not connected.")
+        if gaze_url is None:
+            await device.close()
+            raise RuntimeError("Gaze stream of Neon Remote device not available.")
+
+        self._intrinsics = scene_intrinsics_from(calibration)
+        self._device = device
+        self._tasks = [
+            asyncio.create_task(self._receive_scene(scene_url)),
+            asyncio.create_task(self._receive_gaze(gaze_url)),
+        ]
+
+    async def __aenter__(self) -> "AsyncNeonRemote":
+        await self.connect()
+        return self
+
+    @property
+    def scene_intrinsics(self) -> CameraRadial:
+        if self._intrinsics is None:
+            raise RuntimeError("Not connected, call connect first.")
+        return self._intrinsics
+
+    async def _receive_scene(self, url: str) -> None:
+        async for frame in receive_video_frames(url):
+            self.latency.record_age(CAPTURE, frame.timestamp_unix_ns)
+            self._scene_frame = frame
+            self._new_scene_frame.set()
+
+    async def _receive_gaze(self, url: str) -> None:
+        async for gaze in receive_gaze_data(url):
+            self._gaze_buffer.put(gaze)
+            self._first_gaze.set()
+
+    def _check_receivers(self) -> None:
+        if not self._tasks:
+            raise RuntimeError("Not connected, call connect first.")
+        for task in self._tasks:
+            if task.done():
+                error = None if task.cancelled() else task.exception()
+                raise RuntimeError("Neon Remote device stopped streaming.") from error
+
+    async def _wait_for(self, event: asyncio.Event) -> None:
+        # Stop waiting as well if a receiver task ended, it would never set `event`
+        self._check_receivers()
+        waiter = asyncio.create_task(event.wait())
+        try:
+            await asyncio.wait(
+                {waiter, *self._tasks}, return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            waiter.cancel()
+        if not event.is_set():
+            self._check_receivers()
+
+    async def get_sample(self) -> EyeTrackingData:
+        """Wait for the next scene frame and return it with interpolated gaze.
+
+        Raises:
+            RuntimeError: If not connected or receiving scene video or gaze failed.
+
+        """
+        # Wait for a new frame, like the blocking sources do
+        await self._wait_for(self._new_scene_frame)
+        self._new_scene_frame.clear()
+        await self._wait_for(self._first_gaze)
+
+        frame = self._scene_frame
+        assert frame is not None
+        ts = frame.timestamp_unix_ns
+        self.latency.record_age(DEQUEUE, ts)
+
+        # Gaze from shortly before the frame on, or the newest if none is that recent
+        gaze = gaze_batch(
+            self._gaze_buffer.since(ts - 100_000_000) or self._gaze_buffer.latest(2)
+        )
+        gaze_point = interpolate(gaze.time, np.column_stack([gaze.x, gaze.y]), ts)
+        return EyeTrackingData(
+            time=ts,
+            gaze_scene_distorted=gaze_point,
+            scene_image_distorted=frame.bgr_buffer,
+            intrinsics=self.scene_intrinsics,
+            undistortion_maps=self.undistortion_maps,
+            latency=self.latency,
+            buffer_pool=self.buffer_pool,
+            eye_image=None,
+        )
+
+    async def get_gaze(self, undistort: bool = False) -> GazeBatch:
+        """Return all gaze received since the previous call.
+
+        The last two seconds of gaze are buffered.
+
+        Raises:
+            RuntimeError: If not connected or receiving scene video or gaze failed.
+
+        """
+        self._check_receivers()
+        gaze_data = self._gaze_buffer.since(self._gaze_stream_time)
+        if gaze_data:
+            self._gaze_stream_time = gaze_time(gaze_data[-1])
+        gaze = gaze_batch(gaze_data)
+        return gaze.undistort(self.scene_intrinsics) if undistort else gaze
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        # Receivers that failed already raised from get_sample or get_gaze
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._device is not None:
+            await self._device.close()
+            self._device = None
@@ -1,10 +1,15 @@
-import contextlib
 import importlib
+import multiprocessing
 import queue
 import time
+from collections.abc import Callable, Iterator, Sequence
+from multiprocessing.synchronize import Event as ProcessEvent
 from threading import Event, Thread
+from typing import Any, NamedTuple
 
 import numpy as np
+import numpy.typing as npt
+import uvc
 
 from pupil_labs.camera import CameraRadial
 from pupil_labs.neon_usb import (
@@ -12,38 +17,149 @@ from pupil_labs.neon_usb import (
     Frame,
     SceneCamera,
 )
+from pupil_labs.neon_usb.cameras.backend import UVCBackend
 
 from . import (
     EyeTrackingData,
     EyeTrackingSource,
+    GazeBatch,
 )
+from .alignment import ClockOffset, closest_window, interpolate
+from .buffers import (
+    BufferPool,
+    FrameCounters,
+    ReadTracker,
+    RingBuffer,
+    bgr_image,
+    gray_image,
+)
+from .latency import (
+    CAPTURE,
+    DEQUEUE,
+    ENQUEUE,
+    EYE_CAPTURE,
+    EYE_ENQUEUE,
+    GAZE,
+    LatencyRecorder,
+)
+from .mjpeg import get_uvc_frame
+from .shared_memory import SharedFrameRing
 
+PIPELINE_BATCH_SIZE = 6
+FIRST_GAZE_TIMEOUT = 10.0
+"""Seconds to wait for the asynchronous gaze pipeline's first estimate."""
+STARTUP_POLL_INTERVAL = 0.1
+"""Seconds between checks whether a capture thread or process is still alive."""
+
+
+class GazeEstimate(NamedTuple):
+    gaze: npt.NDArray[np.float64]
+    """Gaze point in distorted scene image coordinates."""
+    time: int
+    """Capture time of the eye frame the estimate belongs to in Unix nanoseconds."""
+    eye_image: npt.NDArray[np.uint8]
+    """The eye frame the estimate belongs to."""
+
+
+def frame_timestamp(frame: Frame) -> float:
+    return frame.timestamp
+
+
+def eye_frame_time(frame: Frame) -> int:
+    # The eye camera stamps its frames with the system's wall clock
+    return int(frame.timestamp * 1e9)
 
-def get_all_items(q: queue.Queue[Frame]) -> list[Frame]:
-    """Retrieve all items from a queue and always at least one."""
-    items = []
-    # Need to get at least one item
-    # Otherwise the queue might be spammed with requests
-    items.append(q.get())
-    while True:
-        try:
-            items.append(q.get_nowait())
-        except queue.Empty:
-            break
-    return items
+
+def estimate_gaze(
+    pipeline: Any,
+    eye_frames: list[Frame],
+    latency: LatencyRecorder | None = None,
+    buffer_pool: BufferPool | None = None,
+) -> list[GazeEstimate]:
+    """Run the gaze pipeline on a batch of eye frames.
+
+    The pipeline returns either one estimate per eye frame or a single estimate for
+    the newest one. Eye images in color are converted to gray into arrays of
+    `buffer_pool`.
+    """
+    start = time.perf_counter()
+    gaze = np.atleast_2d(pipeline(eye_frames))
+    if latency is not None:
+        latency.record_since(GAZE, start)
+    return [
+        GazeEstimate(
+            frame_gaze, eye_frame_time(frame), gray_image(frame.img, buffer_pool)
+        )
+        for frame_gaze, frame in zip(gaze, eye_frames[-len(gaze) :], strict=True)
+    ]
+
+
+def estimate_gaze_since(
+    pipeline: Any,
+    eye_frames: list[Frame],
+    last_time: int,
+    latency: LatencyRecorder | None = None,
+    buffer_pool: BufferPool | None = None,
+) -> list[GazeEstimate]:
+    """Estimate gaze for all eye frames captured after `last_time`.
+
+    The new frames are processed in pipeline sized batches. The last batch is
+    filled up with preceding frames where available.
+    """
+    times = [eye_frame_time(frame) for frame in eye_frames]
+    first = next((i for i, t in enumerate(times) if t > last_time), len(times))
+    estimates: list[GazeEstimate] = []
+    for start in range(first, len(eye_frames), PIPELINE_BATCH_SIZE):
+        end = min(start + PIPELINE_BATCH_SIZE, len(eye_frames))
+        batch = eye_frames[max(end - PIPELINE_BATCH_SIZE, 0) : end]
+        for estimate in estimate_gaze(pipeline, batch, latency, buffer_pool):
+            if estimate.time > last_time:
+                estimates.append(estimate)
+                last_time = estimate.time
+    return estimates
+
+
+def gaze_at(
+    estimates: Sequence[GazeEstimate], time: int
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.uint8]]:
+    """Interpolate gaze to `time` and pick the eye image closest to it."""
+    times = np.array([estimate.time for estimate in estimates], dtype=np.int64)
+    gaze = interpolate(times, [estimate.gaze for estimate in estimates], time)
+    closest = estimates[int(np.argmin(np.abs(times - time)))]
+    return gaze, closest.eye_image
 
 
 def image_receiver(
     CameraClass: type[SceneCamera | EyeCamera],
     intrinsics_q: queue.Queue[CameraRadial] | None,
-    output_q: queue.Queue[Frame],
+    output_buffer: RingBuffer[Frame],
     start_event: Event,
     stop_event: Event,
     wait_event: Event | None = None,
+    latency: LatencyRecorder | None = None,
+    frame_time: Callable[[Frame], int] | None = None,
+    stages: tuple[str, str] = (CAPTURE, ENQUEUE),
+    errors: list[Exception] | None = None,
 ) -> None:
-    cam = CameraClass()
-    if intrinsics_q is not None:
-        intrinsics_q.put(cam.get_intrinsics())
+    """Capture frames on a thread and put them into `output_buffer`.
+
+    If a `latency` recorder is given, the age of every frame on arrival and the
+    duration of putting it into the buffer are recorded under the capture and
+    enqueue names in `stages`. `frame_time` converts a frame's timestamp to Unix
+    nanoseconds. Errors opening the camera are appended to `errors` if given, see
+    `wait_for_start`.
+    """
+    capture_stage, enqueue_stage = stages
+    try:
+        cam = CameraClass()
+        if intrinsics_q is not None:
+            assert isinstance(cam, SceneCamera)
+            intrinsics_q.put(cam.get_intrinsics())
+    except Exception as error:
+        if errors is None:
+            raise
+        errors.append(error)
+        return
     start_event.set()
     if wait_event is not None:
         wait_event.wait()
@@ -52,8 +168,143 @@ def image_receiver(
             cam.close()
             break
         image = cam.get_frame()
-        with contextlib.suppress(queue.Full):
-            output_q.put_nowait(image)
+        if latency is None or frame_time is None:
+            output_buffer.put(image)
+            continue
+        latency.record_age(capture_stage, frame_time(image))
+        start = time.perf_counter()
+        output_buffer.put(image)
+        latency.record_since(enqueue_stage, start)
+
+
+def image_receiver_process(
+    CameraClass: type[SceneCamera | EyeCamera],
+    intrinsics_q: "multiprocessing.Queue[Any] | None",
+    ring_info_q: "multiprocessing.Queue[Any]",
+    capacity: int,
+    stop_event: Any,
+) -> None:
+    """Capture frames in a dedicated process and write them to shared memory.
+
+    The shared memory ring is sized after the first frame. Its name and frame shape
+    are reported through `ring_info_q` for the parent process to attach to it.
+    Errors opening the camera are reported through `ring_info_q` instead, see
+    `receive_from`.
+    """
+    try:
+        cam = CameraClass()
+        if intrinsics_q is not None:
+            assert isinstance(cam, SceneCamera)
+            intrinsics_q.put(cam.get_intrinsics())
+        image = cam.get_frame()
+    except Exception as error:
+        ring_info_q.put(error)
+        return
+    ring = SharedFrameRing.create(capacity, image.img.shape)
+    ring_info_q.put((ring.name, image.img.shape))
+    try:
+        while not stop_event.is_set():
+            ring.put(image)
+            image = cam.get_frame()
+    finally:
+        cam.close()
+        ring.close()
+
+
+def wait_for_start(thread: Thread, start_event: Event, errors: list[Exception]) -> None:
+    """Wait until a capture thread opened its camera.
+
+    Raises:
+        Exception: The error the thread failed to open the camera with.
+        RuntimeError: If the thread stopped without reporting an error.
+
+    """
+    while not start_event.wait(STARTUP_POLL_INTERVAL):
+        for error in errors:
+            raise error
+        if not thread.is_alive():
+            raise RuntimeError("Capture thread stopped before opening the camera.")
+
+
+def receive_from(
+    process: multiprocessing.process.BaseProcess,
+    q: "multiprocessing.Queue[Any]",
+) -> Any:
+    """Get the next item a capture process puts into `q`.
+
+    Raises:
+        Exception: The error the process put into `q` instead of an item.
+        RuntimeError: If the process exited without putting anything into `q`.
+
+    """
+    while True:
+        try:
+            item = q.get(timeout=STARTUP_POLL_INTERVAL)
+            break
+        except queue.Empty:
+            if process.is_alive():
+                continue
+        # Whatever the process put before exiting has been flushed to the queue
+        try:
+            item = q.get(timeout=STARTUP_POLL_INTERVAL)
+            break
+        except queue.Empty:
+            raise RuntimeError(
+                f"Capture process exited with code {process.exitcode}."
+            ) from None
+    if isinstance(item, Exception):
+        raise item
+    return item
+
+
+def read_frames(
+    buffer: RingBuffer[Frame] | SharedFrameRing,
+    n: int = 1,
+    pool: BufferPool | None = None,
+    copy: bool = True,
+) -> tuple[list[Frame], int]:
+    """Read up to `n` of the newest frames of a capture buffer, see `RingBuffer.read`.
+
+    Frames of a `SharedFrameRing` are copied out of shared memory, into arrays of
+    `pool` if given, so that the capture process cannot overwrite them while they
+    are in use. Without `copy` they are views into shared memory instead, see
+    `SharedFrameRing`.
+    """
+    if isinstance(buffer, SharedFrameRing):
+        return buffer.read(n, copy=copy, pool=pool)
+    return buffer.read(n)
+
+
+def gaze_estimator(
+    pipeline: Any,
+    eye_buffer: RingBuffer[Frame] | SharedFrameRing,
+    output_buffer: RingBuffer[GazeEstimate],
+    stop_event: Event,
+    errors: list[Exception],
+    latency: LatencyRecorder | None = None,
+    eye_reads: ReadTracker | None = None,
+    buffer_pool: BufferPool | None = None,
+) -> None:
+    eye_count = 0
+    last_time = -1
+    while not stop_event.is_set():
+        new_eye_count = eye_buffer.wait(eye_count, timeout=0.5)
+        if new_eye_count == eye_count:
+            continue
+        eye_count = new_eye_count
+        try:
+            eye_frames, eye_end = read_frames(eye_buffer, PIPELINE_BATCH_SIZE)
+            if eye_reads is not None:
+                eye_reads.read(eye_end - len(eye_frames), eye_end)
+            estimates = estimate_gaze(pipeline, eye_frames, latency, buffer_pool)
+        except Exception as error:
+            errors.append(error)
+            break
+        for estimate in estimates:
+            # Consecutive batches overlap, only keep estimates of new eye frames
+            if estimate.time > last_time:
+                output_buffer.put(estimate)
+                last_time = estimate.time
 
 
 class LowExposureSceneCamera(SceneCamera):
@@ -61,65 +312,181 @@ class LowExposureSceneCamera(SceneCamera):
         super().__init__()
         self.exposure = 120  # Set low exposure to reduce motion blur
 
+    def get_frame(self) -> Frame:
+        # Decoding is deferred to the first access of the image
+        assert isinstance(self.backend, UVCBackend)
+        return get_uvc_frame(self.backend)
+
 
 class NeonUSB(EyeTrackingSource):
-    def __init__(self, compute_gaze: bool = True):
+    scene_buffer: RingBuffer[Frame] | SharedFrameRing
+    eye_buffer: RingBuffer[Frame] | SharedFrameRing | None
+    _eye_reads: ReadTracker | None
+    scene_stop_event: Event | ProcessEvent
+    eye_stop_event: Event | ProcessEvent
+
+    def __init__(
+        self,
+        compute_gaze: bool = True,
+        async_gaze: bool = False,
+        capture_processes: bool = False,
+        zero_copy: bool = False,
+    ):
+        """Connect to a Neon device via USB.
+
+        Args:
+            compute_gaze: Run the gaze pipeline on the eye camera frames.
+            async_gaze: Run the gaze pipeline continuously on a dedicated thread.
+                `get_sample` then interpolates the most recent gaze estimates
+                instead of running the pipeline itself.
+            capture_processes: Capture each camera in its own process instead of a
+                thread. Frames are shared through shared memory and copied out of it
+                once when read, scene frames into arrays of `buffer_pool`. Capture
+                and enqueue latencies are not recorded in this mode.
+            zero_copy: With `capture_processes`, scene images of samples are views
+                into shared memory instead of copies. A view is overwritten after 9
+                more scene frames, i.e. within 300 ms, copy images that need to be
+                kept longer. Eye frames are always copied.
+
+        Raises:
+            CameraNotFoundError: If a camera is not connected.
+
+        """
         super().__init__()
 
+        self._scene_count = 0
+        self._eye_count = 0
+        self._gaze_stream_time = -1
+        self._gaze_buffer: RingBuffer[GazeEstimate] | None = None
+        self._gaze_errors: list[Exception] = []
+        self._scene_clock = ClockOffset(uvc.get_time_monotonic)
+        self._capture_processes: list[multiprocessing.process.BaseProcess] = []
+        self._shared_rings: list[SharedFrameRing] = []
+        self._mp_context = (
+            multiprocessing.get_context("spawn") if capture_processes else None
+        )
+        self._copy_scene_frames = not (capture_processes and zero_copy)
+
+        self.eye_buffer = None
+        self._eye_reads = None
+        self._pipeline = None
+
         self._init_scene_camera()
+        self._scene_reads = ReadTracker(self.scene_buffer.capacity)
 
         if compute_gaze:
-            self._init_eye_camera()
-            self._pipeline = self._init_pipeline()
-        else:
-            self._eye_cam = None
-            self._pipeline = None
+            try:
+                self._init_eye_camera()
+                assert self.eye_buffer is not None
+                self._eye_reads = ReadTracker(self.eye_buffer.capacity)
+                self._pipeline = self._init_pipeline()
+                if async_gaze:
+                    self._init_gaze_estimator()
+            except Exception:
+                # Stop the cameras that did start
+                self.close()
+                raise
+
+    def _start_capture_process(
+        self,
+        CameraClass: type[SceneCamera | EyeCamera],
+        stop_event: Any,
+        intrinsics_q: "multiprocessing.Queue[Any] | None",
+    ) -> SharedFrameRing:
+        assert self._mp_context is not None
+        ring_info_q = self._mp_context.Queue()
+        process = self._mp_context.Process(
+            target=image_receiver_process,
+            args=(CameraClass, intrinsics_q, ring_info_q, 10, stop_event),
+            daemon=True,
+        )
+        process.start()
+        self._capture_processes.append(process)
+        ring_name, frame_shape = receive_from(process, ring_info_q)
+        ring = SharedFrameRing.attach(ring_name, 10, frame_shape, created_by_child=True)
+        self._shared_rings.append(ring)
+        return ring
 
     def _init_scene_camera(self):
         print("Connecting to scene cam...", end="", flush=True)
+        if self._mp_context is not None:
+            self.scene_stop_event = self._mp_context.Event()
+            scene_intrinsics_mp_q = self._mp_context.Queue()
+            self.scene_buffer = self._start_capture_process(
+                LowExposureSceneCamera, self.scene_stop_event, scene_intrinsics_mp_q
+            )
+            self._set_scene_intrinsics(
+                receive_from(self._capture_processes[-1], scene_intrinsics_mp_q)
+            )
+            print("Done.")
+            return
+
         scene_start_event = Event()
         self.scene_stop_event = Event()
+        scene_errors: list[Exception] = []
         scene_intrinsics_q = queue.Queue[CameraRadial](maxsize=1)
-        self.scene_q = queue.Queue[Frame](maxsize=10)
+        self.scene_buffer = RingBuffer[Frame](10, frame_timestamp)
         scene_thread = Thread(
             target=image_receiver,
             args=(
                 LowExposureSceneCamera,
                 scene_intrinsics_q,
-                self.scene_q,
+                self.scene_buffer,
                 scene_start_event,
                 self.scene_stop_event,
                 None,
+                self.latency,
+                self._scene_frame_time,
+                (CAPTURE, ENQUEUE),
+                scene_errors,
             ),
         )
         scene_thread.start()
-        intrinsics = scene_intrinsics_q.get()
+        # The intrinsics are put before the camera reports having started
+        wait_for_start(scene_thread, scene_start_event, scene_errors)
+        self._set_scene_intrinsics(scene_intrinsics_q.get_nowait())
+        print("Done.")
+
+    def _scene_frame_time(self, frame: Frame) -> int:
+        return self._scene_clock.to_unix_ns(frame.timestamp)
+
+    def _set_scene_intrinsics(self, intrinsics: Any) -> None:
         self.scene_intrinsics = CameraRadial(
             1600, 1200, intrinsics.camera_matrix, intrinsics.distortion_coefficients
         )
-        scene_start_event.wait()
-        print("Done.")
 
     def _init_eye_camera(self):
         print("Connecting to eye cam...", end="", flush=True)
+        if self._mp_context is not None:
+            self.eye_stop_event = self._mp_context.Event()
+            self.eye_buffer = self._start_capture_process(
+                EyeCamera, self.eye_stop_event, None
+            )
+            print("Done.")
+            return
 
         eye_start_event = Event()
         self.eye_stop_event = Event()
+        eye_errors: list[Exception] = []
 
-        self.eye_q = queue.Queue[Frame](maxsize=10)
+        self.eye_buffer = RingBuffer[Frame](10, frame_timestamp)
         eye_thread = Thread(
             target=image_receiver,
             args=(
                 EyeCamera,
                 None,
-                self.eye_q,
+                self.eye_buffer,
                 eye_start_event,
                 self.eye_stop_event,
                 None,
+                self.latency,
+                eye_frame_time,
+                (EYE_CAPTURE, EYE_ENQUEUE),
+                eye_errors,
             ),
         )
         eye_thread.start()
-        eye_start_event.wait()
+        wait_for_start(eye_thread, eye_start_event, eye_errors)
         print("Done.")
 
     def _init_pipeline(self):
@@ -143,32 +510,177 @@ class NeonUSB(EyeTrackingSource):
             pipeline_version=neon_pipeline_version,
             camera_matrix=self.scene_intrinsics.camera_matrix,
             dist_coefs=self.scene_intrinsics.distortion_coefficients,
-            batch_size=6,
+            batch_size=PIPELINE_BATCH_SIZE,
         )
         print("Done.")
         return pipeline
 
+    def _init_gaze_estimator(self) -> None:
+        # One second of gaze at 200 Hz
+        self._gaze_buffer = RingBuffer[GazeEstimate](200, lambda e: e.time)
+        gaze_thread = Thread(
+            target=gaze_estimator,
+            args=(
+                self._pipeline,
+                self.eye_buffer,
+                self._gaze_buffer,
+                self.eye_stop_event,
+                self._gaze_errors,
+                self.latency,
+                self._eye_reads,
+                self.buffer_pool,
+            ),
+        )
+        gaze_thread.start()
+
+    def _check_gaze_estimator(self) -> None:
+        for error in self._gaze_errors:
+            raise RuntimeError("Asynchronous gaze estimation failed.") from error
+
+    def _wait_for_first_estimate(self, gaze_buffer: RingBuffer[GazeEstimate]) -> None:
+        deadline = time.monotonic() + FIRST_GAZE_TIMEOUT
+        while gaze_buffer.wait(0, timeout=0.1) == 0:
+            self._check_gaze_estimator()
+            if time.monotonic() >= deadline:
+                raise RuntimeError("No gaze estimates from the gaze pipeline.")
+
+    @property
+    def gaze_estimate(self) -> GazeEstimate | None:
+        """Most recent result of the asynchronous gaze pipeline, if enabled."""
+        if self._gaze_buffer is None or len(self._gaze_buffer) == 0:
+            return None
+        return self._gaze_buffer.latest()[-1]
+
+    def get_gaze(self, undistort: bool = False) -> GazeBatch:
+        """Return gaze of every eye frame since the previous call.
+
+        With `async_gaze` the last second of gaze is buffered. Otherwise the gaze
+        pipeline is run on the new eye frames here, of which only the last 50 ms are
+        buffered.
+
+        Raises:
+            RuntimeError: If the asynchronous gaze pipeline failed.
+
+        """
+        if self._pipeline is None or self.eye_buffer is None:
+            raise RuntimeError("Gaze is only available with compute_gaze enabled.")
+
+        if self._gaze_buffer is not None:
+            self._check_gaze_estimator()
+            estimates = self._gaze_buffer.since(self._gaze_stream_time)
+        else:
+            estimates = estimate_gaze_since(
+                self._pipeline,
+                read_frames(self.eye_buffer, self.eye_buffer.capacity)[0],
+                self._gaze_stream_time,
+                self.latency,
+                self.buffer_pool,
+            )
+        if estimates:
+            self._gaze_stream_time = estimates[-1].time
+
+        gaze = GazeBatch.from_points(
+            [estimate.time for estimate in estimates],
+            [estimate.gaze for estimate in estimates],
+        )
+        return gaze.undistort(self.scene_intrinsics) if undistort else gaze
+
+    def frame_counters(self) -> dict[str, FrameCounters]:
+        """Count captured, dropped, skipped and buffered frames per camera.
+
+        Frames are dropped when the consumer does not read them before the capture
+        buffer wraps around. In asynchronous gaze mode, the eye camera's consumer is
+        the gaze pipeline thread.
+        """
+        counters = {"scene": self._scene_reads.counters(self.scene_buffer.count)}
+        if self.eye_buffer is not None and self._eye_reads is not None:
+            counters["eye"] = self._eye_reads.counters(self.eye_buffer.count)
+        return counters
+
     def get_sample(self) -> EyeTrackingData:
-        ts = int(time.time() * 1e9)
-        scene_frame = get_all_items(self.scene_q)[-1]
-        eye_frames = get_all_items(self.eye_q)[-6:]
+        # Wait for at least one new frame, otherwise fast callers would be handed the
+        # same frame over and over again
+        self._scene_count = self.scene_buffer.wait(self._scene_count)
+        scene_frames, scene_end = read_frames(
+            self.scene_buffer, 1, self.buffer_pool, self._copy_scene_frames
+        )
+        self._scene_reads.read(scene_end - 1, scene_end)
+        return self._sample_from(scene_frames[-1])
+
+    def samples(self, strict: bool = False) -> Iterator[EyeTrackingData]:
+        """Yield every scene frame captured from now on in order.
+
+        Up to 10 scene frames are buffered. Frames that are overwritten before they
+        are read count as lost, see `EyeTrackingSource.samples`.
+        """
+        position = self.scene_buffer.count
+        while True:
+            end = self.scene_buffer.wait(position)
+            scene_frames, end = read_frames(
+                self.scene_buffer,
+                end - position,
+                self.buffer_pool,
+                self._copy_scene_frames,
+            )
+            first = end - len(scene_frames)
+            if first > position:
+                self._report_lost(first - position, strict)
+            self._scene_reads.read(first, first + 1, end)
+            self._scene_count = position = first + 1
+            yield self._sample_from(scene_frames[0])
+
+    def _sample_from(self, scene_frame: Frame) -> EyeTrackingData:
+        ts = self._scene_frame_time(scene_frame)
+        self.latency.record_age(DEQUEUE, ts)
 
-        if self._pipeline is None:
+        if self._pipeline is None or self.eye_buffer is None:
             gaze = np.array([0, 0], dtype=np.float64)
+            eye_image = None
         else:
-            gaze = self._pipeline(eye_frames)
-            if gaze.ndim == 2:
-                gaze = np.mean(gaze, axis=0)
-        data = EyeTrackingData(
+            if self._gaze_buffer is not None:
+                self._check_gaze_estimator()
+                # Only blocks until the very first estimate is available
+                self._wait_for_first_estimate(self._gaze_buffer)
+                # 200 ms of gaze, enough to cover the scene frame's capture time
+                estimates = self._gaze_buffer.latest(40)
+            else:
+                self._eye_count = self.eye_buffer.wait(self._eye_count)
+                eye_frames, eye_end = read_frames(
+                    self.eye_buffer, self.eye_buffer.capacity
+                )
+                window = closest_window(
+                    [eye_frame_time(frame) for frame in eye_frames],
+                    ts,
+                    PIPELINE_BATCH_SIZE,
+                )
+                assert self._eye_reads is not None
+                window_start = eye_end - len(eye_frames) + window.start
+                self._eye_reads.read(
+                    window_start, window_start + len(eye_frames[window]), eye_end
+                )
+                estimates = estimate_gaze(
+                    self._pipeline,
+                    eye_frames[window],
+                    self.latency,
+                    self.buffer_pool,
+                )
+            gaze, eye_image = gaze_at(estimates, ts)
+        return EyeTrackingData(
             time=ts,
             gaze_scene_distorted=gaze,
-            scene_image_distorted=scene_frame.bgr,
+            scene_image_distorted=lambda: bgr_image(scene_frame.img, self.buffer_pool),
             intrinsics=self.scene_intrinsics,
-            eye_image=eye_frames[-1].gray,
+            undistortion_maps=self.undistortion_maps,
+            latency=self.latency,
+            buffer_pool=self.buffer_pool,
+            eye_image=eye_image,
         )
-        return data
 
     def close(self):
         self.scene_stop_event.set()
-        if self._pipeline is not None:
+        if self.eye_buffer is not None:
             self.eye_stop_event.set()
+        for process in self._capture_processes:
+            process.join()
+        for ring in self._shared_rings:
+            ring.close()
@@ -0,0 +1,181 @@
+import time
+from collections.abc import Iterator
+from functools import cached_property
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.camera import CameraRadial
+
+from . import (
+    EyeTrackingData,
+    EyeTrackingSource,
+)
+from .recording import (
+    EYE_FILE_NAME,
+    INDEX_DTYPE,
+    INDEX_FILE_NAME,
+    INTRINSICS_FILE_NAME,
+    SCENE_FILE_NAME,
+    load_intrinsics,
+)
+
+
+def _memmap(path: Path, dtype: npt.DTypeLike) -> npt.NDArray:
+    # Empty files can not be memory mapped
+    if path.stat().st_size == 0:
+        return np.zeros(0, dtype=dtype)
+    # Copy-on-write, so that consumers can modify the images without touching the
+    # recording
+    return np.memmap(path, dtype=dtype, mode="c")
+
+
+class Playback(EyeTrackingSource):
+    """Replays sessions recorded with `Recorder`.
+
+    All files are memory mapped, so opening a recording is independent of its size
+    and images are only read from disk when they are accessed. Seeking uses a binary
+    search over the timestamp index.
+    """
+
+    def __init__(self, path: Path | str, real_time: bool = True, loop: bool = False):
+        """Open a recording for playback.
+
+        Args:
+            path: Directory of the recording.
+            real_time: Pace samples according to their timestamps. Like a live
+                source, samples are skipped when the caller can not keep up.
+                Otherwise every sample is returned in order as fast as possible.
+            loop: Restart from the beginning when the end of the recording is
+                reached instead of raising `EOFError`.
+
+        """
+        super().__init__()
+        self.path = Path(path)
+        self.real_time = real_time
+        self.loop = loop
+
+        self._index = _memmap(self.path / INDEX_FILE_NAME, INDEX_DTYPE)
+        self._scene = _memmap(self.path / SCENE_FILE_NAME, np.uint8)
+        self._eye = _memmap(self.path / EYE_FILE_NAME, np.uint8)
+
+        self._position = 0
+        self._pacing_start: tuple[float, int] | None = None
+
+    @cached_property
+    def scene_intrinsics(self) -> CameraRadial:
+        return load_intrinsics(self.path / INTRINSICS_FILE_NAME)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    @property
+    def start_time(self) -> int | None:
+        """Time of the first sample, None if the recording is empty."""
+        if len(self) == 0:
+            return None
+        return int(self._index["time"][0])
+
+    @property
+    def end_time(self) -> int | None:
+        """Time of the last sample, None if the recording is empty."""
+        if len(self) == 0:
+            return None
+        return int(self._index["time"][-1])
+
+    @property
+    def position(self) -> int:
+        """Index of the next sample to be returned."""
+        return self._position
+
+    def seek(self, time_ns: int) -> None:
+        """Continue playback at the first sample at or after `time_ns`."""
+        self._position = int(np.searchsorted(self._index["time"], time_ns))
+        self._pacing_start = None
+
+    def _image(
+        self, data: npt.NDArray[np.uint8], offset: int, padded_shape: npt.NDArray
+    ) -> npt.NDArray[np.uint8]:
+        shape = tuple(int(size) for size in padded_shape if size > 0)
+        size = int(np.prod(shape))
+        return data[offset : offset + size].reshape(shape)
+
+    def sample_at(self, position: int) -> EyeTrackingData:
+        """Random access to the sample at `position` without affecting playback."""
+        record = self._index[position]
+        eye_image = None
+        if record["eye_offset"] >= 0:
+            eye_image = self._image(
+                self._eye, record["eye_offset"], record["eye_shape"]
+            )
+
+        return EyeTrackingData(
+            time=int(record["time"]),
+            gaze_scene_distorted=np.array(record["gaze"], dtype=np.float64),
+            scene_image_distorted=self._image(
+                self._scene, record["scene_offset"], record["scene_shape"]
+            ),
+            intrinsics=self.scene_intrinsics,
+            undistortion_maps=self.undistortion_maps,
+            latency=self.latency,
+            buffer_pool=self.buffer_pool,
+            eye_image=eye_image,
+        )
+
+    def _paced_position(self) -> int:
+        times = self._index["time"]
+        if self._pacing_start is None:
+            self._pacing_start = (time.monotonic(), int(times[self._position]))
+        wall_start, recording_start = self._pacing_start
+
+        # Wait for the next sample to become due, or skip to the newest one that
+        # is already due if the caller fell behind
+        due_time = recording_start + int((time.monotonic() - wall_start) * 1e9)
+        position = max(
+            int(np.searchsorted(times, due_time, side="right")) - 1, self._position
+        )
+        delay = (int(times[position]) - due_time) / 1e9
+        if delay > 0:
+            time.sleep(delay)
+        return position
+
+    def get_sample(self) -> EyeTrackingData:
+        if self._position >= len(self):
+            if not self.loop or len(self) == 0:
+                raise EOFError("End of recording reached.")
+            self._position = 0
+            self._pacing_start = None
+
+        position = self._paced_position() if self.real_time else self._position
+        self._position = position + 1
+        return self.sample_at(position)
+
+    def samples(self, strict: bool = False) -> Iterator[EyeTrackingData]:
+        """Yield every remaining sample of the recording in order.
+
+        In real time mode samples are paced like in `get_sample`, but never
+        skipped, a slow consumer falls behind instead. Nothing is ever lost, so
+        `strict` has no effect.
+        """
+        times = self._index["time"]
+        while self._position < len(self):
+            position = self._position
+            if self.real_time:
+                if self._pacing_start is None:
+                    self._pacing_start = (time.monotonic(), int(times[position]))
+                wall_start, recording_start = self._pacing_start
+                delay = (int(times[position]) - recording_start) / 1e9 - (
+                    time.monotonic() - wall_start
+                )
+                if delay > 0:
+                    time.sleep(delay)
+            self._position = position + 1
+            yield self.sample_at(position)
+
+            if self.loop and self._position >= len(self):
+                self._position = 0
+                self._pacing_start = None
+
+    def close(self) -> None:
+        del self._index, self._scene, self._eye
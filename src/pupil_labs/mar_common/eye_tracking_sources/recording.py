@@ -0,0 +1,206 @@
+import json
+from collections import deque
+from pathlib import Path
+from threading import Condition, Thread
+
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.camera import CameraRadial
+
+from . import EyeTrackingData
+
+SCENE_FILE_NAME = "scene.raw"
+EYE_FILE_NAME = "eye.raw"
+INDEX_FILE_NAME = "index.bin"
+INTRINSICS_FILE_NAME = "intrinsics.json"
+
+INDEX_DTYPE = np.dtype([
+    ("time", "<i8"),
+    ("gaze", "<f8", (2,)),
+    ("scene_offset", "<i8"),
+    ("scene_shape", "<u4", (3,)),
+    ("eye_offset", "<i8"),
+    ("eye_shape", "<u4", (3,)),
+])
+"""Layout of one index record per sample.
+
+Image shapes are padded with zeros to three dimensions, samples without an eye image
+have an `eye_offset` of -1.
+"""
+
+
+def _padded_shape(image: npt.NDArray[np.uint8]) -> tuple[int, int, int]:
+    shape = (*image.shape, 0, 0)
+    return shape[0], shape[1], shape[2]
+
+
+def save_intrinsics(path: Path, intrinsics: CameraRadial) -> None:
+    distortion_coefficients = intrinsics.distortion_coefficients
+    path.write_text(
+        json.dumps({
+            "pixel_width": intrinsics.pixel_width,
+            "pixel_height": intrinsics.pixel_height,
+            "camera_matrix": np.asarray(intrinsics.camera_matrix).tolist(),
+            "distortion_coefficients": (
+                None
+                if distortion_coefficients is None
+                else np.asarray(distortion_coefficients).tolist()
+            ),
+        })
+    )
+
+
+def load_intrinsics(path: Path) -> CameraRadial:
+    intrinsics = json.loads(path.read_text())
+    return CameraRadial(
+        pixel_width=intrinsics["pixel_width"],
+        pixel_height=intrinsics["pixel_height"],
+        camera_matrix=intrinsics["camera_matrix"],
+        distortion_coefficients=intrinsics["distortion_coefficients"],
+    )
+
+
+class Recorder:
+    """Records samples of any `EyeTrackingSource` to disk without re-encoding.
+
+    Scene and eye images are appended as raw bytes to one file each. A compact
+    binary index with timestamps, gaze and byte offsets of every sample is written
+    alongside, see `INDEX_DTYPE`. The scene intrinsics are stored once.
+
+    All writing happens in batches on a background thread. `record` never blocks:
+    if more than `max_pending_bytes` are waiting to be written, the sample is
+    dropped and counted in `dropped_samples` instead.
+
+    Images are not copied by `record`, sources that reuse image buffers need to hand
+    in copies. Scene images that have not been decoded yet are decoded by the writer
+    thread. If writing fails, e.g. because the disk is full, recording stops and the
+    error is raised by the next call to `record` or `close`.
+    """
+
+    def __init__(self, path: Path | str, max_pending_bytes: int = 256 * 1024**2):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_pending_bytes = max_pending_bytes
+
+        self.recorded_samples = 0
+        self.dropped_samples = 0
+
+        self._pending: deque[tuple[EyeTrackingData, int]] = deque()
+        self._pending_bytes = 0
+        self._condition = Condition()
+        self._closed = False
+        self._error: Exception | None = None
+        self._intrinsics_saved = False
+
+        self._scene_file = open(self.path / SCENE_FILE_NAME, "wb")  # noqa: SIM115
+        self._eye_file = open(self.path / EYE_FILE_NAME, "wb")  # noqa: SIM115
+        self._index_file = open(self.path / INDEX_FILE_NAME, "wb")  # noqa: SIM115
+
+        self._writer_thread = Thread(target=self._write_loop, daemon=True)
+        self._writer_thread.start()
+
+    @staticmethod
+    def _sample_bytes(data: EyeTrackingData) -> int:
+        if data.scene_image_decoded:
+            size = data._scene_image.nbytes
+        else:
+            # Do not decode on the caller's thread just to know the size
+            intrinsics = data.intrinsics
+            size = intrinsics.pixel_width * intrinsics.pixel_height * 3
+        if data.eye_image is not None:
+            size += data.eye_image.nbytes
+        return size
+
+    def record(self, data: EyeTrackingData) -> bool:
+        """Queue a sample for writing.
+
+        Returns False if the sample was dropped because the disk can not keep up.
+
+        Raises:
+            RuntimeError: If writing previous samples failed.
+
+        """
+        if not self._intrinsics_saved:
+            save_intrinsics(self.path / INTRINSICS_FILE_NAME, data.intrinsics)
+            self._intrinsics_saved = True
+
+        size = self._sample_bytes(data)
+        with self._condition:
+            self._check_writer()
+            if self._closed:
+                raise RuntimeError("Recorder is closed.")
+            if self._pending_bytes + size > self.max_pending_bytes:
+                self.dropped_samples += 1
+                return False
+            self._pending.append((data, size))
+            self._pending_bytes += size
+            self._condition.notify()
+        return True
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                batch = list(self._pending)
+                self._pending.clear()
+                if not batch and self._closed:
+                    break
+
+            try:
+                self._write_batch([data for data, _ in batch])
+            except Exception as error:
+                with self._condition:
+                    self._error = error
+                    self.dropped_samples += len(batch) + len(self._pending)
+                    self._pending.clear()
+                    self._pending_bytes = 0
+                break
+
+            with self._condition:
+                self._pending_bytes -= sum(size for _, size in batch)
+
+    def _check_writer(self) -> None:
+        if self._error is not None:
+            raise RuntimeError("Writing the recording failed.") from self._error
+
+    def _write_batch(self, batch: list[EyeTrackingData]) -> None:
+        index = np.zeros(len(batch), dtype=INDEX_DTYPE)
+        for record, data in zip(index, batch, strict=True):
+            scene_image = np.ascontiguousarray(data._scene_image)
+            record["time"] = data.time
+            record["gaze"] = data.gaze_scene_distorted
+            record["scene_offset"] = self._scene_file.tell()
+            record["scene_shape"] = _padded_shape(scene_image)
+            self._scene_file.write(scene_image.data)
+
+            if data.eye_image is None:
+                record["eye_offset"] = -1
+            else:
+                eye_image = np.ascontiguousarray(data.eye_image)
+                record["eye_offset"] = self._eye_file.tell()
+                record["eye_shape"] = _padded_shape(eye_image)
+                self._eye_file.write(eye_image.data)
+
+        # The index is written last, so that it only ever references complete images
+        self._scene_file.flush()
+        self._eye_file.flush()
+        self._index_file.write(index.tobytes())
+        self._index_file.flush()
+        self.recorded_samples += len(batch)
+
+    def close(self) -> None:
+        """Write all pending samples and close the files.
+
+        Raises:
+            RuntimeError: If writing any of the samples failed.
+
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._writer_thread.join()
+        self._scene_file.close()
+        self._eye_file.close()
+        self._index_file.close()
+        self._check_writer()
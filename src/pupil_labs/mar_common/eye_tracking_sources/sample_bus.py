@@ -0,0 +1,199 @@
+from collections.abc import Callable, Iterator
+from threading import Condition, Event, Thread
+from typing import Literal
+
+from pupil_labs.camera import CameraRadial
+
+from . import (
+    EyeTrackingData,
+    EyeTrackingSource,
+    LatencyRecorder,
+    UndistortionMaps,
+)
+from .buffers import BufferPool, FrameCounters, ReadTracker, RingBuffer
+
+DropPolicy = Literal["latest", "queue"]
+LATEST: DropPolicy = "latest"
+"""Only keep the newest sample, a subscriber always gets the freshest one."""
+QUEUE: DropPolicy = "queue"
+"""Keep samples in order, dropping the oldest once the queue is full."""
+
+
+def sample_distributor(
+    source: EyeTrackingSource,
+    publish: Callable[[EyeTrackingData], None],
+    new_sample: Condition,
+    stop_event: Event,
+    errors: list[Exception],
+) -> None:
+    while not stop_event.is_set():
+        try:
+            data = source.get_sample()
+        except Exception as error:
+            if not stop_event.is_set():
+                errors.append(error)
+            with new_sample:
+                new_sample.notify_all()
+            break
+        publish(data)
+
+
+class Subscription(EyeTrackingSource):
+    """Samples of a `SampleBus` for a single consumer.
+
+    A subscription is itself a source, so it can be passed to anything that expects
+    one. All subscribers receive the same `EyeTrackingData` objects, derived data
+    like `scene_image_undistorted` is computed once by whoever needs it first.
+    """
+
+    def __init__(self, bus: "SampleBus", policy: DropPolicy, size: int):
+        super().__init__()
+        if policy not in (LATEST, QUEUE):
+            raise ValueError(f"Unknown drop policy {policy!r}.")
+        self.bus = bus
+        self.policy = policy
+        self._buffer = RingBuffer[EyeTrackingData](1 if policy == LATEST else size)
+        self._reads = ReadTracker(self._buffer.capacity)
+        self._position = 0
+
+    @property
+    def scene_intrinsics(self) -> CameraRadial:
+        return self.bus.source.scene_intrinsics
+
+    @property
+    def undistortion_maps(self) -> UndistortionMaps:
+        return self.bus.source.undistortion_maps
+
+    @property
+    def latency(self) -> LatencyRecorder:
+        return self.bus.source.latency
+
+    @property
+    def buffer_pool(self) -> BufferPool:
+        return self.bus.source.buffer_pool
+
+    def counters(self) -> FrameCounters:
+        """Count the samples this subscriber received, dropped and has pending."""
+        return self._reads.counters(self._buffer.count)
+
+    def _wait(self) -> bool:
+        # Returns False if the bus was closed and no sample is pending
+        bus = self.bus
+        with bus._new_sample:
+            bus._new_sample.wait_for(
+                lambda: self._buffer.count > self._position
+                or bool(bus._errors)
+                or bus._stop_event.is_set()
+            )
+        if self._buffer.count > self._position:
+            return True
+        for error in bus._errors:
+            raise RuntimeError("Capturing from the bus's source failed.") from error
+        return False
+
+    def _next(self) -> tuple[EyeTrackingData, int]:
+        # Returns the number of samples the drop policy skipped as well
+        samples, end = self._buffer.read(self._buffer.capacity)
+        oldest = end - len(samples)
+        first = max(self._position, oldest)
+        lost = first - self._position
+        self._reads.read(first, first + 1, end)
+        self._position = first + 1
+        return samples[first - oldest], lost
+
+    def get_sample(self) -> EyeTrackingData:
+        """Return the next sample according to the subscription's drop policy.
+
+        Raises:
+            RuntimeError: If the bus was closed or its source failed.
+
+        """
+        if not self._wait():
+            raise RuntimeError("Sample bus closed.")
+        return self._next()[0]
+
+    def samples(self, strict: bool = False) -> Iterator[EyeTrackingData]:
+        """Yield every sample the drop policy kept, see `EyeTrackingSource.samples`.
+
+        Iteration ends when the bus is closed.
+        """
+        while self._wait():
+            data, lost = self._next()
+            if lost > 0:
+                self._report_lost(lost, strict)
+            yield data
+
+    def put(self, data: EyeTrackingData) -> None:
+        self._buffer.put(data)
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class SampleBus:
+    """Shares the samples of one source between several consumers in a process.
+
+    The bus captures from the source on a background thread and hands every sample
+    to all subscriptions. Each subscription buffers independently according to its
+    drop policy, so a slow subscriber never holds back the others or the source.
+    """
+
+    def __init__(self, source: EyeTrackingSource):
+        """Start capturing from a source.
+
+        Args:
+            source: Source to capture from, it is closed together with the bus.
+
+        """
+        self.source = source
+        self._subscriptions: list[Subscription] = []
+        self._new_sample = Condition()
+        self._stop_event = Event()
+        self._errors: list[Exception] = []
+
+        self._thread = Thread(
+            target=sample_distributor,
+            args=(
+                source,
+                self.publish,
+                self._new_sample,
+                self._stop_event,
+                self._errors,
+            ),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def subscribe(self, policy: DropPolicy = LATEST, size: int = 10) -> Subscription:
+        """Receive all samples captured from now on.
+
+        Args:
+            policy: `LATEST` to only keep the newest sample, or `QUEUE` to receive
+                samples in order.
+            size: Number of samples a `QUEUE` subscription buffers before dropping
+                the oldest.
+
+        """
+        subscription = Subscription(self, policy, size)
+        with self._new_sample:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._new_sample:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, data: EyeTrackingData) -> None:
+        with self._new_sample:
+            for subscription in self._subscriptions:
+                subscription.put(data)
+            self._new_sample.notify_all()
+
+    def close(self) -> None:
+        self._stop_event.set()
+        with self._new_sample:
+            self._new_sample.notify_all()
+        self.source.close()
+        # Sources blocked waiting for data that will never arrive are left behind
+        self._thread.join(timeout=1.0)
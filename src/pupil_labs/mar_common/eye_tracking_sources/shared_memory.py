@@ -0,0 +1,499 @@
+import contextlib
+import time
+from collections.abc import Callable
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.camera import CameraRadial
+from pupil_labs.neon_usb import Frame
+
+from .buffers import BufferPool
+from .eye_tracking_source import EyeTrackingData
+
+_ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _wait_for_count(
+    current_count: Callable[[], int],
+    count: int,
+    timeout: float | None,
+    poll_interval: float,
+    stopped: Callable[[], bool] | None = None,
+) -> int:
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while (current := current_count()) <= count:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if stopped is not None and stopped():
+            # Count once more, the last items may have been put right before
+            return current_count()
+        time.sleep(poll_interval)
+    return current
+
+
+def _copied(
+    image: npt.NDArray[np.uint8], pool: BufferPool | None
+) -> npt.NDArray[np.uint8]:
+    if pool is None:
+        return image.copy()
+    copy = pool.acquire(image.shape, image.dtype)
+    np.copyto(copy, image)
+    return copy
+
+
+def _attach_shared_memory(name: str, created_by_child: bool) -> SharedMemory:
+    shm = SharedMemory(name=name)
+    if not created_by_child:
+        # Only the creating process is responsible for unlinking the memory.
+        # Otherwise the resource tracker of this process would remove it on exit.
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return shm
+
+
+class SharedFrameRing:
+    """Ring buffer of equally shaped frames in shared memory.
+
+    One process writes frames with `put`, any number of processes can attach to the
+    ring by name and read them. By default reading does not copy any pixel data, the
+    returned frames are views into the shared memory. A view stays valid until the
+    writer wraps around and overwrites its slot, i.e. for `capacity - 1` more frames.
+    Consumers that hold on to frames for longer need to read them with `copy`.
+
+    Every slot carries a sequence number that the writer invalidates before and
+    publishes after writing. Readers never return the slot the writer is going to
+    write next and check the sequence number again after reading a slot, so they
+    never pick up a partially written frame.
+    """
+
+    def __init__(
+        self,
+        shm: SharedMemory,
+        capacity: int,
+        frame_shape: tuple[int, ...],
+        owner: bool,
+    ):
+        self._shm = shm
+        self.capacity = capacity
+        self.frame_shape = tuple(frame_shape)
+        self._owner = owner
+
+        buf = shm.buf
+        offset = 0
+        self._header: npt.NDArray[np.int64] = np.ndarray((1,), np.int64, buf, offset)
+        offset = _aligned(offset + self._header.nbytes)
+        self._sequence: npt.NDArray[np.int64] = np.ndarray(
+            (capacity,), np.int64, buf, offset
+        )
+        offset = _aligned(offset + self._sequence.nbytes)
+        self._index: npt.NDArray[np.int64] = np.ndarray(
+            (capacity,), np.int64, buf, offset
+        )
+        offset = _aligned(offset + self._index.nbytes)
+        self._timestamp: npt.NDArray[np.float64] = np.ndarray(
+            (capacity,), np.float64, buf, offset
+        )
+        offset = _aligned(offset + self._timestamp.nbytes)
+        self._frames: npt.NDArray[np.uint8] = np.ndarray(
+            (capacity, *frame_shape), np.uint8, buf, offset
+        )
+
+    @staticmethod
+    def required_size(capacity: int, frame_shape: tuple[int, ...]) -> int:
+        size = _aligned(8)
+        size += 3 * _aligned(8 * capacity)
+        return size + capacity * int(np.prod(frame_shape))
+
+    @classmethod
+    def create(cls, capacity: int, frame_shape: tuple[int, ...]) -> "SharedFrameRing":
+        shm = SharedMemory(create=True, size=cls.required_size(capacity, frame_shape))
+        ring = cls(shm, capacity, frame_shape, owner=True)
+        ring._header[0] = 0
+        ring._sequence[:] = -1
+        return ring
+
+    @classmethod
+    def attach(
+        cls,
+        name: str,
+        capacity: int,
+        frame_shape: tuple[int, ...],
+        created_by_child: bool = False,
+    ) -> "SharedFrameRing":
+        """Attach to a ring created by another process.
+
+        Args:
+            name: Name of the shared memory block, see `name`.
+            capacity: Capacity the ring was created with.
+            frame_shape: Frame shape the ring was created with.
+            created_by_child: Whether the ring was created by a child process of
+                this one, in which case both share the same resource tracker.
+
+        """
+        shm = _attach_shared_memory(name, created_by_child)
+        return cls(shm, capacity, frame_shape, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def count(self) -> int:
+        """Total number of frames put since creation."""
+        return int(self._header[0])
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    def put(self, frame: Frame) -> None:
+        count = self.count
+        slot = count % self.capacity
+        self._sequence[slot] = -1
+        self._frames[slot] = frame.img
+        self._index[slot] = frame.index
+        self._timestamp[slot] = frame.timestamp
+        self._sequence[slot] = count
+        self._header[0] = count + 1
+
+    def wait(
+        self, count: int, timeout: float | None = None, poll_interval: float = 0.0005
+    ) -> int:
+        """Wait until more than `count` frames have been put in total.
+
+        Readers may live in unrelated processes, so this polls instead of relying on
+        a shared synchronization primitive.
+        """
+        return _wait_for_count(lambda: self.count, count, timeout, poll_interval)
+
+    def latest(
+        self, n: int = 1, copy: bool = False, pool: BufferPool | None = None
+    ) -> list[Frame]:
+        """Return up to `n` of the newest frames, oldest first.
+
+        Args:
+            n: Maximum number of frames to return.
+            copy: Copy the frames out of shared memory instead of returning views.
+            pool: Pool to copy the frames into, if `copy` is set.
+
+        """
+        return self.read(n, copy, pool)[0]
+
+    def read(
+        self, n: int = 1, copy: bool = False, pool: BufferPool | None = None
+    ) -> tuple[list[Frame], int]:
+        """Like `latest`, but also return the total count the frames end at."""
+        end = self.count
+        # The slot of frame `end` is the next one to be written, leave it out
+        start = max(end - min(n, self.capacity - 1), 0)
+        frames = []
+        for i in range(start, end):
+            slot = i % self.capacity
+            if self._sequence[slot] != i:
+                # Overwritten in the meantime
+                continue
+            image = self._frames[slot]
+            if copy:
+                image = _copied(image, pool)
+            frame = Frame(image, float(self._timestamp[slot]), int(self._index[slot]))
+            if self._sequence[slot] != i:
+                # Overwritten while reading
+                continue
+            frames.append(frame)
+        return frames, end
+
+    def since(self, timestamp: float) -> list[Frame]:
+        """Return all buffered frames newer than `timestamp`, oldest first."""
+        return [f for f in self.latest(self.capacity) if f.timestamp > timestamp]
+
+    def close(self) -> None:
+        # Drop our own views first, the memory can only be closed if nobody else
+        # still references it.
+        del self._header, self._sequence, self._index, self._timestamp, self._frames
+        # If frames handed out to consumers are still alive, the mapping is only
+        # released once they are garbage collected.
+        with contextlib.suppress(BufferError):
+            self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+SAMPLE_HEADER_DTYPE = np.dtype([
+    ("count", "<i8"),
+    ("capacity", "<i8"),
+    ("scene_shape", "<i8", (3,)),
+    ("eye_shape", "<i8", (3,)),
+    ("closed", "?"),
+    ("error", "S256"),
+])
+"""Layout of the header of a `SharedSampleRing`.
+
+Image shapes are padded with zeros to three dimensions, an all zero eye shape means
+that samples carry no eye images. `closed` is set once the writer stopped, `error`
+holds the reason if it failed.
+"""
+
+INTRINSICS_DTYPE = np.dtype([
+    ("version", "<i8"),
+    ("pixel_width", "<i8"),
+    ("pixel_height", "<i8"),
+    ("camera_matrix", "<f8", (3, 3)),
+    ("distortion_coefficients", "<f8", (8,)),
+    ("distortion_coefficient_count", "<i8"),
+])
+"""Layout of the scene intrinsics of a `SharedSampleRing`."""
+
+SAMPLE_METADATA_DTYPE = np.dtype([
+    ("sequence", "<i8"),
+    ("time", "<i8"),
+    ("gaze", "<f8", (2,)),
+    ("intrinsics_version", "<i8"),
+    ("has_eye_image", "?"),
+])
+"""Layout of the metadata of every slot of a `SharedSampleRing`."""
+
+
+def _padded_shape(shape: tuple[int, ...]) -> tuple[int, int, int]:
+    padded = (*shape, 0, 0, 0)
+    return padded[0], padded[1], padded[2]
+
+
+def _unpadded_shape(padded_shape: npt.NDArray[np.int64]) -> tuple[int, ...]:
+    return tuple(int(size) for size in padded_shape if size > 0) or (0,)
+
+
+class SharedSampleRing:
+    """Ring buffer of eye tracking samples in shared memory.
+
+    Like `SharedFrameRing`, with a metadata record per slot holding the sample's
+    time, gaze and the version of the scene intrinsics it belongs to. The latest
+    intrinsics are stored once in the header. Image shapes are stored in the header
+    as well, so readers attach by name only.
+    """
+
+    def __init__(self, shm: SharedMemory, owner: bool):
+        self._shm = shm
+        self._owner = owner
+
+        buf = shm.buf
+        offset = 0
+        self._header: npt.NDArray[np.void] = np.ndarray(
+            (1,), SAMPLE_HEADER_DTYPE, buf, offset
+        )
+        self.capacity = int(self._header["capacity"][0])
+        self.scene_shape = _unpadded_shape(self._header["scene_shape"][0])
+        self.eye_shape = _unpadded_shape(self._header["eye_shape"][0])
+
+        offset = _aligned(offset + self._header.nbytes)
+        self._intrinsics: npt.NDArray[np.void] = np.ndarray(
+            (1,), INTRINSICS_DTYPE, buf, offset
+        )
+        offset = _aligned(offset + self._intrinsics.nbytes)
+        self._metadata: npt.NDArray[np.void] = np.ndarray(
+            (self.capacity,), SAMPLE_METADATA_DTYPE, buf, offset
+        )
+        offset = _aligned(offset + self._metadata.nbytes)
+        self._scene: npt.NDArray[np.uint8] = np.ndarray(
+            (self.capacity, *self.scene_shape), np.uint8, buf, offset
+        )
+        offset = _aligned(offset + self._scene.nbytes)
+        self._eye: npt.NDArray[np.uint8] = np.ndarray(
+            (self.capacity, *self.eye_shape), np.uint8, buf, offset
+        )
+
+    @staticmethod
+    def required_size(
+        capacity: int, scene_shape: tuple[int, ...], eye_shape: tuple[int, ...]
+    ) -> int:
+        size = _aligned(SAMPLE_HEADER_DTYPE.itemsize)
+        size += _aligned(INTRINSICS_DTYPE.itemsize)
+        size += _aligned(capacity * SAMPLE_METADATA_DTYPE.itemsize)
+        size += _aligned(capacity * int(np.prod(scene_shape)))
+        return size + capacity * int(np.prod(eye_shape))
+
+    @classmethod
+    def create(
+        cls,
+        capacity: int,
+        scene_shape: tuple[int, ...],
+        eye_shape: tuple[int, ...] = (0,),
+    ) -> "SharedSampleRing":
+        """Create a ring for samples with the given image shapes.
+
+        Pass an `eye_shape` of `(0,)` for samples without eye images.
+        """
+        shm = SharedMemory(
+            create=True, size=cls.required_size(capacity, scene_shape, eye_shape)
+        )
+        header: npt.NDArray[np.void] = np.ndarray((1,), SAMPLE_HEADER_DTYPE, shm.buf)
+        header["count"] = 0
+        header["capacity"] = capacity
+        header["scene_shape"] = _padded_shape(scene_shape)
+        header["eye_shape"] = _padded_shape(eye_shape)
+        header["closed"] = False
+        header["error"] = b""
+        del header
+
+        ring = cls(shm, owner=True)
+        ring._intrinsics["version"] = 0
+        ring._metadata["sequence"] = -1
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, created_by_child: bool = False) -> "SharedSampleRing":
+        """Attach to a ring created by another process, see `SharedFrameRing`."""
+        return cls(_attach_shared_memory(name, created_by_child), owner=False)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    @property
+    def count(self) -> int:
+        """Total number of samples put since creation."""
+        return int(self._header["count"][0])
+
+    def __len__(self) -> int:
+        return min(self.count, self.capacity)
+
+    @property
+    def closed(self) -> bool:
+        """Whether the writer stopped putting samples."""
+        return bool(self._header["closed"][0])
+
+    @property
+    def error(self) -> str | None:
+        """Why the writer stopped, None if it was closed regularly or is running."""
+        error = bytes(self._header["error"][0])
+        return error.decode(errors="replace") if error else None
+
+    def mark_closed(self, error: str | None = None) -> None:
+        """Tell readers that no more samples will be put, optionally due to `error`."""
+        if error is not None:
+            # Truncated to the field's size
+            self._header["error"] = error.encode()
+        self._header["closed"] = True
+
+    @property
+    def intrinsics_version(self) -> int:
+        """Version of the stored intrinsics, 0 if none were written yet."""
+        return int(self._intrinsics["version"][0])
+
+    def write_intrinsics(self, intrinsics: CameraRadial) -> int:
+        """Store new scene intrinsics and return their version."""
+        version = self.intrinsics_version + 1
+        distortion_coefficients = np.asarray(
+            intrinsics.distortion_coefficients
+            if intrinsics.distortion_coefficients is not None
+            else [],
+            dtype=np.float64,
+        ).ravel()
+
+        record = self._intrinsics[0]
+        self._intrinsics["version"] = -1
+        record["pixel_width"] = intrinsics.pixel_width
+        record["pixel_height"] = intrinsics.pixel_height
+        record["camera_matrix"] = np.asarray(intrinsics.camera_matrix)
+        record["distortion_coefficients"] = 0
+        record["distortion_coefficients"][: len(distortion_coefficients)] = (
+            distortion_coefficients
+        )
+        record["distortion_coefficient_count"] = len(distortion_coefficients)
+        self._intrinsics["version"] = version
+        return version
+
+    def read_intrinsics(self) -> tuple[int, CameraRadial] | None:
+        """Return the version and value of the latest intrinsics, if any."""
+        while True:
+            version = self.intrinsics_version
+            if version == 0:
+                return None
+            record = self._intrinsics[0].copy()
+            if version > 0 and self.intrinsics_version == version:
+                break
+            # Written concurrently, try again
+            time.sleep(0.0005)
+
+        count = int(record["distortion_coefficient_count"])
+        return version, CameraRadial(
+            pixel_width=int(record["pixel_width"]),
+            pixel_height=int(record["pixel_height"]),
+            camera_matrix=record["camera_matrix"],
+            distortion_coefficients=(
+                record["distortion_coefficients"][:count] if count > 0 else None
+            ),
+        )
+
+    def put(self, data: EyeTrackingData, intrinsics_version: int) -> None:
+        scene_image = data._scene_image
+        if scene_image.shape != self.scene_shape:
+            raise ValueError(
+                f"Scene image of shape {scene_image.shape} does not fit the ring's "
+                f"shape {self.scene_shape}."
+            )
+        eye_image = data.eye_image
+        if eye_image is not None and eye_image.shape != self.eye_shape:
+            raise ValueError(
+                f"Eye image of shape {eye_image.shape} does not fit the ring's "
+                f"shape {self.eye_shape}."
+            )
+
+        count = self.count
+        slot = count % self.capacity
+        metadata = self._metadata[slot : slot + 1]
+        metadata["sequence"] = -1
+        self._scene[slot] = scene_image
+        if eye_image is not None:
+            self._eye[slot] = eye_image
+        metadata["time"] = data.time
+        metadata["gaze"] = data.gaze_scene_distorted
+        metadata["intrinsics_version"] = intrinsics_version
+        metadata["has_eye_image"] = eye_image is not None
+        metadata["sequence"] = count
+        self._header["count"] = count + 1
+
+    def wait(
+        self, count: int, timeout: float | None = None, poll_interval: float = 0.0005
+    ) -> int:
+        """Wait until more than `count` samples have been put in total.
+
+        Returns early if the writer is closed, see `closed`.
+        """
+        return _wait_for_count(
+            lambda: self.count,
+            count,
+            timeout,
+            poll_interval,
+            lambda: self.closed,
+        )
+
+    def read(
+        self, position: int
+    ) -> tuple[np.void, npt.NDArray[np.uint8], npt.NDArray[np.uint8] | None] | None:
+        """Return metadata, scene and eye image of the sample at `position`.
+
+        Images are views into the shared memory. Returns None if the sample has
+        been overwritten already.
+        """
+        slot = position % self.capacity
+        metadata = self._metadata[slot].copy()
+        if metadata["sequence"] != position:
+            return None
+        scene_image = self._scene[slot]
+        eye_image = self._eye[slot] if metadata["has_eye_image"] else None
+        if self._metadata["sequence"][slot] != position:
+            # Overwritten while reading the metadata
+            return None
+        return metadata, scene_image, eye_image
+
+    def close(self) -> None:
+        del self._header, self._intrinsics, self._metadata, self._scene, self._eye
+        with contextlib.suppress(BufferError):
+            self._shm.close()
+        if self._owner:
+            self._shm.unlink()
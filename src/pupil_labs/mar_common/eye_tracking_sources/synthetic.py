@@ -0,0 +1,193 @@
+import time
+from collections.abc import Iterator
+from functools import cached_property
+
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.camera import CameraRadial
+
+from . import (
+    EyeTrackingData,
+    EyeTrackingSource,
+)
+
+# Typical Neon scene camera intrinsics at 1600x1200, scaled to other resolutions
+NEON_SCENE_FOCAL_LENGTH = 891.0
+NEON_SCENE_DISTORTION_COEFFICIENTS = [
+    -0.1294,
+    0.1057,
+    0.0001,
+    -0.0002,
+    0.0037,
+    0.1697,
+    0.0523,
+    0.0197,
+]
+
+
+def _checkerboard(
+    width: int, height: int, square: int, shift: int
+) -> npt.NDArray[np.uint8]:
+    ys, xs = np.indices((height, width))
+    image: npt.NDArray[np.uint8] = (
+        ((xs + shift) // square + ys // square) % 2 * 255
+    ).astype(np.uint8)
+    return image
+
+
+class Synthetic(EyeTrackingSource):
+    """Device free source generating scene images, eye images and gaze.
+
+    Images are generated once upfront and then cycled through, so that generating
+    samples is never the bottleneck. Intrinsics and distortion resemble the Neon
+    scene camera. Jitter, dropped frames and a slow gaze pipeline can be simulated
+    to stress consumers.
+    """
+
+    def __init__(
+        self,
+        scene_size: tuple[int, int] = (1600, 1200),
+        scene_fps: float = 30.0,
+        eye_size: tuple[int, int] = (384, 192),
+        eye_fps: float = 200.0,
+        real_time: bool = True,
+        jitter: float = 0.0,
+        drop_rate: float = 0.0,
+        pipeline_delay: float = 0.0,
+        buffer_count: int = 4,
+        seed: int | None = None,
+    ):
+        """Create a synthetic source.
+
+        Args:
+            scene_size: Width and height of the scene images.
+            scene_fps: Rate at which scene samples are produced.
+            eye_size: Width and height of the eye images.
+            eye_fps: Rate of the simulated eye camera.
+            real_time: Pace samples according to `scene_fps`. Otherwise samples are
+                produced as fast as possible.
+            jitter: Standard deviation of the capture time jitter in seconds.
+                Capture times never go backwards, jitter is clamped to the previous
+                sample's time.
+            drop_rate: Probability of every scene frame to be dropped.
+            pipeline_delay: Seconds every sample is delayed by a simulated gaze
+                pipeline.
+            buffer_count: Number of distinct pre-generated images per camera.
+            seed: Seed of the random number generator.
+
+        """
+        super().__init__()
+        self.scene_size = scene_size
+        self.scene_fps = scene_fps
+        self.eye_size = eye_size
+        self.eye_fps = eye_fps
+        self.real_time = real_time
+        self.jitter = jitter
+        self.drop_rate = drop_rate
+        self.pipeline_delay = pipeline_delay
+
+        self.dropped_frames = 0
+        self._rng = np.random.default_rng(seed)
+
+        width, height = scene_size
+        self._scene_images = [
+            np.repeat(
+                _checkerboard(width, height, max(width // 16, 1), shift)[..., None],
+                3,
+                axis=2,
+            )
+            for shift in range(0, buffer_count * 8, 8)
+        ]
+        eye_width, eye_height = eye_size
+        self._eye_images = [
+            self._rng.integers(0, 256, (eye_height, eye_width), dtype=np.uint8)
+            for _ in range(buffer_count)
+        ]
+
+        self._frame_index = 0
+        self._previous_seconds = 0.0
+        self._start_time = time.time_ns()
+        self._start_monotonic = time.monotonic()
+
+    @cached_property
+    def scene_intrinsics(self) -> CameraRadial:
+        width, height = self.scene_size
+        focal_length = NEON_SCENE_FOCAL_LENGTH * width / 1600
+        return CameraRadial(
+            pixel_width=width,
+            pixel_height=height,
+            camera_matrix=[
+                [focal_length, 0.0, width / 2],
+                [0.0, focal_length, height / 2],
+                [0.0, 0.0, 1.0],
+            ],
+            distortion_coefficients=NEON_SCENE_DISTORTION_COEFFICIENTS,
+        )
+
+    def gaze_at(self, seconds: float) -> npt.NDArray[np.float64]:
+        """Smooth gaze trajectory across the scene image."""
+        width, height = self.scene_size
+        return np.array(
+            [
+                width / 2 * (1 + 0.8 * np.sin(2 * np.pi * 0.5 * seconds)),
+                height / 2 * (1 + 0.8 * np.sin(2 * np.pi * 0.7 * seconds)),
+            ],
+            dtype=np.float64,
+        )
+
+    def get_sample(self) -> EyeTrackingData:
+        return self._next_sample()[0]
+
+    def samples(self, strict: bool = False) -> Iterator[EyeTrackingData]:
+        """Yield the samples that were not dropped, see `EyeTrackingSource.samples`.
+
+        Frames dropped according to `drop_rate` count as lost.
+        """
+        while True:
+            data, dropped = self._next_sample()
+            if dropped > 0:
+                self._report_lost(dropped, strict)
+            yield data
+
+    def _next_sample(self) -> tuple[EyeTrackingData, int]:
+        # Returns the number of frames dropped before the sample as well
+        dropped = 0
+        while self.drop_rate > 0 and self._rng.random() < self.drop_rate:
+            self._frame_index += 1
+            dropped += 1
+        self.dropped_frames += dropped
+
+        seconds = self._frame_index / self.scene_fps
+        if self.jitter > 0:
+            # Jitter must not reorder samples
+            seconds = max(
+                seconds + self._rng.normal(0.0, self.jitter), self._previous_seconds
+            )
+        self._previous_seconds = seconds
+        self._frame_index += 1
+
+        if self.real_time:
+            delay = self._start_monotonic + seconds - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        if self.pipeline_delay > 0:
+            time.sleep(self.pipeline_delay)
+
+        scene_index = self._frame_index % len(self._scene_images)
+        eye_index = int(seconds * self.eye_fps) % len(self._eye_images)
+        data = EyeTrackingData(
+            time=self._start_time + int(seconds * 1e9),
+            gaze_scene_distorted=self.gaze_at(seconds),
+            scene_image_distorted=self._scene_images[scene_index],
+            intrinsics=self.scene_intrinsics,
+            undistortion_maps=self.undistortion_maps,
+            latency=self.latency,
+            buffer_pool=self.buffer_pool,
+            eye_image=self._eye_images[eye_index],
+        )
+        return data, dropped
+
+    def close(self) -> None:
+        self._scene_images.clear()
+        self._eye_images.clear()
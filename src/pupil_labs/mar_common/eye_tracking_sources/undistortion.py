@@ -0,0 +1,281 @@
+import contextlib
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from pathlib import Path
+from threading import Lock
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+
+from pupil_labs.camera import CameraRadial
+
+
+def intrinsics_key(intrinsics: CameraRadial) -> str:
+    """Key identifying intrinsics by camera matrix, distortion and resolution.
+
+    Intrinsics that undistort to their optimal camera matrix get a different key.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(intrinsics.camera_matrix, np.float64).tobytes())
+    if intrinsics.distortion_coefficients is not None:
+        digest.update(
+            np.ascontiguousarray(
+                intrinsics.distortion_coefficients, np.float64
+            ).tobytes()
+        )
+    digest.update(f"{intrinsics.pixel_width}x{intrinsics.pixel_height}".encode())
+    if intrinsics.use_optimal_camera_matrix:
+        digest.update(b"optimal")
+    return digest.hexdigest()
+
+
+SCALED_MAPS_CACHE_SIZE = 4
+"""Number of output sizes `UndistortionMaps.scaled_maps` keeps tables for."""
+
+
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = Lock()
+
+
+def undistortion_pool() -> ThreadPoolExecutor:
+    """Thread pool shared by all banded undistortions, created on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=os.cpu_count(), thread_name_prefix="undistortion"
+            )
+        return _pool
+
+
+class UndistortionMaps:
+    """Remap tables that undistort images of a single set of intrinsics.
+
+    The tables are computed on first use and then reused for every image. If a
+    `cache_dir` is given, they are persisted there as `.npy` files and memory mapped
+    on subsequent runs instead of being recomputed.
+    """
+
+    def __init__(
+        self,
+        intrinsics: CameraRadial,
+        cache_dir: Path | None = None,
+        bands: int = 1,
+    ):
+        """Create tables for a set of intrinsics.
+
+        Args:
+            intrinsics: Intrinsics of the images to undistort.
+            cache_dir: Directory to persist the tables in.
+            bands: Number of horizontal bands images are split into, which are
+                remapped in parallel on `undistortion_pool`. The result is
+                identical for any number of bands.
+
+        """
+        self.intrinsics = intrinsics
+        self.key = intrinsics_key(intrinsics)
+        self.cache_dir = cache_dir
+        self.bands = bands
+        self._scaled_maps: OrderedDict[tuple[int, int], npt.NDArray[np.float32]] = (
+            OrderedDict()
+        )
+        self._scaled_maps_lock = Lock()
+
+    def matches(self, intrinsics: CameraRadial) -> bool:
+        """Whether these tables are valid for the given intrinsics."""
+        return intrinsics_key(intrinsics) == self.key
+
+    @property
+    def size(self) -> tuple[int, int]:
+        """Width and height of the images the tables undistort."""
+        return self.intrinsics.pixel_width, self.intrinsics.pixel_height
+
+    @property
+    def cache_path(self) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return Path(self.cache_dir) / f"undistort_{self.key}.npy"
+
+    @cached_property
+    def maps(self) -> npt.NDArray[np.float32]:
+        """Stacked x and y remap tables of shape (2, height, width)."""
+        path = self.cache_path
+        if path is not None and path.exists():
+            with contextlib.suppress(OSError, ValueError):
+                cached: npt.NDArray[np.float32] = np.load(path, mmap_mode="r")
+                return cached
+
+        maps = self._compute_maps(self.size)
+        if path is not None:
+            self._save(path, maps)
+        return maps
+
+    def scaled_maps(self, size: tuple[int, int]) -> npt.NDArray[np.float32]:
+        """Remap tables producing undistorted images of a different `size`.
+
+        Every output pixel is mapped directly to the distorted source image, so
+        undistorting and resizing takes a single remap at the output resolution.
+        Tables of the most recently used sizes are kept in memory only, as sizes
+        typically follow the size of a window.
+        """
+        size = (int(size[0]), int(size[1]))
+        if size == self.size:
+            return self.maps
+        with self._scaled_maps_lock:
+            maps = self._scaled_maps.get(size)
+            if maps is None:
+                maps = self._compute_maps(size)
+                self._scaled_maps[size] = maps
+                if len(self._scaled_maps) > SCALED_MAPS_CACHE_SIZE:
+                    self._scaled_maps.popitem(last=False)
+            else:
+                self._scaled_maps.move_to_end(size)
+            return maps
+
+    def _compute_maps(self, size: tuple[int, int]) -> npt.NDArray[np.float32]:
+        intrinsics = self.intrinsics
+        camera_matrix = np.asarray(intrinsics.camera_matrix, dtype=np.float64)
+        # Undistort to the same camera matrix as `undistort_points`, so that
+        # undistorted gaze lines up with the undistorted image
+        undistorted_matrix = np.asarray(
+            intrinsics.optimal_camera_matrix
+            if intrinsics.use_optimal_camera_matrix
+            else camera_matrix,
+            dtype=np.float64,
+        )
+
+        # Scale the undistorted image, keeping pixel centers aligned
+        scale_x = size[0] / intrinsics.pixel_width
+        scale_y = size[1] / intrinsics.pixel_height
+        output_matrix = undistorted_matrix.copy()
+        output_matrix[0, 0] *= scale_x
+        output_matrix[0, 1] *= scale_x
+        output_matrix[0, 2] = (undistorted_matrix[0, 2] + 0.5) * scale_x - 0.5
+        output_matrix[1, 1] *= scale_y
+        output_matrix[1, 2] = (undistorted_matrix[1, 2] + 0.5) * scale_y - 0.5
+
+        map_x, map_y = cv2.initUndistortRectifyMap(
+            camera_matrix,
+            intrinsics.distortion_coefficients,
+            np.eye(3),
+            output_matrix,
+            size,
+            cv2.CV_32FC1,
+        )
+        return np.stack([map_x, map_y])
+
+    @staticmethod
+    def _save(path: Path, maps: npt.NDArray[np.float32]) -> None:
+        # Write to a temporary file first so that concurrent readers never see a
+        # partially written table. The disk cache is an optimization only, so
+        # failing to write it is not an error.
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".npy")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, maps)
+            os.replace(tmp_name, path)
+        except OSError:
+            Path(tmp_name).unlink(missing_ok=True)
+
+    def undistort_image(
+        self,
+        image: npt.NDArray[np.uint8],
+        size: tuple[int, int] | None = None,
+        out: npt.NDArray[np.uint8] | None = None,
+    ) -> npt.NDArray[np.uint8]:
+        """Undistort an image, optionally resizing it to `size` in the same step.
+
+        Pixels are interpolated bilinearly from the source image. For large
+        reductions use a size close to the display size rather than a thumbnail,
+        the source is not low-pass filtered.
+
+        Args:
+            image: Distorted image.
+            size: Width and height of the result, defaults to the image's size.
+            out: Array to write the result to instead of allocating a new one.
+
+        """
+        maps = self.maps if size is None else self.scaled_maps(size)
+        height = maps.shape[1]
+        shape = (height, maps.shape[2], *image.shape[2:])
+        if out is None:
+            out = np.empty(shape, dtype=image.dtype)
+        elif out.shape != shape or out.dtype != image.dtype:
+            raise ValueError(
+                f"Output of shape {out.shape} and type {out.dtype} does not fit the "
+                f"undistorted image of shape {shape} and type {image.dtype}."
+            )
+
+        bands = max(min(self.bands, height), 1)
+        if bands == 1:
+            self._remap_band(image, maps, out, 0, height)
+            return out
+
+        edges = np.linspace(0, height, bands + 1, dtype=np.int64)
+        # Output rows only depend on their own rows of the tables, and remap
+        # releases the GIL, so bands can be remapped concurrently.
+        pool = undistortion_pool()
+        futures = [
+            pool.submit(self._remap_band, image, maps, out, int(start), int(stop))
+            for start, stop in zip(edges[:-1], edges[1:], strict=True)
+        ]
+        for future in futures:
+            future.result()
+        return out
+
+    def undistort_region(
+        self,
+        image: npt.NDArray[np.uint8],
+        offset: tuple[int, int],
+        size: tuple[int, int],
+    ) -> npt.NDArray[np.uint8]:
+        """Undistort only a region of an image.
+
+        The region starts at `offset` and is `size` large, both as (x, y) in
+        undistorted image coordinates, and has to lie within the image. The result
+        equals the same crop of the fully undistorted image.
+        """
+        x, y = offset
+        width, height = size
+        full_width, full_height = self.size
+        if x < 0 or y < 0 or x + width > full_width or y + height > full_height:
+            raise ValueError(
+                f"Region of size {size} at {offset} exceeds the image of size "
+                f"{self.size}."
+            )
+
+        maps = self.maps
+        region = np.empty((height, width, *image.shape[2:]), dtype=image.dtype)
+        cv2.remap(
+            image,
+            maps[0, y : y + height, x : x + width],
+            maps[1, y : y + height, x : x + width],
+            interpolation=cv2.INTER_LINEAR,
+            dst=region,
+        )
+        return region
+
+    @staticmethod
+    def _remap_band(
+        image: npt.NDArray[np.uint8],
+        maps: npt.NDArray[np.float32],
+        out: npt.NDArray[np.uint8],
+        start: int,
+        stop: int,
+    ) -> None:
+        cv2.remap(
+            image,
+            maps[0, start:stop],
+            maps[1, start:stop],
+            interpolation=cv2.INTER_LINEAR,
+            dst=out[start:stop],
+        )
@@ -0,0 +1,125 @@
+import math
+import time
+from threading import Lock
+
+from PySide6.QtCore import QObject, QThread, QTimer, Signal
+from PySide6.QtGui import QGuiApplication
+
+from pupil_labs.mar_common.eye_tracking_sources import (
+    EyeTrackingData,
+    EyeTrackingSource,
+)
+from pupil_labs.mar_common.eye_tracking_sources.latency import UI
+
+
+class SourceThread(QThread):
+    """Calls `get_sample` of a source in a loop, keeping only the newest sample.
+
+    `sample_ready` is only emitted when the previous sample has been taken, so no
+    matter how fast the source is, at most one notification is queued at a time.
+    """
+
+    sample_ready = Signal()
+    failed = Signal(object)
+
+    def __init__(self, source: EyeTrackingSource, parent: QObject | None = None):
+        super().__init__(parent)
+        self.source = source
+        self._lock = Lock()
+        self._latest: EyeTrackingData | None = None
+        self._pending = False
+
+    def run(self) -> None:
+        while not self.isInterruptionRequested():
+            try:
+                data = self.source.get_sample()
+            except Exception as error:
+                if not self.isInterruptionRequested():
+                    self.failed.emit(error)
+                break
+
+            with self._lock:
+                self._latest = data
+                notify = not self._pending
+                self._pending = True
+            if notify:
+                self.sample_ready.emit()
+
+    def take(self) -> EyeTrackingData | None:
+        with self._lock:
+            data = self._latest
+            self._latest = None
+            self._pending = False
+        return data
+
+
+class SamplePoller(QObject):
+    """Polls a source off the GUI thread and delivers its newest samples.
+
+    Samples that arrive while the GUI thread is busy are coalesced, `new_sample` is
+    emitted on the GUI thread with the newest one only, and at most `max_rate` times
+    per second. The age of every delivered sample is recorded as the source's `UI`
+    latency stage.
+    """
+
+    new_sample = Signal(object)
+    failed = Signal(object)
+
+    def __init__(
+        self,
+        source: EyeTrackingSource,
+        max_rate: float | None = None,
+        parent: QObject | None = None,
+    ):
+        """Start polling a source.
+
+        Args:
+            source: Source to poll. It is not closed by the poller, call `stop`
+                before closing it.
+            max_rate: Maximum number of samples delivered per second. Defaults to
+                the refresh rate of the primary screen.
+            parent: Parent object.
+
+        """
+        super().__init__(parent)
+        self.source = source
+
+        if max_rate is None:
+            screen = QGuiApplication.primaryScreen()
+            max_rate = screen.refreshRate() if screen is not None else 60.0
+        self.min_interval = 1 / max_rate
+        self._last_delivery = 0.0
+
+        self._delivery_timer = QTimer(self)
+        self._delivery_timer.setSingleShot(True)
+        self._delivery_timer.timeout.connect(self._deliver)
+
+        self._thread = SourceThread(source)
+        self._thread.sample_ready.connect(self._on_sample_ready)
+        self._thread.failed.connect(self.failed)
+        self._thread.start()
+
+    def _on_sample_ready(self) -> None:
+        if self._delivery_timer.isActive():
+            # Delivers the newest sample once due
+            return
+
+        remaining = self.min_interval - (time.monotonic() - self._last_delivery)
+        if remaining > 0:
+            self._delivery_timer.start(math.ceil(remaining * 1000))
+        else:
+            self._deliver()
+
+    def _deliver(self) -> None:
+        data = self._thread.take()
+        if data is None:
+            return
+        self._last_delivery = time.monotonic()
+        self.source.latency.record_age(UI, data.time)
+        self.new_sample.emit(data)
+
+    def stop(self, timeout: float = 1.0) -> None:
+        """Stop polling, waiting up to `timeout` seconds for the pending sample."""
+        self._delivery_timer.stop()
+        self._thread.requestInterruption()
+        self._thread.wait(int(timeout * 1000))
@@ -1,34 +1,166 @@
-from PySide6.QtGui import QImage, QPixmap  # noqa: I001
-
+import ctypes
 
+import cv2
 import numpy as np
 import numpy.typing as npt
-import qimage2ndarray
+from PySide6.QtGui import QImage, QPixmap
+
+CHANNEL_ORDERS = {
+    1: ("gray",),
+    3: ("bgr", "rgb"),
+    4: ("bgra", "rgba"),
+}
+"""Channel orders supported per number of channels, the first one is the default."""
+
+_QIMAGE_FORMATS = {
+    "gray": QImage.Format.Format_Grayscale8,
+    "bgr": QImage.Format.Format_BGR888,
+    "rgb": QImage.Format.Format_RGB888,
+    # 0xAARRGGBB words, which are stored as B, G, R, A bytes on little endian hosts
+    "bgra": QImage.Format.Format_ARGB32,
+    "rgba": QImage.Format.Format_RGBA8888,
+}
+
+_CHANNEL_ORDERS = {
+    QImage.Format.Format_Grayscale8: "gray",
+    QImage.Format.Format_BGR888: "bgr",
+    QImage.Format.Format_RGB888: "rgb",
+    QImage.Format.Format_RGB32: "bgra",
+    QImage.Format.Format_ARGB32: "bgra",
+    QImage.Format.Format_ARGB32_Premultiplied: "bgra",
+    QImage.Format.Format_RGBX8888: "rgba",
+    QImage.Format.Format_RGBA8888: "rgba",
+    QImage.Format.Format_RGBA8888_Premultiplied: "rgba",
+}
+
+
+class NumpyImage(QImage):
+    """QImage showing the memory of a NumPy array, which it keeps alive.
+
+    Copies of the image share the array's memory and keep it alive as well, until
+    the last of them is released or detached by writing to it.
+    """
+
+    def __init__(self, array: npt.NDArray[np.uint8], image_format: QImage.Format):
+        height, width = array.shape[:2]
+        bytes_per_line = array.strides[0]
+        size = max((height - 1) * bytes_per_line + width * array.strides[1], 0)
+        data = (ctypes.c_ubyte * size).from_address(array.ctypes.data)
+        # PySide holds a reference to the buffer until Qt's image data is freed,
+        # i.e. its cleanup function releases the buffer and thereby the array
+        data._array = array  # type: ignore[attr-defined]
+        super().__init__(memoryview(data), width, height, bytes_per_line, image_format)
+        self.array = array
+
+
+def _has_packed_pixels(frame: npt.NDArray[np.uint8]) -> bool:
+    # Qt supports any distance between rows, but not between pixels or channels
+    channels = 1 if frame.ndim == 2 else frame.shape[2]
+    return (
+        frame.strides[0] > 0
+        and frame.strides[1] == channels
+        and (frame.ndim == 2 or frame.strides[2] == 1)
+    )
+
+
+def qimage_from_numpy(
+    frame: npt.NDArray[np.uint8] | None,
+    pix_format: QImage.Format | None = None,
+    channel_order: str | None = None,
+) -> QImage:
+    """Wrap an image array in a QImage without copying it.
+
+    Rows may be padded or be part of a larger image, e.g. a crop of another array.
+    Arrays with any other memory layout are copied once.
 
+    Args:
+        frame: Image of shape (height, width) or (height, width, channels).
+        pix_format: QImage format to interpret the memory as, overrides
+            `channel_order`.
+        channel_order: One of `CHANNEL_ORDERS` for the number of channels of
+            `frame`. Defaults to gray, BGR or BGRA.
 
-def qimage_from_numpy(frame: npt.NDArray[np.uint8], pix_format=None):
+    """
     if frame is None:
         return QImage()
 
-    if len(frame.shape) == 2:
-        height, width = frame.shape
-        channel = 1
-        image_format = QImage.Format_Grayscale8
-    else:
-        height, width, channel = frame.shape
-        image_format = QImage.Format_BGR888
+    channels = 1 if frame.ndim == 2 else frame.shape[2]
+    if channels not in CHANNEL_ORDERS:
+        raise ValueError(f"Images with {channels} channels are not supported.")
+    if channel_order is None:
+        channel_order = CHANNEL_ORDERS[channels][0]
+    elif channel_order not in CHANNEL_ORDERS[channels]:
+        raise ValueError(
+            f"Channel order {channel_order!r} does not fit {channels} channels."
+        )
+
+    image_format = pix_format
+    if image_format is None:
+        image_format = _QIMAGE_FORMATS[channel_order]
+
+    if not _has_packed_pixels(frame):
+        frame = np.ascontiguousarray(frame)
+
+    return NumpyImage(frame, image_format)
+
+
+class _ImageMemory:
+    # Owns the image, so arrays based on this keep the image's memory alive
+    __slots__ = ("__array_interface__", "_image")
+
+    def __init__(self, image: QImage, channels: int):
+        self._image = image
+        data = np.frombuffer(image.constBits(), np.uint8)
+        shape: tuple[int, ...] = (image.height(), image.width())
+        strides: tuple[int, ...] = (image.bytesPerLine(), channels)
+        if channels > 1:
+            shape += (channels,)
+            strides += (1,)
+        self.__array_interface__ = {
+            "shape": shape,
+            "typestr": "|u1",
+            "data": (data.ctypes.data, True),
+            "strides": strides,
+            "version": 3,
+        }
+
+
+def numpy_from_qimage(image: QImage) -> tuple[npt.NDArray[np.uint8], str]:
+    """Return a read-only view of a QImage's pixels and their channel order.
+
+    The view keeps the image alive and accounts for padded rows. Formats other than
+    8-bit gray, 24-bit and 32-bit color are converted to 32-bit BGRA first.
+    """
+    channel_order = _CHANNEL_ORDERS.get(image.format())
+    if channel_order is None:
+        image = image.convertToFormat(QImage.Format.Format_ARGB32)
+        channel_order = "bgra"
+
+    channels = len(channel_order) if channel_order != "gray" else 1
+    return np.asarray(_ImageMemory(image, channels)), channel_order
+
+
+def _bgra_from_qpixmap(pixmap: QPixmap) -> npt.NDArray[np.uint8]:
+    image = pixmap.toImage()
+    if image.format() not in (
+        QImage.Format.Format_RGB32,
+        QImage.Format.Format_ARGB32,
+        QImage.Format.Format_ARGB32_Premultiplied,
+    ):
+        image = image.convertToFormat(QImage.Format.Format_RGB32)
+    return numpy_from_qimage(image)[0]
 
-    if pix_format is not None:
-        image_format = pix_format
 
-    bytes_per_line = channel * width
+def numpy_view_from_qpixmap(pixmap: QPixmap) -> npt.NDArray[np.uint8]:
+    """Return the pixels of a QPixmap as read-only BGR view.
 
-    return QImage(frame.data, width, height, bytes_per_line, image_format)
+    The pixmap is converted to an image once, the result is a strided view into it
+    that keeps the image alive. See `numpy_from_qpixmap` for a writable copy.
+    """
+    return _bgra_from_qpixmap(pixmap)[..., :3]
 
 
 def numpy_from_qpixmap(pixmap: QPixmap) -> npt.NDArray[np.uint8]:
-    arr = qimage2ndarray.rgb_view(pixmap.toImage())
-    arr = arr[..., :3]
-    arr = arr[:, :, ::-1]  # RGB to BGR
-    arr = arr.copy()
-    return arr
+    """Return the pixels of a QPixmap as writable, contiguous BGR image."""
+    bgra = _bgra_from_qpixmap(pixmap)
+    return cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR)  # type: ignore[return-value]
@@ -1 +1,14 @@
 """Configuration for the pytest test suite."""
+
+import os
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    # Without a display, Qt renders offscreen
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+
+    return QApplication.instance() or QApplication([])
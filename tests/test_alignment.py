@@ -0,0 +1,48 @@
+import numpy as np
+
+from pupil_labs.mar_common.eye_tracking_sources.alignment import (
+    closest_window,
+    interpolate,
+)
+
+
+def test_closest_window_is_centered_on_target():
+    timestamps = [0, 10, 20, 30, 40, 50]
+
+    assert closest_window(timestamps, 25, 2) == slice(2, 4)
+    assert closest_window(timestamps, 20, 3) == slice(1, 4)
+
+
+def test_closest_window_is_shifted_near_the_ends():
+    timestamps = [0, 10, 20, 30, 40, 50]
+
+    assert closest_window(timestamps, -5, 3) == slice(0, 3)
+    assert closest_window(timestamps, 100, 3) == slice(3, 6)
+    assert closest_window(timestamps[:2], 5, 3) == slice(0, 3)
+
+
+def test_interpolate_between_values():
+    timestamps = [1_000_000_000, 1_000_000_010]
+    values = [[0.0, 100.0], [10.0, 200.0]]
+
+    np.testing.assert_allclose(
+        interpolate(timestamps, values, 1_000_000_005), [5.0, 150.0]
+    )
+
+
+def test_interpolate_holds_values_outside_of_range():
+    timestamps = [10, 20]
+    values = [[1.0, 2.0], [3.0, 4.0]]
+
+    np.testing.assert_allclose(interpolate(timestamps, values, 0), [1.0, 2.0])
+    np.testing.assert_allclose(interpolate(timestamps, values, 30), [3.0, 4.0])
+
+
+def test_interpolate_keeps_nanosecond_precision():
+    # Unix nanoseconds are beyond float64's integer precision
+    timestamps = [1_700_000_000_000_000_001, 1_700_000_000_000_000_003]
+    values = [[0.0], [2.0]]
+
+    np.testing.assert_allclose(
+        interpolate(timestamps, values, 1_700_000_000_000_000_002), [1.0]
+    )
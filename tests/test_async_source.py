@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources import AsyncSourceAdapter
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+
+
+class ClosingSynthetic(Synthetic):
+    closed = False
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+def synthetic(**kwargs):
+    return ClosingSynthetic(scene_size=(32, 24), eye_size=(8, 4), **kwargs)
+
+
+def test_async_iteration_over_a_blocking_source():
+    source = synthetic(scene_fps=100.0)
+
+    async def receive():
+        async with AsyncSourceAdapter(source) as adapter:
+            times = []
+            async for data in adapter:
+                times.append(data.time)
+                if len(times) == 3:
+                    break
+            assert adapter.scene_intrinsics is source.scene_intrinsics
+            return times
+
+    times = asyncio.run(receive())
+    assert times == sorted(set(times))
+    assert source.closed
+
+
+def test_waiting_for_samples_does_not_block_the_event_loop():
+    source = synthetic(real_time=False, pipeline_delay=0.2)
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    async def receive():
+        ticker = asyncio.create_task(tick())
+        await AsyncSourceAdapter(source).get_sample()
+        ticker.cancel()
+
+    asyncio.run(receive())
+    assert ticks >= 5
+
+
+def test_missing_gaze_stream_is_raised():
+    adapter = AsyncSourceAdapter(synthetic())
+    with pytest.raises(NotImplementedError):
+        asyncio.run(adapter.get_gaze())
@@ -0,0 +1,185 @@
+import multiprocessing
+from threading import Event
+
+import numpy as np
+import pytest
+
+from pupil_labs.camera import CameraRadial
+from pupil_labs.mar_common.eye_tracking_sources import SampleOverflowError
+from pupil_labs.mar_common.eye_tracking_sources.broadcast import (
+    SamplePublisher,
+    SharedMemorySource,
+)
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+
+SCENE_SIZE = (32, 24)
+
+
+class SwitchingSynthetic(Synthetic):
+    """Hands out `intrinsics` with its samples once set."""
+
+    intrinsics: CameraRadial | None = None
+
+    def get_sample(self):
+        data = super().get_sample()
+        if self.intrinsics is not None:
+            data.intrinsics = self.intrinsics
+        return data
+
+
+class StalledSynthetic(Synthetic):
+    """Produces a single sample and then blocks until closed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._closed = Event()
+        self._produced = False
+
+    def get_sample(self):
+        if self._produced:
+            self._closed.wait()
+            raise RuntimeError("Closed")
+        self._produced = True
+        return super().get_sample()
+
+    def close(self):
+        self._closed.set()
+        super().close()
+
+
+def scaled_intrinsics(intrinsics, scale):
+    return CameraRadial(
+        pixel_width=intrinsics.pixel_width,
+        pixel_height=intrinsics.pixel_height,
+        camera_matrix=np.asarray(intrinsics.camera_matrix) * [[scale], [scale], [1]],
+        distortion_coefficients=intrinsics.distortion_coefficients,
+    )
+
+
+def read_samples(name, count, results):
+    source = SharedMemorySource(name)
+    try:
+        samples = source.samples()
+        for _ in range(count):
+            data = next(samples)
+            results.put((
+                data.time,
+                data.scene_image_distorted.shape,
+                np.asarray(data.intrinsics.camera_matrix).tolist(),
+            ))
+        results.put(source.lost_samples)
+    finally:
+        source.close()
+
+
+@pytest.fixture
+def publisher():
+    publisher = SamplePublisher(
+        Synthetic(scene_size=SCENE_SIZE, eye_size=(8, 4), scene_fps=100.0)
+    )
+    yield publisher
+    publisher.close()
+
+
+def test_subscriber_in_another_process_reads_samples(publisher):
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=read_samples, args=(publisher.name, 5, results))
+    process.start()
+    try:
+        received = [results.get(timeout=30) for _ in range(5)]
+        lost = results.get(timeout=5)
+    finally:
+        process.join(timeout=5)
+    assert process.exitcode == 0
+
+    times = [time for time, _, _ in received]
+    # Samples arrive in order, frames 10 ms apart, gaps only where samples were lost
+    assert times == sorted(times)
+    assert round((times[-1] - times[0]) / 1e7) == 4 + lost
+    camera_matrix = np.asarray(publisher.source.scene_intrinsics.camera_matrix)
+    for _, shape, received_matrix in received:
+        assert shape == (SCENE_SIZE[1], SCENE_SIZE[0], 3)
+        assert np.array_equal(received_matrix, camera_matrix)
+
+
+def test_intrinsics_version_only_changes_with_the_values():
+    source = SwitchingSynthetic(scene_size=SCENE_SIZE, scene_fps=100.0)
+    publisher = SamplePublisher(source)
+    subscriber = SharedMemorySource(publisher.name, timeout=1.0)
+    try:
+        subscriber.get_sample()
+        assert publisher._ring.intrinsics_version == 1
+
+        source.intrinsics = scaled_intrinsics(source.scene_intrinsics, 1.0)
+        for _ in range(3):
+            subscriber.get_sample()
+        assert publisher._ring.intrinsics_version == 1
+
+        zoomed = scaled_intrinsics(source.scene_intrinsics, 2.0)
+        source.intrinsics = zoomed
+        for _ in range(10):
+            data = subscriber.get_sample()
+            if np.array_equal(data.intrinsics.camera_matrix, zoomed.camera_matrix):
+                break
+        else:
+            pytest.fail("Subscriber never received the new intrinsics.")
+        assert publisher._ring.intrinsics_version == 2
+        assert np.array_equal(
+            subscriber.scene_intrinsics.camera_matrix, zoomed.camera_matrix
+        )
+    finally:
+        subscriber.close()
+        publisher.close()
+
+
+def test_slow_subscriber_loses_samples():
+    publisher = SamplePublisher(
+        Synthetic(scene_size=SCENE_SIZE, real_time=False), capacity=4
+    )
+    subscriber = SharedMemorySource(publisher.name, timeout=1.0)
+    try:
+        samples = subscriber.samples()
+        first = next(samples)
+        # The publisher is not paced, it wraps around the ring in no time
+        publisher._ring.wait(publisher._ring.count + 8)
+        second = next(samples)
+
+        assert subscriber.lost_samples > 0
+        assert second.time > first.time
+
+        strict_samples = subscriber.samples(strict=True)
+        with pytest.raises(SampleOverflowError):
+            next(strict_samples)
+            publisher._ring.wait(publisher._ring.count + 8)
+            next(strict_samples)
+    finally:
+        subscriber.close()
+        publisher.close()
+
+
+def test_samples_end_when_the_publisher_closes():
+    publisher = SamplePublisher(Synthetic(scene_size=SCENE_SIZE, scene_fps=100.0))
+    subscriber = SharedMemorySource(publisher.name, timeout=1.0)
+    samples = subscriber.samples()
+    next(samples)
+    publisher.close()
+
+    # Samples published before closing are still yielded, then iteration ends
+    for data in samples:
+        assert data.scene_image_distorted.shape == (SCENE_SIZE[1], SCENE_SIZE[0], 3)
+    with pytest.raises(RuntimeError, match="closed"):
+        subscriber.get_sample()
+    subscriber.close()
+
+
+def test_stalled_publisher_times_out():
+    publisher = SamplePublisher(StalledSynthetic(scene_size=SCENE_SIZE))
+    subscriber = SharedMemorySource(publisher.name, timeout=0.05)
+    try:
+        subscriber.get_sample()
+        with pytest.raises(TimeoutError):
+            subscriber.get_sample()
+    finally:
+        subscriber.close()
+        publisher.close()
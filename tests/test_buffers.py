@@ -0,0 +1,175 @@
+from threading import Timer
+
+import numpy as np
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources.buffers import (
+    BufferPool,
+    FrameCounters,
+    LatestSlot,
+    ReadTracker,
+    RingBuffer,
+)
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+
+
+def test_latest_slot_keeps_only_the_newest_item():
+    slot = LatestSlot[int]()
+    assert slot.age is None
+    for item in range(3):
+        slot.put(item)
+
+    assert slot.count == 3
+    assert slot.get() == (2, 3)
+    assert slot.age is not None and slot.age >= 0
+
+
+def test_latest_slot_waits_for_a_newer_item():
+    slot = LatestSlot[int]()
+    slot.put(0)
+    _, count = slot.get()
+
+    assert slot.get(count, timeout=0.01) is None
+    Timer(0.05, slot.put, (1,)).start()
+    assert slot.get(count, timeout=5.0) == (1, 2)
+
+
+def test_ring_buffer_keeps_newest_items():
+    buffer = RingBuffer[int](3)
+    for item in range(5):
+        buffer.put(item)
+
+    assert buffer.count == 5
+    assert len(buffer) == 3
+    assert buffer.latest() == [4]
+    assert buffer.latest(10) == [2, 3, 4]
+    assert buffer.read(2) == ([3, 4], 5)
+
+
+def test_ring_buffer_since():
+    buffer = RingBuffer[int](4, timestamp_of=lambda item: item * 10)
+    for item in range(6):
+        buffer.put(item)
+
+    assert buffer.since(25) == [3, 4, 5]
+    assert buffer.since(50) == []
+    with pytest.raises(TypeError):
+        RingBuffer[int](4).since(0)
+
+
+def test_ring_buffer_wait_times_out():
+    buffer = RingBuffer[int](2)
+    buffer.put(0)
+
+    assert buffer.wait(0) == 1
+    assert buffer.wait(1, timeout=0.01) == 1
+
+
+def test_read_tracker_counts_skipped_items():
+    tracker = ReadTracker(4)
+    # Items 0 and 1 were still buffered when item 2 was read
+    tracker.read(2, 3, end=4)
+
+    assert tracker.counters(4) == FrameCounters(
+        captured=4, dropped=0, skipped=2, depth=1
+    )
+
+
+def test_read_tracker_counts_dropped_items():
+    tracker = ReadTracker(4)
+    tracker.read(0, 1)
+    # Items 1 to 5 were overwritten, 6 to 9 are read
+    tracker.read(6, 10, end=10)
+
+    assert tracker.counters(10) == FrameCounters(
+        captured=10, dropped=5, skipped=0, depth=0
+    )
+
+
+def test_read_tracker_counts_unread_overwritten_items():
+    tracker = ReadTracker(4)
+    tracker.read(0, 2)
+
+    # Items 2 to 5 are overwritten by the time 10 items were put
+    assert tracker.counters(10) == FrameCounters(
+        captured=10, dropped=4, skipped=0, depth=4
+    )
+
+
+def test_buffer_pool_reuses_released_arrays():
+    pool = BufferPool(capacity=2)
+    array = pool.acquire((4, 4, 3))
+    address = array.ctypes.data
+    del array
+    assert pool.counters().in_use == 0
+
+    reused = pool.acquire((4, 4, 3))
+    assert reused.ctypes.data == address
+    other = pool.acquire((4, 4, 3))
+    assert not np.shares_memory(other, reused)
+
+    counters = pool.counters()
+    assert (counters.hits, counters.misses, counters.pooled) == (1, 2, 2)
+    assert counters.pooled_bytes == 2 * reused.nbytes
+    assert counters.in_use == 2
+
+
+def test_buffer_pool_does_not_reuse_referenced_arrays():
+    pool = BufferPool()
+    array = pool.acquire((4, 4))
+    view = array[1:]
+    del array
+
+    assert not np.shares_memory(pool.acquire((4, 4)), view)
+    assert pool.counters().hits == 0
+
+    del view
+    assert pool.counters().in_use == 0
+
+
+def test_buffer_pool_arrays_return_with_their_sample():
+    source = Synthetic(scene_size=(32, 24), real_time=False)
+    sample = source.get_sample()
+    image = sample.scene_image_undistorted
+    assert source.buffer_counters().in_use == 1
+
+    # The image outlives its sample
+    del sample
+    assert source.buffer_counters().in_use == 1
+
+    del image
+    assert source.buffer_counters().in_use == 0
+    assert source.get_sample().scene_image_undistorted.shape == (24, 32, 3)
+    assert source.buffer_counters().hits == 1
+    source.close()
+
+
+def test_buffer_pool_keys_by_shape_and_type():
+    pool = BufferPool()
+    pool.acquire((4, 4))
+
+    assert pool.acquire((4, 4), np.float32).dtype == np.float32
+    assert pool.acquire((2, 8)).shape == (2, 8)
+    assert pool.counters().hits == 0
+
+
+def test_buffer_pool_limits():
+    pool = BufferPool(capacity=2, max_bytes=100)
+    arrays = [pool.acquire((40,)) for _ in range(3)]
+
+    counters = pool.counters()
+    assert (counters.pooled, counters.pooled_bytes) == (2, 80)
+
+    # Arrays beyond the byte limit are not pooled either
+    arrays.append(pool.acquire((30,)))
+    assert pool.counters().pooled == 2
+
+
+def test_buffer_pool_releases_idle_arrays():
+    pool = BufferPool(max_idle=0.0)
+    pool.acquire((4, 4))
+    in_use = pool.acquire((2, 2))
+
+    pool.acquire((8, 8))
+    counters = pool.counters()
+    assert counters.pooled_bytes == in_use.nbytes + 64
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources import EyeTrackingData, GazeBatch
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+
+
+@pytest.fixture
+def source():
+    source = Synthetic(scene_size=(160, 120), real_time=False, seed=0)
+    yield source
+    source.close()
+
+
+def sample_with_gaze(source, gaze):
+    data = source.get_sample()
+    return EyeTrackingData(
+        time=data.time,
+        gaze_scene_distorted=np.array(gaze, dtype=np.float64),
+        scene_image_distorted=data.scene_image_distorted,
+        intrinsics=data.intrinsics,
+        undistortion_maps=data.undistortion_maps,
+        eye_image=data.eye_image,
+    )
+
+
+def test_region_is_centered_on_gaze(source):
+    data = sample_with_gaze(source, (80, 60))
+    gaze_x, gaze_y = data.gaze_scene_undistorted
+
+    region = data.scene_region_undistorted((40, 30))
+    assert region.image.shape[:2] == (30, 40)
+    assert region.offset == (round(gaze_x - 20), round(gaze_y - 15))
+    x, y = region.offset
+    assert (
+        region.image.tobytes()
+        == (
+            np.ascontiguousarray(data.scene_image_undistorted[y : y + 30, x : x + 40])
+        ).tobytes()
+    )
+
+
+def test_region_stays_within_image(source):
+    data = sample_with_gaze(source, (1000, -1000))
+
+    region = data.scene_region_undistorted((40, 30))
+    assert region.offset == (120, 0)
+
+
+@pytest.mark.parametrize("gaze", [(np.nan, np.nan), (np.inf, 10.0)])
+def test_region_without_valid_gaze_is_centered_on_image(source, gaze):
+    data = sample_with_gaze(source, gaze)
+
+    region = data.scene_region_undistorted((40, 30))
+    assert region.offset == (60, 45)
+    assert region.image.shape[:2] == (30, 40)
+
+
+def test_gaze_batch_from_points():
+    gaze = GazeBatch.from_points([1, 2, 3], [[10, 20], [11, 21], [12, 22]])
+
+    assert gaze.time.dtype == np.int64
+    assert gaze.x.tolist() == [10, 11, 12]
+    assert gaze.y.tolist() == [20, 21, 22]
+    assert gaze.x.flags.c_contiguous and gaze.y.flags.c_contiguous
+    assert len(GazeBatch.from_points([], []).x) == 0
+
+
+def test_gaze_batch_undistorts_all_points_at_once(source):
+    points = [[20.0, 30.0], [80.0, 60.0], [150.0, 100.0]]
+    gaze = GazeBatch.from_points([1, 2, 3], points).undistort(source.scene_intrinsics)
+
+    for x, y, point in zip(gaze.x, gaze.y, points, strict=True):
+        expected = source.scene_intrinsics.undistort_points(np.array([point]))
+        assert np.allclose([x, y], np.ravel(expected))
+    assert gaze.time.tolist() == [1, 2, 3]
+
+    empty = GazeBatch.from_points([], [])
+    assert empty.undistort(source.scene_intrinsics) is empty
+
+
+def test_sources_without_gaze_stream_raise(source):
+    with pytest.raises(NotImplementedError):
+        source.get_gaze()
@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources.latency import (
+    DEQUEUE,
+    GAZE,
+    LatencyRecorder,
+)
+
+
+def test_stats_of_measured_stages():
+    recorder = LatencyRecorder()
+    for milliseconds in range(1, 101):
+        recorder.record(GAZE, milliseconds / 1000)
+
+    stats = recorder.stats()
+    assert stats.keys() == {GAZE}
+    gaze = stats[GAZE]
+    assert gaze.measurements == 100
+    assert gaze.p50 == pytest.approx(0.0505)
+    assert gaze.p95 == pytest.approx(0.09505)
+    assert gaze.p99 == pytest.approx(0.09901)
+    assert gaze.max == pytest.approx(0.1)
+
+
+def test_stats_only_retain_the_newest_measurements():
+    recorder = LatencyRecorder(capacity=10)
+    for seconds in [100.0] * 10 + [1.0] * 10:
+        recorder.record(GAZE, seconds)
+
+    stats = recorder.stats()[GAZE]
+    assert stats.measurements == 20
+    assert stats.p99 == stats.max == 1.0
+
+
+def test_custom_stages_and_ages():
+    recorder = LatencyRecorder()
+    recorder.record("render", 0.5)
+    recorder.record_age(DEQUEUE, time.time_ns() - 2_000_000_000)
+
+    stats = recorder.stats()
+    assert stats["render"].p50 == 0.5
+    assert 2.0 <= stats[DEQUEUE].p50 < 3.0
+
+
+def test_reset():
+    recorder = LatencyRecorder()
+    recorder.record(GAZE, 0.1)
+    recorder.reset()
+
+    assert recorder.stats() == {}
+    with pytest.raises(ValueError):
+        LatencyRecorder(capacity=0)
@@ -0,0 +1,52 @@
+import gc
+import weakref
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources.mjpeg import MJPEGFrame, get_uvc_frame
+from pupil_labs.neon_usb.cameras.backend import UVCBackend
+
+IMAGE = np.full((8, 16, 3), 128, np.uint8)
+
+
+class FakeUVCFrame:
+    def __init__(self, timestamp, index):
+        self.jpeg_buffer = memoryview(cv2.imencode(".jpg", IMAGE)[1].tobytes())
+        self.timestamp = timestamp
+        self.index = index
+
+
+def fake_backend(frame):
+    backend = UVCBackend.__new__(UVCBackend)
+    backend._uvc_capture = SimpleNamespace(get_frame=lambda timeout: frame)
+    return backend
+
+
+def test_frames_keep_the_capture_time_of_the_camera():
+    backend = fake_backend(FakeUVCFrame(12.5, 3))
+
+    frame = get_uvc_frame(backend)
+    assert isinstance(frame, MJPEGFrame)
+    assert frame.timestamp == 12.5
+    assert frame.index == 3
+    assert backend.last_frame_timestamp == 12.5
+
+
+def test_frames_keep_the_uvc_frame_alive():
+    frame = get_uvc_frame(fake_backend(FakeUVCFrame(0.0, 0)))
+    uvc_frame = weakref.ref(frame._uvc_frame)
+    gc.collect()
+    assert uvc_frame() is not None
+
+    assert frame.img.shape == IMAGE.shape
+    assert np.abs(frame.img.astype(int) - IMAGE).max() <= 2
+
+
+def test_closed_camera_raises():
+    backend = fake_backend(None)
+    backend._uvc_capture = None
+    with pytest.raises(OSError, match="not initialized"):
+        get_uvc_frame(backend)
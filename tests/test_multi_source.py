@@ -0,0 +1,89 @@
+from threading import Event
+
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources.multi_source import MultiSource
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+
+
+def synthetic(scene_fps):
+    return Synthetic(scene_size=(32, 24), eye_size=(8, 4), scene_fps=scene_fps)
+
+
+class FailingSynthetic(Synthetic):
+    def get_sample(self):
+        raise OSError("Disconnected")
+
+
+class StalledSynthetic(Synthetic):
+    """Produces a single sample and then blocks until closed."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._closed = Event()
+        self._produced = False
+
+    def get_sample(self):
+        if self._produced:
+            self._closed.wait()
+            raise RuntimeError("Closed")
+        self._produced = True
+        return super().get_sample()
+
+    def close(self):
+        self._closed.set()
+        super().close()
+
+
+@pytest.fixture
+def multi_source():
+    source = MultiSource({"fast": synthetic(100.0), "slow": synthetic(25.0)})
+    yield source
+    source.close()
+
+
+def test_sample_sets_are_aligned_to_the_slowest_source(multi_source):
+    previous_time = -1
+    for _ in range(5):
+        sample_set = multi_source.get_sample_set(timeout=1.0)
+
+        assert sample_set.time > previous_time
+        previous_time = sample_set.time
+        assert sample_set.samples.keys() == {"fast", "slow"}
+        for name, data in sample_set.samples.items():
+            assert sample_set.offsets[name] == (data.time - sample_set.time) / 1e9
+        # The reference is the newest time every source reached, so the source
+        # furthest behind provides it and the other is at most half a frame off
+        assert min(abs(offset) for offset in sample_set.offsets.values()) == 0
+        assert abs(sample_set.offsets["fast"]) <= 0.5 / 100.0 + 1e-9
+
+
+def test_lag_of_the_newest_samples(multi_source):
+    multi_source.get_sample_set(timeout=1.0)
+    lag = multi_source.lag()
+
+    assert lag.keys() == {"fast", "slow"}
+    assert min(lag.values()) == 0
+    assert all(0 <= seconds < 0.5 for seconds in lag.values())
+
+
+def test_failing_source_raises():
+    source = MultiSource({"ok": synthetic(100.0), "broken": FailingSynthetic()})
+    try:
+        with pytest.raises(RuntimeError, match="broken") as error:
+            source.get_sample_set(timeout=1.0)
+        assert isinstance(error.value.__cause__, OSError)
+    finally:
+        source.close()
+
+
+def test_stalled_source_times_out():
+    # Created first, so its only sample is older than all others
+    stalled = StalledSynthetic(scene_size=(32, 24))
+    source = MultiSource({"stalled": stalled, "ok": synthetic(100.0)})
+    try:
+        source.get_sample_set(timeout=1.0)
+        with pytest.raises(TimeoutError):
+            source.get_sample_set(timeout=0.1)
+    finally:
+        source.close()
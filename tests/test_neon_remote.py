@@ -0,0 +1,217 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources import SampleOverflowError, neon_remote
+from pupil_labs.realtime_api.simple import MatchedItem
+from pupil_labs.realtime_api.streaming.gaze import GazeData
+
+START_NS = 1_700_000_000 * 10**9
+FRAME_NS = 33_000_000
+GAZE_NS = 5_000_000
+
+
+class FakeDevice:
+    def __init__(self, *args, **kwargs):
+        self.address = "127.0.0.1"
+        self.port = 8080
+
+    def receive_matched_scene_video_frame_and_gaze(self, timeout_seconds=None):
+        scene = SimpleNamespace(
+            bgr_pixels=np.zeros((12, 16, 3), np.uint8), timestamp_unix_ns=START_NS
+        )
+        return MatchedItem(scene, GazeData(1.0, 2.0, True, START_NS / 1e9))
+
+    def get_calibration(self):
+        return SimpleNamespace(
+            scene_camera_matrix=np.array([[10.0, 0, 8], [0, 10.0, 6], [0, 0, 1]]),
+            scene_distortion_coefficients=np.zeros(8),
+        )
+
+    def gaze_sensor(self):
+        return SimpleNamespace(url="gaze")
+
+    def world_sensor(self):
+        return SimpleNamespace(url="world")
+
+    def close(self):
+        pass
+
+
+class FakeStreams:
+    """Two seconds of gaze, whose x is its time in ms, and 40 scene frames.
+
+    The first frame is streamed once all gaze was, the others once `resume` is set.
+    """
+
+    def __init__(self):
+        self.gaze_done = threading.Event()
+        self.resume = threading.Event()
+
+    async def receive_gaze_data(self, url):
+        for i in range(400):
+            time_ns = START_NS + i * GAZE_NS
+            yield GazeData(time_ns / 1e6 - START_NS / 1e6, 0.0, True, time_ns / 1e9)
+        self.gaze_done.set()
+        while True:
+            await asyncio.sleep(0.01)
+
+    async def receive_video_frames(self, url):
+        for i in range(40):
+            while not self.gaze_done.is_set() or (i > 0 and not self.resume.is_set()):
+                await asyncio.sleep(0.001)
+            yield SimpleNamespace(
+                timestamp_unix_ns=START_NS + i * FRAME_NS,
+                bgr_buffer=lambda: np.zeros((12, 16, 3), np.uint8),
+            )
+        while True:
+            await asyncio.sleep(0.01)
+
+
+class FakeAsyncDevice:
+    def __init__(self, ip_address, port):
+        self.closed = False
+
+    async def get_status(self):
+        return SimpleNamespace(
+            direct_world_sensor=FakeDevice().world_sensor,
+            direct_gaze_sensor=FakeDevice().gaze_sensor,
+        )
+
+    async def get_calibration(self):
+        return FakeDevice().get_calibration()
+
+    async def close(self):
+        self.closed = True
+
+
+async def paced_video_frames(url):
+    for i in range(40):
+        await asyncio.sleep(0.002)
+        yield SimpleNamespace(
+            timestamp_unix_ns=START_NS + i * FRAME_NS,
+            bgr_buffer=lambda: np.zeros((12, 16, 3), np.uint8),
+        )
+    while True:
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def streams():
+    streams = FakeStreams()
+    with (
+        mock.patch.object(neon_remote, "Device", FakeDevice),
+        mock.patch.object(neon_remote, "receive_gaze_data", streams.receive_gaze_data),
+        mock.patch.object(
+            neon_remote, "receive_video_frames", streams.receive_video_frames
+        ),
+        mock.patch("builtins.print"),
+    ):
+        yield streams
+
+
+def resume_all_frames(source, streams):
+    streams.resume.set()
+    while source._scene_buffer.count < 40:
+        time.sleep(0.001)
+
+
+def test_samples_counts_overwritten_frames_as_lost(streams):
+    source = neon_remote.NeonRemote("127.0.0.1", 8080)
+    samples = source.samples()
+
+    first = next(samples)
+    assert first.time == START_NS
+    assert first.gaze_scene_distorted == pytest.approx([0.0, 0.0])
+
+    # 39 more frames arrive while the consumer is busy, only 30 are buffered
+    resume_all_frames(source, streams)
+    data = next(samples)
+    assert source.lost_samples == 9
+    assert data.time == START_NS + 10 * FRAME_NS
+    assert data.gaze_scene_distorted[0] == pytest.approx(10 * FRAME_NS / 1e6)
+    assert data.scene_image_distorted.shape == (12, 16, 3)
+
+    # Closing ends the iteration once the buffered frames are read
+    source.close()
+    assert len(list(samples)) == 29
+
+
+def test_strict_samples_raise_on_lost_frames(streams):
+    source = neon_remote.NeonRemote("127.0.0.1", 8080)
+    samples = source.samples(strict=True)
+    next(samples)
+
+    resume_all_frames(source, streams)
+    with pytest.raises(SampleOverflowError):
+        next(samples)
+    source.close()
+
+
+def test_samples_raise_when_a_stream_fails(streams):
+    async def failing_stream(url):
+        raise ConnectionError("Stream closed.")
+        yield
+
+    source = neon_remote.NeonRemote("127.0.0.1", 8080)
+    with (
+        mock.patch.object(neon_remote, "receive_video_frames", failing_stream),
+        pytest.raises(RuntimeError, match="stopped streaming"),
+    ):
+        next(source.samples())
+    source.close()
+
+
+def test_async_samples_interpolate_gaze_to_their_frame(streams):
+    async def receive():
+        async with neon_remote.AsyncNeonRemote("127.0.0.1", 8080) as source:
+            samples = []
+            async for data in source:
+                samples.append(data)
+                if len(samples) == 3:
+                    break
+            return source, samples, await source.get_gaze()
+
+    with (
+        mock.patch.object(neon_remote, "AsyncDevice", FakeAsyncDevice),
+        mock.patch.object(neon_remote, "receive_video_frames", paced_video_frames),
+    ):
+        source, samples, gaze = asyncio.run(receive())
+
+    assert [data.time for data in samples] == sorted({data.time for data in samples})
+    for data in samples:
+        # Gaze x is its time in ms since the start of the stream
+        assert data.gaze_scene_distorted[0] == pytest.approx(
+            (data.time - START_NS) / 1e6, abs=1e-3
+        )
+    assert len(gaze.time) == 400
+    assert source._device is None
+
+
+def test_async_source_raises_when_a_stream_fails(streams):
+    async def failing_stream(url):
+        raise ConnectionError("Stream closed.")
+        yield
+
+    async def receive():
+        source = neon_remote.AsyncNeonRemote("127.0.0.1", 8080)
+        with pytest.raises(RuntimeError, match="Not connected"):
+            await source.get_sample()
+        await source.connect()
+        try:
+            with pytest.raises(RuntimeError, match="stopped streaming") as error:
+                await source.get_sample()
+            assert isinstance(error.value.__cause__, ConnectionError)
+        finally:
+            await source.close()
+
+    with (
+        mock.patch.object(neon_remote, "AsyncDevice", FakeAsyncDevice),
+        mock.patch.object(neon_remote, "receive_video_frames", failing_stream),
+    ):
+        asyncio.run(receive())
@@ -0,0 +1,186 @@
+import time
+from threading import Event
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources import neon_usb
+from pupil_labs.neon_usb import Frame, SceneCamera
+from pupil_labs.neon_usb.cameras.camera import CameraNotFoundError
+from pupil_labs.neon_usb.cameras.scene import SceneIntrinsics
+
+
+class FakeSceneCamera(SceneCamera):
+    def __init__(self):
+        self._index = 0
+
+    @staticmethod
+    def get_intrinsics():
+        return SceneIntrinsics(np.eye(3), np.zeros(8), np.eye(4)[:3])
+
+    def get_frame(self):
+        time.sleep(0.005)
+        self._index += 1
+        return Frame(np.zeros((12, 16, 3), np.uint8), time.monotonic(), self._index)
+
+    def close(self):
+        pass
+
+
+class FakeEyeCamera(FakeSceneCamera):
+    def get_frame(self):
+        time.sleep(0.005)
+        self._index += 1
+        return Frame(np.zeros((4, 8), np.uint8), time.time(), self._index)
+
+
+class MissingCamera(FakeSceneCamera):
+    def __init__(self):
+        raise CameraNotFoundError("Missing")
+
+
+def centered_gaze(eye_frames):
+    return np.full((len(eye_frames), 2), 8.0)
+
+
+def neon_usb_source(
+    scene_camera=FakeSceneCamera,
+    eye_camera=FakeEyeCamera,
+    pipeline=centered_gaze,
+    **kwargs,
+):
+    with (
+        mock.patch.object(neon_usb, "LowExposureSceneCamera", scene_camera),
+        mock.patch.object(neon_usb, "EyeCamera", eye_camera),
+        mock.patch.object(neon_usb.NeonUSB, "_init_pipeline", return_value=pipeline),
+        mock.patch("builtins.print"),
+    ):
+        return neon_usb.NeonUSB(**kwargs)
+
+
+@pytest.mark.parametrize("capture_processes", [False, True])
+def test_missing_scene_camera_raises(capture_processes):
+    with pytest.raises(CameraNotFoundError):
+        neon_usb_source(
+            MissingCamera, compute_gaze=False, capture_processes=capture_processes
+        )
+
+
+@pytest.mark.parametrize("capture_processes", [False, True])
+def test_missing_eye_camera_raises_and_stops_the_scene_camera(capture_processes):
+    original_close = neon_usb.NeonUSB.close
+    with (
+        mock.patch.object(neon_usb.NeonUSB, "close", autospec=True) as close,
+        pytest.raises(CameraNotFoundError),
+    ):
+        close.side_effect = original_close
+        neon_usb_source(eye_camera=MissingCamera, capture_processes=capture_processes)
+    assert close.call_count == 1
+
+
+def test_zero_copy_returns_views_into_shared_memory():
+    source = neon_usb_source(compute_gaze=False, capture_processes=True, zero_copy=True)
+    try:
+        image = source.get_sample().scene_image_distorted
+        assert not image.flags.owndata
+    finally:
+        source.close()
+
+
+def test_async_gaze_is_read_from_the_gaze_thread():
+    source = neon_usb_source(async_gaze=True)
+    try:
+        data = source.get_sample()
+        assert np.array_equal(data.gaze_scene_distorted, [8.0, 8.0])
+        assert data.eye_image is not None
+        assert source.gaze_estimate is not None
+    finally:
+        source.close()
+
+
+def test_async_gaze_errors_are_raised():
+    def failing_pipeline(eye_frames):
+        raise ValueError("Broken model")
+
+    source = neon_usb_source(pipeline=failing_pipeline, async_gaze=True)
+    try:
+        with pytest.raises(RuntimeError, match="gaze estimation failed") as error:
+            source.get_sample()
+        assert isinstance(error.value.__cause__, ValueError)
+        with pytest.raises(RuntimeError):
+            source.get_gaze()
+    finally:
+        source.close()
+
+
+def test_async_gaze_times_out_without_estimates():
+    released = Event()
+
+    def stuck_pipeline(eye_frames):
+        released.wait()
+        return centered_gaze(eye_frames)
+
+    source = neon_usb_source(pipeline=stuck_pipeline, async_gaze=True)
+    try:
+        with (
+            mock.patch.object(neon_usb, "FIRST_GAZE_TIMEOUT", 0.2),
+            pytest.raises(RuntimeError, match="No gaze estimates"),
+        ):
+            source.get_sample()
+    finally:
+        released.set()
+        source.close()
+
+
+def eye_frames(count):
+    return [
+        Frame(np.zeros((4, 8), np.uint8), index / 200, index) for index in range(count)
+    ]
+
+
+def gaze_of_frame_index(eye_frames):
+    return [[frame.index, 0.0] for frame in eye_frames]
+
+
+def test_gaze_is_estimated_once_per_new_eye_frame():
+    frames = eye_frames(20)
+    # Frames up to index 4 were estimated by a previous call
+    estimates = neon_usb.estimate_gaze_since(
+        gaze_of_frame_index, frames, neon_usb.eye_frame_time(frames[4])
+    )
+
+    assert [estimate.gaze[0] for estimate in estimates] == list(range(5, 20))
+    assert [estimate.time for estimate in estimates] == [
+        neon_usb.eye_frame_time(frame) for frame in frames[5:]
+    ]
+
+
+def test_gaze_is_interpolated_to_the_scene_frame():
+    frames = eye_frames(2)
+    estimates = neon_usb.estimate_gaze(gaze_of_frame_index, frames)
+    time = (estimates[0].time + estimates[1].time) // 2
+
+    gaze, eye_image = neon_usb.gaze_at(estimates, time)
+    assert gaze[0] == pytest.approx(0.5)
+    assert eye_image is estimates[0].eye_image
+
+
+@pytest.mark.parametrize("async_gaze", [False, True])
+def test_get_gaze_returns_every_estimate_once(async_gaze):
+    source = neon_usb_source(pipeline=gaze_of_frame_index, async_gaze=async_gaze)
+    try:
+        batches = []
+        for _ in range(3):
+            # Well within the 10 eye frames NeonUSB buffers without async gaze
+            time.sleep(0.02)
+            batches.append(source.get_gaze())
+    finally:
+        source.close()
+
+    indices = np.concatenate([batch.x for batch in batches])
+    times = np.concatenate([batch.time for batch in batches])
+    assert len(indices) > 0
+    # Consecutive eye frames without gaps or repetitions within the buffer
+    assert np.all(np.diff(times) > 0)
+    assert np.all(np.diff(indices) == 1)
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources import EyeTrackingData
+from pupil_labs.mar_common.eye_tracking_sources.playback import Playback
+from pupil_labs.mar_common.eye_tracking_sources.recording import Recorder
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+
+
+@pytest.fixture
+def samples():
+    source = Synthetic(scene_size=(64, 48), eye_size=(32, 16), real_time=False, seed=0)
+    samples = [source.get_sample() for _ in range(10)]
+    yield samples
+    source.close()
+
+
+def record(path, samples):
+    recorder = Recorder(path)
+    for data in samples:
+        assert recorder.record(data)
+    recorder.close()
+    assert recorder.recorded_samples == len(samples)
+
+
+def assert_same_sample(actual, expected):
+    assert actual.time == expected.time
+    np.testing.assert_array_equal(
+        actual.gaze_scene_distorted, expected.gaze_scene_distorted
+    )
+    np.testing.assert_array_equal(
+        actual.scene_image_distorted, expected.scene_image_distorted
+    )
+    if expected.eye_image is None:
+        assert actual.eye_image is None
+    else:
+        np.testing.assert_array_equal(actual.eye_image, expected.eye_image)
+
+
+def test_round_trip(tmp_path, samples):
+    record(tmp_path, samples)
+
+    playback = Playback(tmp_path, real_time=False)
+    assert len(playback) == len(samples)
+    assert playback.start_time == samples[0].time
+    assert playback.end_time == samples[-1].time
+    np.testing.assert_allclose(
+        playback.scene_intrinsics.camera_matrix, samples[0].intrinsics.camera_matrix
+    )
+
+    for expected in samples:
+        assert_same_sample(playback.get_sample(), expected)
+    with pytest.raises(EOFError):
+        playback.get_sample()
+    playback.close()
+
+
+def test_seek_and_sample_at(tmp_path, samples):
+    record(tmp_path, samples)
+    playback = Playback(tmp_path, real_time=False)
+
+    playback.seek(samples[4].time)
+    assert playback.position == 4
+    # Between two samples, playback continues at the later one
+    playback.seek(samples[4].time + 1)
+    assert playback.position == 5
+    assert_same_sample(playback.get_sample(), samples[5])
+
+    assert_same_sample(playback.sample_at(2), samples[2])
+    assert playback.position == 6
+    assert [data.time for data in playback.samples()] == [
+        data.time for data in samples[6:]
+    ]
+    playback.close()
+
+
+def test_samples_without_eye_images(tmp_path, samples):
+    samples = [
+        EyeTrackingData(
+            time=data.time,
+            gaze_scene_distorted=data.gaze_scene_distorted,
+            scene_image_distorted=data.scene_image_distorted,
+            intrinsics=data.intrinsics,
+            eye_image=None,
+        )
+        for data in samples[:3]
+    ]
+    record(tmp_path, samples)
+
+    playback = Playback(tmp_path, real_time=False)
+    for expected in samples:
+        assert_same_sample(playback.get_sample(), expected)
+    playback.close()
+
+
+def test_empty_recording(tmp_path):
+    Recorder(tmp_path).close()
+
+    playback = Playback(tmp_path, real_time=False, loop=True)
+    assert len(playback) == 0
+    assert playback.start_time is None
+    assert playback.end_time is None
+    with pytest.raises(EOFError):
+        playback.get_sample()
+    assert list(playback.samples()) == []
+    playback.close()
+
+
+def test_write_errors_are_raised(tmp_path, samples):
+    recorder = Recorder(tmp_path)
+    recorder._scene_file.close()
+    assert recorder.record(samples[0])
+    recorder._writer_thread.join(timeout=5.0)
+
+    with pytest.raises(RuntimeError, match="failed") as error:
+        recorder.record(samples[1])
+    assert isinstance(error.value.__cause__, ValueError)
+    assert recorder.dropped_samples == 1
+    with pytest.raises(RuntimeError, match="failed"):
+        recorder.close()
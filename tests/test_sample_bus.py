@@ -0,0 +1,115 @@
+import time
+from threading import Thread
+
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources import SampleOverflowError
+from pupil_labs.mar_common.eye_tracking_sources.sample_bus import (
+    LATEST,
+    QUEUE,
+    SampleBus,
+)
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+
+FPS = 200.0
+
+
+class FailingSynthetic(Synthetic):
+    def get_sample(self):
+        raise OSError("Disconnected")
+
+
+def frames_between(first, second):
+    return round((second.time - first.time) * FPS / 1e9)
+
+
+@pytest.fixture
+def bus():
+    bus = SampleBus(Synthetic(scene_size=(32, 24), eye_size=(8, 4), scene_fps=FPS))
+    yield bus
+    bus.close()
+
+
+def test_latest_subscription_skips_to_the_newest_sample(bus):
+    subscription = bus.subscribe(LATEST)
+    first = subscription.get_sample()
+    time.sleep(0.1)
+    second = subscription.get_sample()
+
+    assert frames_between(first, second) > 1
+    counters = subscription.counters()
+    assert counters.dropped > 0
+    assert counters.depth == 0
+
+
+def test_queue_subscription_receives_samples_in_order(bus):
+    subscription = bus.subscribe(QUEUE, size=100)
+    samples = subscription.samples()
+    received = [next(samples) for _ in range(10)]
+
+    for first, second in zip(received, received[1:], strict=False):
+        assert frames_between(first, second) == 1
+    assert subscription.lost_samples == 0
+    assert subscription.counters().dropped == 0
+
+
+def test_full_queue_drops_the_oldest_samples(bus):
+    subscription = bus.subscribe(QUEUE, size=4)
+    samples = subscription.samples()
+    first = next(samples)
+    time.sleep(0.1)
+    second = next(samples)
+
+    # Every sample between the two was dropped from the queue
+    lost = frames_between(first, second) - 1
+    assert lost > 0
+    assert subscription.lost_samples == lost
+    assert subscription.counters().dropped >= lost
+
+    time.sleep(0.1)
+    with pytest.raises(SampleOverflowError):
+        next(subscription.samples(strict=True))
+
+
+def test_subscribers_share_samples(bus):
+    first = bus.subscribe(QUEUE)
+    second = bus.subscribe(QUEUE)
+
+    # Derived data like undistorted images is computed once for both
+    assert first.get_sample() is second.get_sample()
+
+
+def test_close_ends_samples_of_waiting_readers(bus):
+    subscription = bus.subscribe(QUEUE)
+    received = []
+    errors = []
+
+    def read():
+        try:
+            for data in subscription.samples():
+                received.append(data)
+        except Exception as error:
+            errors.append(error)
+
+    reader = Thread(target=read)
+    reader.start()
+    while not received:
+        time.sleep(0.01)
+    bus.close()
+    reader.join(timeout=1.0)
+
+    assert not reader.is_alive()
+    assert errors == []
+    with pytest.raises(RuntimeError, match="closed"):
+        subscription.get_sample()
+
+
+def test_source_failure_is_raised():
+    bus = SampleBus(FailingSynthetic(scene_size=(32, 24)))
+    subscription = bus.subscribe()
+    try:
+        with pytest.raises(RuntimeError, match="failed") as error:
+            subscription.get_sample()
+        assert isinstance(error.value.__cause__, OSError)
+    finally:
+        bus.close()
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+from PySide6.QtCore import QEventLoop, QTimer
+
+from pupil_labs.mar_common.eye_tracking_sources.latency import UI
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+from pupil_labs.mar_common.ui.sample_poller import SamplePoller
+
+FPS = 1000.0
+
+
+class FailingSynthetic(Synthetic):
+    def get_sample(self):
+        raise OSError("Disconnected")
+
+
+def run_event_loop(seconds):
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+@pytest.fixture
+def source():
+    source = Synthetic(scene_size=(32, 24), eye_size=(8, 4), scene_fps=FPS)
+    yield source
+    source.close()
+
+
+def poll(source, seconds, max_rate, on_sample=None):
+    poller = SamplePoller(source, max_rate=max_rate)
+    delivered = []
+    poller.new_sample.connect(delivered.append)
+    if on_sample is not None:
+        poller.new_sample.connect(on_sample)
+    try:
+        run_event_loop(seconds)
+    finally:
+        poller.stop()
+    return delivered
+
+
+def test_samples_are_delivered_at_most_at_max_rate(qapp, source):
+    delivered = poll(source, 0.5, max_rate=20.0)
+
+    assert 3 <= len(delivered) <= 0.5 * 20 + 1
+    times = [data.time for data in delivered]
+    assert times == sorted(set(times))
+    assert source.stats()[UI].measurements == len(delivered)
+
+
+def test_samples_arriving_while_busy_are_coalesced(qapp, source):
+    def busy(data):
+        # Blocks the GUI thread while the source keeps producing samples
+        time.sleep(0.05)
+
+    delivered = poll(source, 0.3, max_rate=1000.0, on_sample=busy)
+
+    assert len(delivered) >= 2
+    for first, second in zip(delivered, delivered[1:], strict=False):
+        # Only the newest of the samples produced meanwhile is delivered
+        assert round((second.time - first.time) * FPS / 1e9) > 10
+
+
+def test_failures_are_reported(qapp):
+    source = FailingSynthetic(scene_size=(32, 24))
+    poller = SamplePoller(source, max_rate=60.0)
+    errors = []
+    poller.failed.connect(errors.append)
+    run_event_loop(0.1)
+    poller.stop()
+
+    assert len(errors) == 1
+    assert isinstance(errors[0], OSError)
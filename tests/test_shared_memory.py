@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources.buffers import BufferPool
+from pupil_labs.mar_common.eye_tracking_sources.shared_memory import SharedFrameRing
+from pupil_labs.neon_usb import Frame
+
+
+@pytest.fixture
+def ring():
+    ring = SharedFrameRing.create(4, (2, 3))
+    yield ring
+    ring.close()
+
+
+def put_frames(ring, indices):
+    for index in indices:
+        ring.put(Frame(np.full((2, 3), index, np.uint8), index / 10, index))
+
+
+def test_read_returns_newest_frames(ring):
+    put_frames(ring, range(2))
+
+    frames, end = ring.read(5)
+    assert end == 2
+    assert [frame.index for frame in frames] == [0, 1]
+    assert frames[1].timestamp == pytest.approx(0.1)
+    assert (frames[1].img == 1).all()
+
+
+def test_read_leaves_out_the_slot_written_next(ring):
+    put_frames(ring, range(10))
+
+    frames, end = ring.read(ring.capacity)
+    assert end == 10
+    # Frame 6 shares its slot with frame 10, which is written next
+    assert [frame.index for frame in frames] == [7, 8, 9]
+
+
+def test_views_are_overwritten_and_copies_are_not(ring):
+    put_frames(ring, range(1))
+    view = ring.latest()[0]
+    copy = ring.latest(copy=True)[0]
+
+    put_frames(ring, range(1, 5))
+    assert (view.img == 4).all()
+    assert (copy.img == 0).all()
+
+
+def test_copies_are_taken_from_the_pool(ring):
+    pool = BufferPool()
+    put_frames(ring, range(1))
+    ring.latest(copy=True, pool=pool)
+
+    put_frames(ring, range(1, 2))
+    frame = ring.latest(copy=True, pool=pool)[0]
+    assert (frame.img == 1).all()
+    assert pool.counters().hits == 1
+
+
+def test_attached_ring_reads_frames(ring):
+    # This process shares the resource tracker with the ring's creator
+    attached = SharedFrameRing.attach(
+        ring.name, ring.capacity, ring.frame_shape, created_by_child=True
+    )
+    try:
+        put_frames(ring, range(3))
+        assert [frame.index for frame in attached.latest(2)] == [1, 2]
+    finally:
+        attached.close()
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from pupil_labs.mar_common.eye_tracking_sources import SampleOverflowError
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+
+
+def synthetic(**kwargs):
+    return Synthetic(
+        scene_size=(32, 24), eye_size=(8, 4), real_time=False, seed=0, **kwargs
+    )
+
+
+def test_samples_count_dropped_frames_as_lost():
+    source = synthetic(drop_rate=0.3)
+    samples = source.samples()
+    first = next(samples)
+    lost_before = source.lost_samples
+    last = [next(samples) for _ in range(49)][-1]
+
+    assert source.lost_samples == source.dropped_frames > lost_before
+    # Every lost frame leaves a gap in the capture times
+    frames = round((last.time - first.time) * source.scene_fps / 1e9)
+    assert frames - 49 == source.lost_samples - lost_before
+
+
+def test_strict_samples_raise_on_dropped_frames():
+    source = synthetic(drop_rate=0.5)
+    with pytest.raises(SampleOverflowError):
+        for _ in range(50):
+            next(source.samples(strict=True))
+
+
+def test_seeded_sources_are_deterministic():
+    def run(seed):
+        source = Synthetic(
+            scene_size=(32, 24),
+            eye_size=(8, 4),
+            real_time=False,
+            jitter=0.005,
+            drop_rate=0.2,
+            seed=seed,
+        )
+        samples = [source.get_sample() for _ in range(20)]
+        return (
+            np.array([data.gaze_scene_distorted for data in samples]),
+            np.array([data.eye_image for data in samples]),
+            source.dropped_frames,
+        )
+
+    gaze, eye_images, dropped = run(1)
+    same_gaze, same_eye_images, same_dropped = run(1)
+    assert np.array_equal(gaze, same_gaze)
+    assert np.array_equal(eye_images, same_eye_images)
+    assert dropped == same_dropped
+    assert not np.array_equal(gaze, run(2)[0])
+
+
+def test_jitter_keeps_capture_times_in_order():
+    # Jitter of several frame intervals would reorder most samples
+    source = synthetic(jitter=0.1)
+    times = [source.get_sample().time for _ in range(200)]
+
+    assert times == sorted(times)
+    assert len(set(times)) > 1
@@ -0,0 +1,82 @@
+import gc
+
+import numpy as np
+import pytest
+from PySide6.QtGui import QImage, QPixmap
+
+from pupil_labs.mar_common.ui.utils import (
+    numpy_from_qimage,
+    numpy_from_qpixmap,
+    numpy_view_from_qpixmap,
+    qimage_from_numpy,
+)
+
+
+def random_image(shape):
+    return np.random.default_rng(0).integers(0, 256, shape, np.uint8)
+
+
+@pytest.mark.parametrize(
+    ("shape", "channel_order"),
+    [((6, 10), "gray"), ((6, 10, 3), "bgr"), ((6, 10, 4), "bgra")],
+)
+def test_round_trip(shape, channel_order):
+    array = random_image(shape)
+    image = qimage_from_numpy(array)
+
+    result, result_order = numpy_from_qimage(image)
+    assert result_order == channel_order
+    assert np.array_equal(result, array)
+    assert not result.flags.writeable
+
+
+@pytest.mark.parametrize("shape", [(6, 10), (6, 10, 3), (6, 10, 4)])
+def test_padded_rows_are_wrapped_without_copying(shape):
+    padded = random_image((shape[0], shape[1] + 7, *shape[2:]))
+    array = padded[:, 2:-5]
+    image = qimage_from_numpy(array)
+
+    assert image.bytesPerLine() == padded.strides[0]
+    assert np.shares_memory(image.array, padded)
+    assert np.array_equal(numpy_from_qimage(image)[0], array)
+
+
+def test_unpacked_pixels_are_copied():
+    array = random_image((6, 20, 3))[:, ::2]
+    image = qimage_from_numpy(array)
+
+    assert np.array_equal(numpy_from_qimage(image)[0], array)
+
+
+def test_images_keep_their_memory_alive():
+    image = qimage_from_numpy(random_image((6, 10, 3)))
+    expected = image.array.copy()
+    copy = QImage(image)
+    del image
+    gc.collect()
+    assert np.array_equal(numpy_from_qimage(copy)[0], expected)
+
+    view, _ = numpy_from_qimage(QImage(copy))
+    del copy
+    gc.collect()
+    assert np.array_equal(view, expected)
+
+
+def test_unsupported_channels_raise():
+    with pytest.raises(ValueError):
+        qimage_from_numpy(random_image((6, 10, 2)))
+    with pytest.raises(ValueError):
+        qimage_from_numpy(random_image((6, 10, 3)), channel_order="rgba")
+
+
+def test_pixmaps_are_returned_as_bgr(qapp):
+    array = random_image((6, 10, 3))
+    pixmap = QPixmap.fromImage(qimage_from_numpy(array))
+
+    copy = numpy_from_qpixmap(pixmap)
+    assert np.array_equal(copy, array)
+    assert copy.flags.writeable and copy.flags.c_contiguous
+
+    view = numpy_view_from_qpixmap(pixmap)
+    assert np.array_equal(view, array)
+    assert not view.flags.writeable
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from pupil_labs.camera import CameraRadial
+from pupil_labs.mar_common.eye_tracking_sources.synthetic import Synthetic
+from pupil_labs.mar_common.eye_tracking_sources.undistortion import (
+    UndistortionMaps,
+    intrinsics_key,
+)
+
+
+@pytest.fixture
+def intrinsics():
+    # An odd height, so that bands differ in height
+    source = Synthetic(scene_size=(160, 121), real_time=False)
+    yield source.scene_intrinsics
+    source.close()
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (121, 160, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize("bands", [2, 3, 7, 500])
+@pytest.mark.parametrize("size", [None, (80, 61), (320, 240)])
+def test_banded_undistortion_is_identical_to_serial(intrinsics, image, bands, size):
+    serial = UndistortionMaps(intrinsics).undistort_image(image, size)
+    banded = UndistortionMaps(intrinsics, bands=bands).undistort_image(image, size)
+
+    assert banded.shape == serial.shape
+    assert banded.tobytes() == serial.tobytes()
+
+
+def test_banded_undistortion_of_gray_images_into_output(intrinsics, image):
+    gray = np.ascontiguousarray(image[..., 0])
+    serial = UndistortionMaps(intrinsics).undistort_image(gray)
+
+    out = np.empty_like(gray)
+    banded = UndistortionMaps(intrinsics, bands=4).undistort_image(gray, out=out)
+    assert banded is out
+    assert banded.tobytes() == serial.tobytes()
+
+
+def test_output_of_wrong_shape_is_rejected(intrinsics, image):
+    maps = UndistortionMaps(intrinsics, bands=4)
+    with pytest.raises(ValueError):
+        maps.undistort_image(image, out=np.empty((10, 10, 3), np.uint8))
+
+
+def test_region_equals_crop_of_full_image(intrinsics, image):
+    maps = UndistortionMaps(intrinsics)
+    full = maps.undistort_image(image)
+
+    region = maps.undistort_region(image, (10, 20), (50, 40))
+    assert region.tobytes() == np.ascontiguousarray(full[20:60, 10:60]).tobytes()
+    with pytest.raises(ValueError):
+        maps.undistort_region(image, (150, 0), (20, 20))
+
+
+@pytest.mark.parametrize("use_optimal_camera_matrix", [False, True])
+def test_maps_match_intrinsics(intrinsics, image, use_optimal_camera_matrix):
+    intrinsics = CameraRadial(
+        pixel_width=intrinsics.pixel_width,
+        pixel_height=intrinsics.pixel_height,
+        camera_matrix=intrinsics.camera_matrix,
+        distortion_coefficients=intrinsics.distortion_coefficients,
+        use_optimal_camera_matrix=use_optimal_camera_matrix,
+    )
+    undistorted = UndistortionMaps(intrinsics).undistort_image(image)
+
+    assert undistorted.tobytes() == intrinsics.undistort_image(image).tobytes()
+
+
+def test_optimal_camera_matrix_changes_key(intrinsics):
+    optimal = CameraRadial(
+        pixel_width=intrinsics.pixel_width,
+        pixel_height=intrinsics.pixel_height,
+        camera_matrix=intrinsics.camera_matrix,
+        distortion_coefficients=intrinsics.distortion_coefficients,
+        use_optimal_camera_matrix=True,
+    )
+
+    assert intrinsics_key(optimal) != intrinsics_key(intrinsics)
+    assert not UndistortionMaps(intrinsics).matches(optimal)